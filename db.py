@@ -1,8 +1,9 @@
 # db.py (pyodbc 버전으로 수정한 코드)
 
 import pyodbc  # 1. 'pymssql' 대신 'pyodbc'를 import
-import json
-from decimal import Decimal
+import threading
+import time
+from collections import deque
 
 # 2. ODBC 드라이버 이름 설정 (가장 중요!)
 # PowerShell에서 'Get-OdbcDriver' 명령어로 확인한 이름을 넣으세요.
@@ -30,7 +31,17 @@ OVERRIDE_CONFIG = {
     },
 }
 
-def get_db_connection(v_db):
+# ==============================================================
+# 커넥션 풀 설정 (업체(v_db)별로 별도의 풀을 유지합니다)
+# ==============================================================
+POOL_MAX_SIZE = 10          # 업체별 최대 커넥션 수 (사용 중 + 대기 중)
+POOL_ACQUIRE_TIMEOUT = 5    # 풀이 가득 찼을 때 빈 커넥션을 기다리는 최대 시간(초)
+POOL_IDLE_TIMEOUT = 300     # 이 시간(초) 이상 쉬고 있던 커넥션은 폐기
+POOL_MAX_LIFETIME = 1800    # 생성 후 이 시간(초)이 지난 커넥션은 재생성 (서버측 세션 정리)
+POOL_PING_INTERVAL = 30     # 마지막 사용 후 이 시간(초)이 지났으면 대여 전에 SELECT 1 로 생존 확인
+
+
+def _create_connection(v_db):
     """
     v_db (문자열)를 입력받아,
     기본적으로 server/port는 고정이고, 
@@ -103,14 +114,212 @@ def get_db_connection(v_db):
         return None
 
 
-class DecimalEncoder(json.JSONEncoder):
+class _PooledEntry(object):
+    """풀 내부에서 실제 pyodbc 커넥션과 생성/사용 시각을 함께 보관합니다."""
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+
+
+class PooledConnection(object):
     """
-    MSSQL 쿼리 결과로 반환된 Decimal 객체를 float로 변환하여 JSON 직렬화할 때 사용.
-    json.dumps(data, cls=DecimalEncoder) 형식으로 사용.
-    
-    (이 클래스는 pyodbc와 pymssql에 관계없이 100% 동일하게 작동합니다. 수정 불필요.)
+    풀에서 대여한 커넥션.
+    기존 코드처럼 conn.cursor(), conn.commit(), conn.close() 를 그대로 쓰면 되고,
+    close() 를 호출하면 실제로 끊지 않고 풀에 반납합니다.
+    (close() 없이 참조가 사라진 경우에도 반납되도록 __del__ 에서 한 번 더 처리)
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+        self._cursors = []
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise pyodbc.ProgrammingError("Attempt to use a closed connection.")
+        return getattr(entry.raw, name)
+
+    def cursor(self):
+        if self._entry is None:
+            raise pyodbc.ProgrammingError("Attempt to use a closed connection.")
+        cur = self._entry.raw.cursor()
+        self._cursors.append(cur)
+        return cur
+
+    def _close_cursors(self):
+        # fetchone() 후 남은 결과셋이 다음 사용자에게 'Connection is busy' 로 넘어가지 않도록 정리
+        cursors, self._cursors = self._cursors, []
+        for cur in cursors:
+            try:
+                cur.close()
+            except Exception:
+                pass
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._close_cursors()
+            self._pool.release(entry)
+
+    def discard(self):
+        """오류 등으로 재사용하면 안 되는 커넥션을 풀에 돌려주지 않고 폐기합니다."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._close_cursors()
+            self._pool.release(entry, discard=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool(object):
+    """
+    한 업체(v_db)용 커넥션 풀.
+    - 최대 POOL_MAX_SIZE 개까지만 생성 (초과 요청은 POOL_ACQUIRE_TIMEOUT 동안 대기)
+    - 대여 시 오래 쉬었던 커넥션은 SELECT 1 로 생존 확인
+    - 유휴 시간(POOL_IDLE_TIMEOUT) / 최대 수명(POOL_MAX_LIFETIME) 초과 커넥션은 폐기
+    """
+
+    def __init__(self, v_db, max_size=None):
+        self.v_db = v_db
+        self.max_size = max_size or POOL_MAX_SIZE
+        self._idle = deque()  # 최근에 반납된 커넥션이 오른쪽 끝
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+
+    def _is_expired(self, entry, now):
+        return (now - entry.created_at > POOL_MAX_LIFETIME or
+                now - entry.last_used > POOL_IDLE_TIMEOUT)
+
+    def _is_alive(self, entry, now):
+        if now - entry.last_used < POOL_PING_INTERVAL:
+            return True
+        try:
+            cur = entry.raw.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self, now):
+        """왼쪽(가장 오래 쉰 것)부터 만료된 커넥션을 정리합니다. (lock 안에서 호출)"""
+        expired = []
+        while self._idle and self._is_expired(self._idle[0], now):
+            expired.append(self._idle.popleft())
+        return expired
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=POOL_ACQUIRE_TIMEOUT):
+            print(f"DB Pool Exhausted (vendor={self.v_db}, max={self.max_size})")
+            return None
+
+        try:
+            while True:
+                now = time.monotonic()
+                with self._lock:
+                    expired = self._evict_idle(now)
+                    entry = self._idle.pop() if self._idle else None
+                for old in expired:
+                    _close_quietly(old.raw)
+
+                if entry is None:
+                    break
+                if self._is_expired(entry, now) or not self._is_alive(entry, now):
+                    _close_quietly(entry.raw)
+                    continue
+                entry.last_used = now
+                return PooledConnection(self, entry)
+
+            raw = _create_connection(self.v_db)
+            if raw is None:
+                self._slots.release()
+                return None
+            return PooledConnection(self, _PooledEntry(raw))
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, entry, discard=False):
+        try:
+            now = time.monotonic()
+            if not discard and now - entry.created_at <= POOL_MAX_LIFETIME:
+                try:
+                    # 커밋하지 않은 트랜잭션이 다음 사용자에게 넘어가지 않도록 정리
+                    entry.raw.rollback()
+                except Exception:
+                    discard = True
+            else:
+                discard = True
+
+            if discard:
+                _close_quietly(entry.raw)
+                return
+
+            entry.last_used = now
+            with self._lock:
+                self._idle.append(entry)
+                expired = self._evict_idle(now)
+            for old in expired:
+                _close_quietly(old.raw)
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            _close_quietly(entry.raw)
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(v_db):
+    pool = _pools.get(v_db)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(v_db)
+            if pool is None:
+                pool = _pools[v_db] = ConnectionPool(v_db)
+    return pool
+
+
+def get_db_connection(v_db):
+    """
+    업체(v_db)별 커넥션 풀에서 커넥션을 대여합니다.
+    사용법은 기존과 동일하며, conn.close() 시 풀에 반납됩니다.
+    연결에 실패하거나 풀이 가득 차서 대기 시간이 지나면 None 을 반환합니다.
     """
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
\ No newline at end of file
+    return get_pool(v_db).acquire()
+
+
+def close_all_pools():
+    """모든 업체의 대기 중인 커넥션을 닫습니다. (프로세스 종료 시 정리용)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
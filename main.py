@@ -2,8 +2,8 @@
 from flask import Flask, jsonify, send_from_directory, request
 from flask_cors import CORS
 import datetime
-import pyodbc
-from db import get_db_connection
+from services import audit_log
+from services.json_provider import MsgspecJSONProvider
 
 # 기능별 블루프린트 임포트
 from resources.select import (
@@ -41,6 +41,7 @@ API_NAME_MAP = {
     "/api/segsan/list": "생산실적 조회",
     "/api/segsan/update": "생산실적 수정",
     "/api/segsan/delete": "생산실적 삭제",
+    "/api/segsan/insert-bulk": "생산실적 일괄 등록",
     "/api/select/segsan/process": "공정별 실적 조회",
 
     # [공통/기준정보]
@@ -59,6 +60,7 @@ API_NAME_MAP = {
     "/api/chulha/list": "출하 조회",
     "/api/chulha/update": "출하 수정",
     "/api/chulha/delete": "출하 삭제",
+    "/api/chulha/insert-bulk": "출하 일괄 등록",
     "/api/insert/stock/out": "출고 등록 (구버전)",
     "/api/update/stock/update": "출고 수정 (구버전)",
     "/api/delete/stock/delete": "출고 삭제 (구버전)",
@@ -74,6 +76,9 @@ API_NAME_MAP = {
     "/api/data/smart-log": "스마트로그 전압/전류 조회 (두영기전)",
     "/api/data/smart-log/grade": "스마트로그 분석등급(A/B/C) 지정",
     "/api/data/analysis-history": "분석 결과 보고서 이력 조회/저장",
+    "/api/data/series": "센서 시계열 구간 집계 조회",
+    "/api/data/channels": "설비 채널 정의 조회",
+    "/api/data/dashboard": "대시보드 묶음 조회",
     "/api/select/smart/smart-log": "설비 데이터 수집 로그",
     "/api/select/data/smart-prg-cd": "Smart 공정 목록",
     "/api/select/data/equip-down-time": "기기별 비가동 시간",
@@ -94,6 +99,7 @@ API_NAME_MAP = {
     # [ETC/테스트]
     "/api/select/etc/test-result": "TEST 공정 결과 조회",
     "/api/insert/etc/test-result": "TEST 실적 등록",
+    "/api/insert/etc/test-result/bulk": "TEST 실적 일괄 등록",
     "/api/update/etc/test-result": "TEST 실적 수정",
     "/api/delete/etc/test-result": "TEST 실적 삭제",
     "/api/select/etc/lot_no_inform": "LOT NO 정보 조회",
@@ -105,6 +111,8 @@ def create_app():
     앱 인스턴스를 생성하고, 각종 설정을 마친 후 반환합니다.
     """
     app = Flask(__name__)
+    # jsonify 직렬화를 msgspec 으로 처리 (Decimal/numpy/한글 기본 지원)
+    app.json = MsgspecJSONProvider(app)
     CORS(app, resources={
         r"/api/.*": {"origins": "*"}
     })
@@ -185,14 +193,7 @@ def create_app():
         if request.path == '/' or request.path.startswith('/static'):
             return response
 
-        conn = None
         try:
-            conn = get_db_connection(v_db)
-            if not conn:
-                return response
-            
-            cur = conn.cursor()
-
             # -------------------------------------------------------
             # 1. IP 주소 처리 (External IP 우선)
             # -------------------------------------------------------
@@ -206,7 +207,6 @@ def create_app():
             # -------------------------------------------------------
             # 2. 사용 프로그램(used_pgm) 한글 변환
             # -------------------------------------------------------
-            # API_NAME_MAP은 main.py 상단에 정의되어 있다고 가정합니다.
             # 매핑된 한글명이 있으면 사용, 없으면 영문 경로 그대로 사용
             current_path = request.path
             used_pgm = API_NAME_MAP.get(current_path, current_path)
@@ -226,48 +226,27 @@ def create_app():
             used_cnt3 = 0         # 추가필드
 
             # -------------------------------------------------------
-            # 4. INSERT 실행 (out_time, tot_time 제외)
+            # 4. 큐에 적재 (out_time, tot_time 제외)
             # -------------------------------------------------------
-            # MSSQL 2008에서도 ? 파라미터가 자동으로 특수문자를 처리해줍니다.
-            sql = """
-                INSERT INTO bmtlogh (
-                    emp_no, in_time, user_id, org_cd, dept_cd, 
-                    used_pgm, used_cnt, 
-                    emp_nmk, ip_addr, used_cnt3
-                ) VALUES (
-                    ?, GETDATE(), ?, ?, ?, 
-                    ?, ?, 
-                    ?, ?, ?
-                )
-            """
-            
-            # 파라미터 매핑
-            cur.execute(sql, (
-                emp_no,     # 1. K0000999
-                user_id,    # 2. mobile
-                org_cd,     # 3. K
-                dept_cd,    # 4. D0400
-                used_pgm,   # 5. 프로그램명 (슬래시 포함 가능)
-                used_cnt,   # 6. 0
-                emp_nmk,    # 7. 모바일
-                ip_addr,    # 8. IP주소
-                used_cnt3   # 9. 0
+            # 실제 INSERT 는 services/audit_log 의 백그라운드 스레드가 업체별로 모아서
+            # executemany 로 처리하므로, 응답은 로그 기록을 기다리지 않습니다.
+            # in_time 은 요청 시각을 그대로 남기기 위해 여기서 찍습니다.
+            audit_log.enqueue(v_db, (
+                emp_no,                   # 1. K0000999
+                datetime.datetime.now(),  # 2. in_time
+                user_id,                  # 3. mobile
+                org_cd,                   # 4. K
+                dept_cd,                  # 5. D0400
+                used_pgm,                 # 6. 프로그램명 (슬래시 포함 가능)
+                used_cnt,                 # 7. 0
+                emp_nmk,                  # 8. 모바일
+                ip_addr,                  # 9. IP주소
+                used_cnt3                 # 10. 0
             ))
-            conn.commit()
 
-        except pyodbc.ProgrammingError as e:
-            # SQL State 42S02: Base table or view not found
-            # 테이블이 없어서 나는 에러는 조용히 무시 (로그만 찍음)
-            if '42S02' in str(e):
-                pass
-            else:
-                print(f"[Log Error] Programming Error: {e}")
         except Exception as e:
-            # 그 외 에러 (연결 실패 등) 도 API 응답에는 지장을 주지 않도록 출력만 하고 넘어감
-            print(f"[Log Error] Failed to insert log: {e}")
-        finally:
-            if conn:
-                conn.close()
+            # 로그 적재 실패가 API 응답에 지장을 주지 않도록 출력만 하고 넘어감
+            print(f"[Log Error] Failed to queue log: {e}")
 
         return response
 
@@ -0,0 +1,20 @@
+-- migrations/001_api_seq_block.sql
+-- 문서번호 채번 테이블 (services/sequence.py)
+--
+-- 채번기를 사용하는 업체 DB 마다 DDL 권한이 있는 계정으로 한 번 실행합니다.
+-- API 는 이 테이블을 만들지 않으며, 없으면 등록 요청이 오류를 반환합니다.
+-- 여러 번 실행해도 안전합니다.
+
+IF OBJECT_ID(N'dbo.api_seq_block', N'U') IS NULL
+CREATE TABLE dbo.api_seq_block (
+    tbl       VARCHAR(50) NOT NULL,
+    prefix    VARCHAR(20) NOT NULL,
+    last_seq  INT         NOT NULL,
+    upd_dt    DATETIME    NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_api_seq_block PRIMARY KEY (tbl, prefix)
+)
+GO
+
+-- 앱 접속 계정에 필요한 권한 (계정명은 업체 환경에 맞게 변경)
+-- GRANT SELECT, INSERT, UPDATE ON dbo.api_seq_block TO [api_user]
+-- GO
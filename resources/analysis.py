@@ -3,12 +3,12 @@
 # 2. 모든 파라미터 마커를 '?'로 통일
 # 3. 1차/2차 분석 쿼리를 안정적인 PIVOT 쿼리로 교체
 
-from flask import Blueprint, request, jsonify, Response
-from db import get_db_connection, DecimalEncoder
+from flask import Blueprint, request, jsonify
+from db import get_db_connection
+from services.json_provider import dumps as json_dumps, jsonify_numeric # numpy/Decimal 지원 JSON 직렬화 (DB 저장용)
 import json
 import pandas as pd
 import numpy as np
-import decimal # Decimal 타입을 처리하기 위해 추가
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures # 2차항 생성을 위해 추가
 from sklearn.pipeline import make_pipeline # 파이프라인 구성을 위해 추가
@@ -16,22 +16,6 @@ from sklearn.pipeline import make_pipeline # 파이프라인 구성을 위해 
 # 분석 관련 블루프린트
 analysis_bp = Blueprint("analysis_bp", __name__)
 
-# [수정] 기존 NumpyEncoder에 Decimal 처리 기능만 추가합니다.
-class NumpyEncoder(json.JSONEncoder):
-    """ Numpy 및 Decimal 타입 객체를 JSON으로 변환할 수 있도록 처리하는 클래스 """
-    def default(self, obj):
-        import numpy as np
-        if isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        # 이 한 줄만 추가하면 Decimal 오류가 해결됩니다.
-        elif isinstance(obj, decimal.Decimal):
-            return float(obj)
-        return super(NumpyEncoder, self).default(obj)
-
 @analysis_bp.route("/xy-options", methods=["GET"])
 def get_xy_options():
     """
@@ -87,14 +71,11 @@ def get_xy_options():
             elif gbn == 'y':
                 options["y_options"].append(col_1)
         
-        # 한글 깨짐 방지를 위해 json.dumps와 Response 사용
-        json_response = json.dumps(options, ensure_ascii=False)
-        return Response(json_response, mimetype='application/json')
+        return jsonify(options)
 
     except Exception as e:
         # 오류 발생 시 한글 오류 메시지 반환
-        error_response = json.dumps({"error": str(e)}, ensure_ascii=False)
-        return Response(error_response, status=500, mimetype='application/json')
+        return jsonify({"error": str(e)}), 500
 
 # 상관분석 X축, Y축 선택
 # [최종] /dynamic-analysis (JOIN ON ymd 쿼리로 교체)
@@ -165,7 +146,7 @@ def dynamic_analysis():
         if len(df) < 2:
             conn.close()
             error_msg = {"error": "분석에 필요한 데이터 쌍(pair)이 부족합니다."}
-            return Response(json.dumps(error_msg, ensure_ascii=False), status=400, mimetype='application/json')
+            return jsonify(error_msg), 400
 
         # --- 3. 분석 수행 ---
         correlation = df['x_amt'].corr(df['y_amt'])
@@ -210,8 +191,8 @@ def dynamic_analysis():
         insert_params = (
             '관리자', x_variable_str, y_variable_str, correlation, r_squared, 
             equation_str, interpretation_str,
-            json.dumps(scatter_points, cls=NumpyEncoder), 
-            json.dumps(line_points_data_for_db, cls=NumpyEncoder)
+            json_dumps(scatter_points), 
+            json_dumps(line_points_data_for_db)
         )
         
         # 1. INSERT 실행
@@ -237,13 +218,11 @@ def dynamic_analysis():
             "scatter_data": scatter_points, "line_data": line_points_data
         }
         
-        json_response = json.dumps(response_data, cls=NumpyEncoder, ensure_ascii=False)
-        return Response(json_response, mimetype='application/json')
+        return jsonify(response_data)
 
     except Exception as e:
         print(f"Error occurred in /dynamic-analysis: {e}") 
-        error_response = json.dumps({"error": f"분석 중 오류 발생: {str(e)}"}, ensure_ascii=False)
-        return Response(error_response, status=500, mimetype='application/json')
+        return jsonify({"error": f"분석 중 오류 발생: {str(e)}"}), 500
     
 @analysis_bp.route("/collect-data", methods=["GET"])
 def collect_data():
@@ -274,7 +253,7 @@ def collect_data():
                 "col_1": row[1],
                 "amt": row[2]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -350,7 +329,7 @@ def dynamic_analysis_2nd():
 
         if len(df) < 3: # 2차 분석은 최소 3개의 데이터 필요
             error_msg = {"error": "분석에 필요한 데이터 쌍(pair)이 부족합니다."}
-            return Response(json.dumps(error_msg, ensure_ascii=False), status=400, mimetype='application/json')
+            return jsonify(error_msg), 400
 
         # --- 3. 분석 수행 (2차 비선형 회귀) ---
         X = df[['x_amt']] # 'x_amt' 컬럼명을 feature 이름으로 사용
@@ -408,13 +387,11 @@ def dynamic_analysis_2nd():
         }
         
         # --- 5. 최종 JSON 응답 생성 (DB 저장 로직 없음) ---
-        json_response = json.dumps(response_data, cls=NumpyEncoder, ensure_ascii=False)
-        return Response(json_response, mimetype='application/json')
+        return jsonify(response_data)
 
     except Exception as e:
         print(f"Error occurred in /dynamic-analysis-2nd-order: {e}")
-        error_response = json.dumps({"error": f"분석 중 오류 발생: {str(e)}"}, ensure_ascii=False)
-        return Response(error_response, status=500, mimetype='application/json')
+        return jsonify({"error": f"분석 중 오류 발생: {str(e)}"}), 500
     
 # --- 1. 분석 이력 목록 조회 API ---
 @analysis_bp.route("/history", methods=["GET"])
@@ -453,11 +430,11 @@ def get_analysis_history():
             
         conn.close()
 
-        return Response(json.dumps(history_list, cls=NumpyEncoder, ensure_ascii=False), mimetype='application/json')
+        return jsonify(history_list)
 
     except Exception as e:
         print(f"Error occurred in /history: {e}")
-        return Response(json.dumps({"error": f"오류 발생: {str(e)}"}, ensure_ascii=False), status=500, mimetype='application/json')
+        return jsonify({"error": f"오류 발생: {str(e)}"}), 500
 
 # --- 2. 분석 결과 상세 조회 API ---
 @analysis_bp.route("/result-report", methods=["GET"])
@@ -511,8 +488,8 @@ def get_analysis_result_report():
             "line_data": formatted_line_data # 수정된 데이터를 사용
         }
 
-        return Response(json.dumps(report_data, cls=NumpyEncoder, ensure_ascii=False), mimetype='application/json')
+        return jsonify(report_data)
 
     except Exception as e:
         print(f"Error occurred in /report for id {analysis_id}: {e}")
-        return Response(json.dumps({"error": f"오류 발생: {str(e)}"}, ensure_ascii=False), status=500, mimetype='application/json')
\ No newline at end of file
+        return jsonify({"error": f"오류 발생: {str(e)}"}), 500
\ No newline at end of file
@@ -1,7 +1,10 @@
 # resources/insert.py
 import os
 from flask import Blueprint, jsonify, request
-from db import get_db_connection, DecimalEncoder
+from db import get_db_connection
+from services.sequence import insert_with_code
+from services.bulk import read_items, bulk_result, executemany_or_each
+from services.reel_split import check_reel_params, split_reels
 from datetime import datetime
 from werkzeug.utils import secure_filename
 
@@ -55,36 +58,21 @@ def suju_insert():
         # 2) prefix 생성: B + 연도2자리 + 월2자리 + "D"
         prefix = f"B{yy}{mm}D"
 
-        # 3) 현재 prefix로 시작하는 suju_cd 중 최댓값을 조회하여 seq + 1
-        check_sql = f"SELECT MAX(suju_cd) FROM suju_mst WHERE suju_cd LIKE '{prefix}%'"
-        cur.execute(check_sql)
-        row = cur.fetchone()
-
-        if row and row[0]:
-            # 예: B2503D00012
-            last_code = row[0]
-            # 뒤 5자리를 숫자로 변환
-            last_seq = int(last_code[-5:])
-            new_seq = last_seq + 1
-        else:
-            new_seq = 1
-
-        # 4) 5자리로 zero-fill
-        seq_str = str(new_seq).zfill(5)  # 예: "00013"
-
-        # 5) 최종 suju_cd 조합
-        suju_cd = prefix + seq_str
-
-        # 6) 들어온 suju_dt, out_dt_to 값에서 '-' 제거 (예: "2025-03-06" -> "20250306")
+        # 3) 들어온 suju_dt, out_dt_to 값에서 '-' 제거 (예: "2025-03-06" -> "20250306")
         suju_dt = suju_dt.replace("-", "")
         out_dt_to = out_dt_to.replace("-", "")
 
-        # 7) INSERT
+        # 4) suju_cd 채번(prefix + 5자리, 예: B2503D00013) 후 INSERT
+        #    번호는 services/sequence 가 미리 예약한 구간에서 받고, 중복 키면 새 번호로 재시도
         insert_sql = """
             INSERT INTO suju_mst (suju_cd, suju_seq, suju_gbn, suju_dt, out_dt_to, jepum_cd, vender_cd, amt, bigo, process_cd)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        cur.execute(insert_sql, (suju_cd, suju_seq, suju_gbn, suju_dt, out_dt_to, jepum_cd, vender_cd, amt, bigo, process_cd))
+        suju_cd = insert_with_code(conn, v_db, "suju_mst", "suju_cd", prefix, lambda code: cur.execute(
+            insert_sql, (code, suju_seq, suju_gbn, suju_dt, out_dt_to, jepum_cd, vender_cd, amt, bigo, process_cd)))
+        if suju_cd is None:
+            conn.close()
+            return jsonify({"error": f"DB connection failed for {v_db}"}), 500
         conn.commit()
         conn.close()
 
@@ -139,35 +127,20 @@ def stock_insert_out():
         # 2) prefix 생성: B + 연도2자리 + 월2자리 + "I"
         prefix = f"B{yy}{mm}I"
 
-        # 3) 현재 prefix로 시작하는 inout_no 중 최댓값을 조회하여 seq + 1
-        check_sql = f"SELECT MAX(inout_no) FROM stock_mst WHERE inout_no LIKE '{prefix}%'"
-        cur.execute(check_sql)
-        row = cur.fetchone()
-
-        if row and row[0]:
-            # 예: B2503I00012
-            last_code = row[0]
-            # 뒤 5자리를 숫자로 변환
-            last_seq = int(last_code[-5:])
-            new_seq = last_seq + 1
-        else:
-            new_seq = 1
-
-        # 4) 5자리로 zero-fill
-        seq_str = str(new_seq).zfill(5)  # 예: "00013"
-
-        # 5) 최종 inout_no 조합
-        inout_no = prefix + seq_str
-
-        # 6) 들어온 inout_dt 값에서 '-' 제거 (예: "2025-03-06" -> "20250306")
+        # 3) 들어온 inout_dt 값에서 '-' 제거 (예: "2025-03-06" -> "20250306")
         inout_dt = inout_dt.replace("-", "")
 
-        # 7) INSERT
+        # 4) inout_no 채번(prefix + 5자리, 예: B2503I00013) 후 INSERT
+        #    번호는 services/sequence 가 미리 예약한 구간에서 받고, 중복 키면 새 번호로 재시도
         insert_sql = """
             INSERT INTO stock_mst (inout_no, inout_seq, inout_gbn, inout_dt, jepum_cd, confirm_amt, process_fg, rcv_nm, stock_cd_from, stock_cd_to, write_nm, tm_1, vender_cd, bigo)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        cur.execute(insert_sql, (inout_no, inout_seq, inout_gbn, inout_dt, jepum_cd, confirm_amt, process_fg, rcv_nm, stock_cd_from, stock_cd_to, write_nm, tm_1, vender_cd, bigo))
+        inout_no = insert_with_code(conn, v_db, "stock_mst", "inout_no", prefix, lambda code: cur.execute(
+            insert_sql, (code, inout_seq, inout_gbn, inout_dt, jepum_cd, confirm_amt, process_fg, rcv_nm, stock_cd_from, stock_cd_to, write_nm, tm_1, vender_cd, bigo)))
+        if inout_no is None:
+            conn.close()
+            return jsonify({"error": f"DB connection failed for {v_db}"}), 500
         conn.commit()
         conn.close()
 
@@ -238,6 +211,80 @@ def insert_test_result():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# 유니레즈 test 실적 일괄 등록 API
+# Body: [{"lot_no", "jepum_cd", "amt", "man_cd", "work_dt", "bin_no", "lot_no2", "dev_no"}, ...]
+# 검증 후 fast_executemany 한 번 + 커밋 한 번으로 등록하고, 항목별 결과를 반환합니다. (services/bulk)
+@etc_insert_bp.route("/test-result/bulk", methods=["POST"])
+def insert_test_result_bulk():
+    v_db = request.args.get("v_db")
+    if not v_db:
+        return jsonify({"error": "v_db 파라미터가 필요합니다."}), 400
+
+    items, error = read_items()
+    if error:
+        return jsonify({"error": error}), 400
+
+    results, rows, seen = [], [], set()
+    for i, item in enumerate(items):
+        lot_no   = item.get("lot_no")
+        jepum_cd = item.get("jepum_cd")
+        amt      = item.get("amt")
+        man_cd   = item.get("man_cd")
+        work_dt  = str(item.get("work_dt") or "").replace("-", "")
+        texts    = [lot_no, jepum_cd, man_cd] + [item.get(k, "") for k in ("bin_no", "lot_no2", "dev_no")]
+        if not all([lot_no, jepum_cd, amt, man_cd, work_dt]):
+            results.append({"index": i, "ok": False, "error": "필수 필드(lot_no, jepum_cd, amt, man_cd, work_dt) 누락"})
+        elif not all(isinstance(t, str) for t in texts):
+            results.append({"index": i, "ok": False, "error": "lot_no, jepum_cd, man_cd, bin_no, lot_no2, dev_no 는 문자열이어야 합니다."})
+        elif isinstance(amt, bool) or not isinstance(amt, (int, float)) or amt <= 0:
+            results.append({"index": i, "ok": False, "error": "amt 는 0보다 큰 숫자여야 합니다."})
+        elif len(work_dt) != 8 or not work_dt.isdigit():
+            results.append({"index": i, "ok": False, "error": "work_dt 형식 오류 (YYYYMMDD)"})
+        elif lot_no in seen:
+            results.append({"index": i, "ok": False, "error": f"같은 요청 안에 중복된 lot_no: {lot_no}"})
+        else:
+            try:
+                man_cd_enc = man_cd.encode('euc-kr')
+            except UnicodeEncodeError:
+                results.append({"index": i, "ok": False, "error": "man_cd 에 EUC-KR 로 저장할 수 없는 문자가 있습니다."})
+                continue
+            seen.add(lot_no)
+            rows.append((i, (
+                lot_no, jepum_cd, amt, man_cd_enc, texts[3],
+                work_dt, texts[4], texts[5]
+            )))
+
+    if not rows:
+        return jsonify(bulk_result(results)), 400
+
+    try:
+        conn = get_db_connection(v_db)
+        if not conn:
+            return jsonify({"error": f"DB 연결 실패: {v_db}"}), 500
+
+        query = """
+            INSERT INTO lot_hst (
+                lot_no, jepum_cd, amt, man_cd, bigo_1, work_dt, prg_cd,
+                lot_no2, dev_no, lot_seq
+            )
+            VALUES (?, ?, ?, ?, ?, ?, '170', ?, ?, 1)
+        """
+        # DB 에서 실패한 항목(이미 있는 lot_no 등)은 그 항목만 제외하고 나머지는 등록
+        errors = executemany_or_each(conn, query, [params for _, params in rows])
+        conn.commit()
+        conn.close()
+
+        for (i, params), err in zip(rows, errors):
+            if err is None:
+                results.append({"index": i, "ok": True, "lot_no": params[0]})
+            else:
+                results.append({"index": i, "ok": False, "lot_no": params[0], "error": err})
+        body = bulk_result(results)
+        return jsonify(body), 200 if body["inserted"] else 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @etc_insert_bp.route("/tapping-result", methods=["POST"])
 def insert_tapping():
     v_db = request.args.get("v_db")
@@ -252,7 +299,7 @@ def insert_tapping():
     amt          = data.get("amt")
     reel_count   = data.get("reel_count")
     reel_min_amt = data.get("reel_min_amt")
-    man_cd       = data.get("man_cd").encode('euc-kr')
+    man_cd       = data.get("man_cd")
     bin_no       = data.get("bin_no", "")
     jepum_cd     = data.get("jepum_cd", "")
     
@@ -263,6 +310,11 @@ def insert_tapping():
 
     if not all([lot_no, amt, reel_count, reel_min_amt, man_cd]):
         return jsonify({"error": "필수 필드 누락"}), 400
+    # 릴 분할 값은 DB 작업 전에 확인 (음수/소수 reel_count 등)
+    error = check_reel_params(amt, reel_count, reel_min_amt)
+    if error:
+        return jsonify({"error": error}), 400
+    man_cd = man_cd.encode('euc-kr')
 
     try:
         conn = get_db_connection(v_db)
@@ -290,36 +342,21 @@ def insert_tapping():
             conn.close()
             return jsonify({"error": "이미 Taping(180) 등록된 LOT"}), 400
 
-        # 3) reel_count 만큼 INSERT
-        leftover = amt
-        for i in range(1, reel_count+1):
-            if leftover > reel_min_amt:
-                use_qty = reel_min_amt
-            else:
-                use_qty = leftover
-
-            if i == reel_count:
-                leftover_after = leftover - use_qty
-                bigo_a1 = leftover_after
-            else:
-                bigo_a1 = 0
-
-            # 쿼리문에 bigo_3, bigo_4를 추가합니다.
-            sql_ins = """
-                INSERT INTO lot_hst
-                (lot_no, prg_cd, lot_seq, amt, man_cd, jepum_cd,
-                 work_dt, bigo_1, bigo_a1, bigo_3, bigo_4)
-                VALUES
-                (?, '180', ?, ?, ?, ?,
-                 CONVERT(varchar, GETDATE(), 112), ?, ?, ?, ?)
-            """
-            cur.execute(sql_ins, (
-                lot_no, i, use_qty, man_cd, jepum_cd, bin_no, bigo_a1, bigo_3, bigo_4
-            ))
-
-            leftover -= use_qty
-            if leftover < 0:
-                leftover = 0
+        # 3) reel_count 만큼 INSERT (릴 분할은 services/reel_split 에서 한 번에 계산, executemany 한 번으로 전송)
+        # 쿼리문에 bigo_3, bigo_4를 추가합니다.
+        sql_ins = """
+            INSERT INTO lot_hst
+            (lot_no, prg_cd, lot_seq, amt, man_cd, jepum_cd,
+             work_dt, bigo_1, bigo_a1, bigo_3, bigo_4)
+            VALUES
+            (?, '180', ?, ?, ?, ?,
+             CONVERT(varchar, GETDATE(), 112), ?, ?, ?, ?)
+        """
+        cur.fast_executemany = True
+        cur.executemany(sql_ins, [
+            (lot_no, i, use_qty, man_cd, jepum_cd, bin_no, bigo_a1, bigo_3, bigo_4)
+            for i, use_qty, bigo_a1 in split_reels(amt, reel_count, reel_min_amt)
+        ])
 
         conn.commit()
         conn.close()
@@ -3,7 +3,13 @@ from flask import Blueprint, send_from_directory, jsonify, request
 import json
 import os
 import traceback  # <--- 1. 이 줄을 추가하세요.
-from db import get_db_connection, DecimalEncoder
+from db import get_db_connection
+from services.json_provider import jsonify_numeric  # Decimal 을 숫자로 (기존 DecimalEncoder 응답 형식)
+from services.pagination import encode_cursor, decode_cursor, parse_limit
+from services.smart_log_cache import parse_dt
+from services.delta_snapshot import delta_response
+from services.lot_index import get_lot_index
+from services.ref_cache import get_ref
 
 # 거래처(고객) 조회용 블루프린트
 vender_select_bp = Blueprint("vender_select_bp", __name__) # 거래처 조회용 블루프린트...........1
@@ -63,7 +69,7 @@ def vender_select_all():
                 "address1": row[3],
                 "tel": row[4]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         # --- 2. 아래 두 줄을 추가하세요. ---
         print(f"!!! ERROR at {request.path} (v_db={v_db}) !!!")
@@ -104,7 +110,7 @@ def vender_select_out():
                 "address1": row[3],
                 "tel": row[4]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -145,7 +151,7 @@ def jepum_select_all():
                 "jepum_cd": row[0],
                 "jepum_nm": row[1]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -179,7 +185,7 @@ def jepum_select_jepum():
                 "jepum_cd": row[0],
                 "jepum_nm": row[1]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -224,7 +230,7 @@ def stock_select_jepum():
                 "spec": row[2],
                 "amt": row[3]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -247,16 +253,17 @@ def stock_select_jepum_out():
         cur = conn.cursor()
         # 제품 테이블 조회 예시 (테이블 이름은 예시)
         query = """
-            SELECT a.inout_no, a.inout_dt, a.jepum_cd, b.jepum_nm, a.confirm_amt, a.vender_cd, c.vender_nm, a.stock_cd_from, a.stock_cd_to
+            SELECT a.inout_no, a.inout_dt, a.jepum_cd, a.confirm_amt, a.vender_cd, a.stock_cd_from, a.stock_cd_to
             FROM stock_mst a
-            LEFT OUTER JOIN jepum_code b ON a.jepum_cd = b.jepum_cd
-            LEFT OUTER JOIN vender_code c ON a.vender_cd = c.vender_cd            
             WHERE a.inout_gbn = 'KZ' AND a.inout_dt >= ? AND a.inout_dt <= ?
             ORDER BY a.inout_dt desc
         """
         cur.execute(query, (from_dt, to_dt))
         rows = cur.fetchall()
         conn.close()
+        # 제품명, 거래처명은 기준정보 캐시에서 (services/ref_cache.py)
+        jepum = get_ref(v_db, "jepum")
+        vender = get_ref(v_db, "vender")
 
         data = []
         for row in rows:
@@ -264,14 +271,14 @@ def stock_select_jepum_out():
                 "inout_no": row[0],
                 "inout_dt": row[1],
                 "jepum_cd": row[2],
-                "jepum_nm": row[3],
-                "confirm_amt": row[4],
-                "vender_cd": row[5],
-                "vender_nm": row[6],
-                "stock_cd_from": row[7],
-                "stock_cd_to": row[8]
+                "jepum_nm": jepum.name(row[2]),
+                "confirm_amt": row[3],
+                "vender_cd": row[4],
+                "vender_nm": vender.name(row[4]),
+                "stock_cd_from": row[5],
+                "stock_cd_to": row[6]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -300,16 +307,17 @@ def suju_select_all():
         
         cur = conn.cursor()
         query = """
-            SELECT a.suju_cd, a.suju_dt, a.out_dt_to, a.jepum_cd, b.jepum_nm, a.vender_cd, c.vender_nm, a.amt, a.bigo, a.process_cd
+            SELECT a.suju_cd, a.suju_dt, a.out_dt_to, a.jepum_cd, a.vender_cd, a.amt, a.bigo, a.process_cd
             FROM suju_mst a
-            LEFT OUTER JOIN jepum_code b ON a.jepum_cd = b.jepum_cd
-            LEFT OUTER JOIN vender_code c ON a.vender_cd = c.vender_cd
             WHERE a.suju_dt >= ? AND a.suju_dt <= ?
             ORDER BY a.write_dt
         """
         cur.execute(query, (from_dt, to_dt))
         rows = cur.fetchall()
         conn.close()
+        # 제품명, 거래처명은 기준정보 캐시에서 (services/ref_cache.py)
+        jepum = get_ref(v_db, "jepum")
+        vender = get_ref(v_db, "vender")
         
         data = []
         for row in rows:
@@ -318,14 +326,14 @@ def suju_select_all():
                 "suju_dt": row[1],
                 "out_dt_to": row[2],
                 "jepum_cd": row[3],
-                "jepum_nm": row[4],
-                "vender_cd": row[5],
-                "vender_nm": row[6],
-                "amt": row[7],
-                "bigo": row[8],
-                "process_cd": row[9]
+                "jepum_nm": jepum.name(row[3]),
+                "vender_cd": row[4],
+                "vender_nm": vender.name(row[4]),
+                "amt": row[5],
+                "bigo": row[6],
+                "process_cd": row[7]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -361,7 +369,7 @@ def equip_select_mst():
                 "equip_cd": row[0],
                 "equip_nm": row[1]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -407,7 +415,7 @@ def equip_select_inspect():
                 "equip_dt": row[2],
                 "diff_dt": row[3]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -436,16 +444,15 @@ def segsan_process_result():
         cur = conn.cursor()
 
         # segsan_mst에서 prg_cd가 요청 파라미터로 넘어온 값과 일치하는 행만 조회
-        # jepum_code와 JOIN하여 제품명을 가져오고,
+        # 제품명은 JOIN 대신 기준정보 캐시에서 붙이고 (services/ref_cache.py),
         # segsan_dt는 "yy-MM-dd" 형태로 변환
         query = """
-            SELECT s.jepum_cd, j.jepum_nm, s.amt,
+            SELECT s.jepum_cd, s.amt,
                    SUBSTRING(CONVERT(varchar, s.segsan_dt, 112), 3, 2) + '-' +
                    SUBSTRING(CONVERT(varchar, s.segsan_dt, 112), 5, 2) + '-' +
                    SUBSTRING(CONVERT(varchar, s.segsan_dt, 112), 7, 2) AS segsan_dt,
                    s.lot_no
             FROM segsan_mst s
-            LEFT JOIN jepum_code j ON s.jepum_cd = j.jepum_cd
             WHERE s.prg_cd = ?
               AND s.segsan_dt >= ?
               AND s.segsan_dt <= ?
@@ -454,18 +461,19 @@ def segsan_process_result():
         cur.execute(query, (prg_cd, from_dt, to_dt))
         rows = cur.fetchall()
         conn.close()
+        jepum = get_ref(v_db, "jepum")
 
         data = []
         for row in rows:
             data.append({
                 "jepum_cd": row[0],
-                "jepum_nm": row[1],
-                "amt":      row[2],
-                "segsan_dt": row[3],
-                "lot_no":    row[4]
+                "jepum_nm": jepum.name(row[0]),
+                "amt":      row[1],
+                "segsan_dt": row[2],
+                "lot_no":    row[3]
             })
 
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -484,9 +492,8 @@ def select_test_result():
         conn = get_db_connection(v_db)
         cur = conn.cursor()
         query = """
-            SELECT h.lot_no, h.jepum_cd, j.jepum_nm, h.amt, h.man_cd, h.bigo_1, h.work_dt, h.lot_no2, h.dev_no
+            SELECT h.lot_no, h.jepum_cd, h.amt, h.man_cd, h.bigo_1, h.work_dt, h.lot_no2, h.dev_no
             FROM lot_hst h
-            LEFT JOIN jepum_code j ON h.jepum_cd = j.jepum_cd
             WHERE h.prg_cd = '170'
               AND h.work_dt >= ? AND h.work_dt <= ?
             ORDER BY h.work_dt DESC
@@ -494,20 +501,25 @@ def select_test_result():
         cur.execute(query, (from_dt, to_dt))
         rows = cur.fetchall()
         conn.close()
+        jepum = get_ref(v_db, "jepum")   # 제품명은 기준정보 캐시에서 (services/ref_cache.py)
         data = []
         for row in rows:
             data.append({
                 "lot_no": row[0],
                 "jepum_cd": row[1],
-                "jepum_nm": row[2],
-                "amt": row[3],
-                "man_cd": row[4],
-                "bigo_1": row[5],
-                "work_dt": row[6],
-                "lot_no2": row[7],
-                "dev_no":row[8]
+                "jepum_nm": jepum.name(row[1]),
+                "amt": row[2],
+                "man_cd": row[3],
+                "bigo_1": row[4],
+                "work_dt": row[5],
+                "lot_no2": row[6],
+                "dev_no":row[7]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        # ?since=<토큰> : 이전 응답 이후 추가/변경/삭제된 행만 (빈 값이면 전체 + 토큰)
+        if "since" in request.args:
+            scope = (v_db, "test-result", from_dt, to_dt)
+            return jsonify_numeric(delta_response(data, "lot_no", scope, request.args.get("since"))), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -521,33 +533,18 @@ def select_lot_no_inform():
     if not lot_no2:
         return jsonify({"error": "lot_no2 parameters are required"}), 400
     try:
-        conn = get_db_connection(v_db)
-        cur = conn.cursor()
-        # 📌 [수정] 쿼리의 WHERE 절에 OR 조건을 추가
-        query = """
-            SELECT TOP 1 h.jepum_cd, j.jepum_nm, l.bigo39, l.bigo40
-            FROM lot_mst h
-            LEFT JOIN jepum_code j ON h.jepum_cd = j.jepum_cd
-            LEFT JOIN lot_bigo l ON h.lot_no = l.lot_no
-            WHERE 
-                SUBSTRING(h.lot_no, 2, LEN(h.lot_no)) = ? 
-                OR 
-                (ISNULL(l.bigo39, '') + '-' + ISNULL(l.bigo40, '')) = ?
-        """
-        
-        # 📌 [수정] 파라미터를 2개 전달 (물음표가 2개 있으므로)
-        cur.execute(query, (lot_no2, lot_no2))
-        rows = cur.fetchall()
-        conn.close()
+        # 📌 LOT 번호(앞 1자리 제외) 또는 bigo39-bigo40 으로 조회
+        # 바코드 스캔마다 전체 스캔하지 않도록 업체별 메모리 색인에서 찾고, 없으면 DB 확인 (services/lot_index)
+        row = get_lot_index(v_db).lookup(lot_no2)
         data = []
-        for row in rows:
+        if row:
             data.append({
                 "jepum_cd": row[0],
                 "jepum_nm": row[1],
                 "bigo39": row[2],
                 "bigo40": row[3]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -576,7 +573,7 @@ def select_test_man_cd():
             data.append({
                 "emp_nmk": row[0]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -643,7 +640,7 @@ def select_tapping_result():
                 "bigo_3":    row[9],  # 추가: 작업 NO
                 "bigo_4":    row[10], # 추가: 장비명
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -707,28 +704,69 @@ def check_lot_for_tapping():
         return jsonify({"error": str(e)}), 500
     
 # 설비 데이터 수집 블루프린트...........8
+SMART_LOG_PAGE_SIZE = 1000      # limit 미지정 시 한 페이지 행 수
+SMART_LOG_PAGE_MAX = 5000       # limit 상한 (이보다 크게 요청해도 잘라냄)
+
 @smart_select_bp.route("/smart-log", methods=["GET"])
 def smart_select_equip():
+    """
+    설비 수집 로그 조회 (최신순, 키셋 페이지네이션)
+    GET /api/select/smart/smart-log?v_db=..&from_dt=2025-01-01&to_dt=2025-01-31[&auto_id=205][&limit=1000][&cursor=..]
+    - from_dt, to_dt 필수 (테이블 전체 조회 방지)
+    - 응답: {"data": [...], "next_cursor": "..." 또는 null}
+      next_cursor 가 있으면 cursor 파라미터로 넘겨 다음 페이지를 조회합니다.
+    """
     v_db = request.args.get("v_db")
     if not v_db:
         return jsonify({"error": "v_db parameter is required"}), 400
 
+    from_dt = parse_dt(request.args.get("from_dt"))
+    to_dt = parse_dt(request.args.get("to_dt"), end_of_day=True)
+    if not from_dt or not to_dt:
+        return jsonify({"error": "from_dt, to_dt parameters are required (YYYY-MM-DD)"}), 400
+
+    auto_id = request.args.get("auto_id")
+    limit = parse_limit(request.args.get("limit"), SMART_LOG_PAGE_SIZE, SMART_LOG_PAGE_MAX)
+
+    after = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_cursor(request.args.get("cursor"))
+            after_dt, after_id = after["cr_dt"], str(after["auto_id"])
+        except (ValueError, KeyError):
+            return jsonify({"error": "invalid cursor"}), 400
+
     try:
         conn = get_db_connection(v_db)
         if not conn:
             return jsonify({"error": f"DB connection failed for {v_db}"}), 500
 
         cur = conn.cursor()
-        # 제품 테이블 조회 예시 (테이블 이름은 예시)
+        # (cr_dt, auto_id) 내림차순 키셋: 직전 페이지 마지막 행보다 '뒤'인 행만 TOP (limit + 1)
         query = """
-            SELECT ymd+hh+mm as ymdhhmm, auto_id, col_1, col_2, col_3, col_4, bigo
+            SELECT TOP (?) ymd+hh+mm as ymdhhmm, auto_id, col_1, col_2, col_3, col_4, bigo, cr_dt
             FROM smart_log
-            ORDER BY ymd, hh, mm DESC
+            WHERE cr_dt >= ? AND cr_dt <= ?
         """
-        cur.execute(query)
+        params = [limit + 1, from_dt, to_dt]
+        if auto_id:
+            query += " AND auto_id = ?"
+            params.append(auto_id)
+        if after:
+            query += " AND (cr_dt < ? OR (cr_dt = ? AND auto_id < ?))"
+            params.extend([after_dt, after_dt, after_id])
+        query += " ORDER BY cr_dt DESC, auto_id DESC"
+        cur.execute(query, params)
         rows = cur.fetchall()
         conn.close()
 
+        # limit + 1 번째 행이 있으면 다음 페이지가 있음
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({"cr_dt": last[7], "auto_id": str(last[1]).strip()})
+
         data = []
         for row in rows:
             data.append({
@@ -740,7 +778,7 @@ def smart_select_equip():
                 "col_4": row[5],
                 "bigo": row[6]
             })
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify({"data": data, "next_cursor": next_cursor}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -1189,7 +1227,7 @@ def report_select_equipment_list():
                 "category": row[3]
             })
             
-        return json.dumps(data, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(data), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1229,7 +1267,7 @@ def report_select_questions():
         # 예: ['노후된 부품은 없는가?', '기구 안전 상태는 양호한가?', ...]
         question_list = [row[0] for row in rows]
         
-        return json.dumps(question_list, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(question_list), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1264,7 +1302,7 @@ def report_select_history_log():
         # 조회된 이력 로그를 하나의 리스트로 만듭니다.
         history_log = [{"code": row[0], "question": row[1], "answer": row[2], "photo_filename": row[3]} for row in rows]
 
-        return json.dumps(history_log, cls=DecimalEncoder, ensure_ascii=False), 200
+        return jsonify_numeric(history_log), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
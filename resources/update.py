@@ -1,6 +1,7 @@
 # resources/suju_update.py
 from flask import Blueprint, jsonify, request
 from db import get_db_connection
+from services.reel_split import check_reel_params, split_reels
 
 suju_update_bp = Blueprint("suju_update", __name__)
 # 이미 suju_update_bp가 존재하므로, stock_update_bp 추가
@@ -208,6 +209,10 @@ def update_tapping():
     # 여기서는 amt, reel_count, reel_min_amt, man_cd 가 모두 필요하다고 가정.
     if not all([amt, reel_count, reel_min_amt, man_cd]):
         return jsonify({"error": "필수 필드(amt, reel_count, reel_min_amt, man_cd) 누락"}), 400
+    # 릴 분할 값은 기존 180 데이터를 지우기 전에 확인 (잘못된 값이면 DELETE 전에 400)
+    error = check_reel_params(amt, reel_count, reel_min_amt)
+    if error:
+        return jsonify({"error": error}), 400
 
     # man_cd 가 한글이면 euc-kr 인코딩이 필요하다는 기존 요구사항이 있었다면
     # 아래처럼 encode 해주되, DB가 어떤 인코딩인지 확인 필요
@@ -240,38 +245,21 @@ def update_tapping():
         cur.execute(delete_sql, (lot_no,))
 
         # (3) 새로운 180 데이터 (릴 분할)로 재-insert
-        leftover = amt  # 남은 수량을 처음엔 전체로 둠
-        for i in range(1, reel_count + 1):
-            # 이번 릴에 할당할 수량 결정
-            if leftover > reel_min_amt:
-                use_qty = reel_min_amt
-            else:
-                use_qty = leftover
-
-            # 마지막 릴이라면? -> 남은 leftover를 빼고 그 값을 bigo_a1로 기록
-            if i == reel_count:
-                leftover_after = leftover - use_qty
-                bigo_a1 = leftover_after
-            else:
-                bigo_a1 = 0
-
-            # INSERT 쿼리에 bigo_3, bigo_4 추가
-            sql_ins = """
-                INSERT INTO lot_hst
-                (lot_no, prg_cd, lot_seq, amt, man_cd, jepum_cd,
-                 work_dt, bigo_1, bigo_a1, bigo_3, bigo_4)
-                VALUES
-                (?, '180', ?, ?, ?, ?,
-                 CONVERT(varchar, GETDATE(), 112), ?, ?, ?, ?)
-            """
-            cur.execute(sql_ins, (
-                lot_no, i, use_qty, man_cd_encoded, jepum_cd,
-                bin_no, bigo_a1, bigo_3, bigo_4
-            ))
-
-            leftover -= use_qty
-            if leftover < 0:
-                leftover = 0
+        #     릴별 수량/마지막 릴 잔량(bigo_a1)은 services/reel_split 에서 한 번에 계산하고 executemany 한 번으로 전송
+        # INSERT 쿼리에 bigo_3, bigo_4 추가
+        sql_ins = """
+            INSERT INTO lot_hst
+            (lot_no, prg_cd, lot_seq, amt, man_cd, jepum_cd,
+             work_dt, bigo_1, bigo_a1, bigo_3, bigo_4)
+            VALUES
+            (?, '180', ?, ?, ?, ?,
+             CONVERT(varchar, GETDATE(), 112), ?, ?, ?, ?)
+        """
+        cur.fast_executemany = True
+        cur.executemany(sql_ins, [
+            (lot_no, i, use_qty, man_cd_encoded, jepum_cd, bin_no, bigo_a1, bigo_3, bigo_4)
+            for i, use_qty, bigo_a1 in split_reels(amt, reel_count, reel_min_amt)
+        ])
 
         conn.commit()
         conn.close()
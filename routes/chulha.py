@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
 from db import get_db_connection
+from services.sequence import insert_with_code, executemany_with_codes
+from services.bulk import read_items, bulk_result
+from services.ref_cache import get_ref
 import datetime
 
 # Blueprint 설정
@@ -27,24 +30,12 @@ def insert_chulha():
         # -------------------------------------------------------
         # PK 자동생성 로직 (생산: B..., 출하: S... 로 구분 가정)
         # 예: S2512F00001 (S + YYMM + F + 일련번호)
+        # 일련번호는 services/sequence 가 예약한 구간에서 받음 (중복 키면 새 번호로 재시도)
         # -------------------------------------------------------
         yy = chulha_dt[2:4]
         mm = chulha_dt[4:6]
         prefix = f"S{yy}{mm}F" 
 
-        # chulha_mst_temp 테이블 조회
-        cur.execute(f"SELECT MAX(chulha_cd) FROM chulha_mst_temp WHERE chulha_cd LIKE '{prefix}%'")
-        row = cur.fetchone()
-        
-        # 일련번호 생성 (기존 번호가 있으면 +1, 없으면 00001)
-        if row and row[0]:
-            last_seq = int(row[0][-5:]) # 뒤 5자리 숫자 추출
-            new_seq = str(last_seq + 1).zfill(5)
-        else:
-            new_seq = "00001"
-            
-        new_chulha_cd = f"{prefix}{new_seq}"
-
         # -------------------------------------------------------
         # INSERT 실행
         # -------------------------------------------------------
@@ -54,7 +45,11 @@ def insert_chulha():
             VALUES 
             (?, ?, ?, ?, ?, ?, GETDATE())
         """
-        cur.execute(sql, (new_chulha_cd, chulha_dt, jepum_cd, vender_cd, amt, bigo))
+        new_chulha_cd = insert_with_code(conn, v_db, "chulha_mst_temp", "chulha_cd", prefix,
+                                         lambda code: cur.execute(sql, (code, chulha_dt, jepum_cd, vender_cd, amt, bigo)))
+        if new_chulha_cd is None:
+            conn.close()
+            return jsonify({"error": "DB 연결 실패"}), 500
         
         conn.commit()
         conn.close()
@@ -82,22 +77,18 @@ def get_chulha_list():
         cur = conn.cursor()
 
         # -------------------------------------------------------
-        # 조회 쿼리 (JOIN: 제품명, 거래처명 가져오기)
-        # A: 출하테이블, B: 제품테이블, C: 거래처테이블
+        # 조회 쿼리 (A: 출하테이블)
+        # 제품명, 거래처명은 JOIN 대신 기준정보 캐시에서 붙임 (services/ref_cache.py)
         # -------------------------------------------------------
         sql = """
             SELECT 
                 a.chulha_cd, 
                 a.chulha_dt, 
                 a.jepum_cd, 
-                b.jepum_nm, 
                 a.vender_cd,
-                c.vender_nm,
                 a.amt,
                 a.bigo
             FROM chulha_mst_temp a
-            LEFT JOIN jepum_code b ON a.jepum_cd = b.jepum_cd
-            LEFT JOIN vender_code c ON a.vender_cd = c.vender_cd
             WHERE a.chulha_dt BETWEEN ? AND ?
             ORDER BY a.chulha_dt DESC, a.chulha_cd DESC
         """
@@ -105,6 +96,8 @@ def get_chulha_list():
         cur.execute(sql, (from_dt, to_dt))
         rows = cur.fetchall()
         conn.close()
+        jepum = get_ref(v_db, "jepum")
+        vender = get_ref(v_db, "vender")
 
         data = []
         for row in rows:
@@ -112,11 +105,11 @@ def get_chulha_list():
                 "chulha_cd": row[0],
                 "chulha_dt": row[1],
                 "jepum_cd": row[2],
-                "jepum_nm": row[3], # 제품명
-                "vender_cd": row[4],
-                "vender_nm": row[5], # 거래처명
-                "amt": float(row[6]) if row[6] else 0,
-                "bigo": row[7] if row[7] else ""
+                "jepum_nm": jepum.name(row[2]), # 제품명
+                "vender_cd": row[3],
+                "vender_nm": vender.name(row[3]), # 거래처명
+                "amt": float(row[4]) if row[4] else 0,
+                "bigo": row[5] if row[5] else ""
             })
             
         return jsonify(data), 200
@@ -178,4 +171,70 @@ def delete_chulha():
         return jsonify({"message": "삭제 성공"}), 200
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+# ==============================================================
+#  5. [POST] 출하실적 일괄 등록
+#  Body: [{"chulha_dt": "20251201", "jepum_cd": "...", "vender_cd": "...", "amt": 10, "bigo": ""}, ...]
+#  검증 -> chulha_cd 일괄 채번 -> fast_executemany 한 번 -> 커밋 한 번 (services/bulk)
+# ==============================================================
+@chulha_bp.route('/insert-bulk', methods=['POST'])
+def insert_chulha_bulk():
+    v_db = request.args.get("v_db")
+    if not v_db: return jsonify({"error": "v_db missing"}), 400
+
+    items, error = read_items()
+    if error: return jsonify({"error": error}), 400
+
+    results, rows = [], []
+    for i, item in enumerate(items):
+        chulha_dt = str(item.get("chulha_dt") or "").replace("-", "")
+        jepum_cd  = item.get("jepum_cd")
+        vender_cd = item.get("vender_cd")
+        amt       = item.get("amt", 0)
+        bigo      = item.get("bigo", "")
+        if len(chulha_dt) != 8 or not chulha_dt.isdigit():
+            results.append({"index": i, "ok": False, "error": "chulha_dt 형식 오류 (YYYYMMDD)"})
+        elif not jepum_cd:
+            results.append({"index": i, "ok": False, "error": "jepum_cd 누락"})
+        elif isinstance(amt, bool) or not isinstance(amt, (int, float)):
+            results.append({"index": i, "ok": False, "error": "amt 는 숫자여야 합니다."})
+        else:
+            rows.append((i, chulha_dt, jepum_cd, vender_cd, amt, bigo))
+
+    if not rows:
+        return jsonify(bulk_result(results)), 400
+
+    try:
+        conn = get_db_connection(v_db)
+        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
+
+        sql = """
+            INSERT INTO chulha_mst_temp 
+            (chulha_cd, chulha_dt, jepum_cd, vender_cd, amt, bigo, write_dt)
+            VALUES 
+            (?, ?, ?, ?, ?, ?, GETDATE())
+        """
+        # PK 는 출하일자 연월별 prefix (S + YYMM + F) 로 채번
+        prefixes = [f"S{r[1][2:4]}{r[1][4:6]}F" for r in rows]
+        inserted = executemany_with_codes(conn, v_db, "chulha_mst_temp", "chulha_cd", prefixes, sql,
+                                       lambda k, code: (code,) + rows[k][1:])
+        if inserted is None:
+            conn.close()
+            return jsonify({"error": "DB 연결 실패"}), 500
+        conn.commit()
+        conn.close()
+
+        # DB 에서 실패한 항목(FK, 길이 초과 등)은 그 항목만 제외하고 나머지는 등록됨
+        codes, errors = inserted
+        for r, code, err in zip(rows, codes, errors):
+            if err is None:
+                results.append({"index": r[0], "ok": True, "chulha_cd": code})
+            else:
+                results.append({"index": r[0], "ok": False, "error": err})
+        body = bulk_result(results)
+        return jsonify(body), 200 if body["inserted"] else 400
+    except Exception as e:
+        print(f"Insert Error: {e}") # 디버깅용 로그
+        return jsonify({"error": str(e)}), 500
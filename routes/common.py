@@ -2,6 +2,8 @@
 
 from flask import Blueprint, request, jsonify
 from db import get_db_connection  # db.py가 루트에 있다고 가정 (경로에 따라 ..utils 등으로 수정)
+from services.http_cache import make_etag, not_modified, with_etag
+from services.ref_cache import get_ref, sql_equal
 import datetime
 
 common_bp = Blueprint('common', __name__, url_prefix='/api/common')
@@ -20,43 +22,34 @@ def get_jepum_list():
         return jsonify({"error": "v_db 파라미터가 필요합니다."}), 400
 
     try:
-        conn = get_db_connection(v_db)
-        cur = conn.cursor()
-
-        # 2. 기본 쿼리 작성 (WHERE 1=1은 조건을 뒤에 편하게 붙이기 위한 꼼수입니다)
-        sql = "SELECT jepum_cd, jepum_nm FROM jepum_code WHERE 1=1"
-        params = []
-
-        # 3. 파라미터가 있으면 조건 추가 (완제품만 조회)
-        if tab_gbn_cd:
-            sql += " AND tab_gbn_cd = ?"
-            params.append(tab_gbn_cd)
-
-        # [수정 2] jepum_flg2 조건 추가 (파라미터가 있을 때만 동작)
-        if jepum_flg2:
-            sql += " AND jepum_flg2 = ?"
-            params.append(jepum_flg2)
+        # 제품 기준정보는 업체별 메모리 캐시에서 조회 (services/ref_cache.py)
+        jepum = get_ref(v_db, "jepum")
+
+        # 캐시 내용이 직전 응답과 같으면 304
+        etag = make_etag(v_db, "jepum", tab_gbn_cd, jepum_flg2, sort_type, jepum.version)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        # 2~3. 파라미터가 있으면 조건 적용 (완제품만 조회 등)
+        rows = [
+            row for row in jepum.rows.values()
+            if (not tab_gbn_cd or sql_equal(row["tab_gbn_cd"], tab_gbn_cd))
+            and (not jepum_flg2 or sql_equal(row["jepum_flg2"], jepum_flg2))
+        ]
 
         # [수정됨] 정렬 조건 단순화 (오름차순 전용)
-        # sort_type이 'cd'면 코드순, 그 외엔 이름순
-        if sort_type == 'cd':
-            sql += " ORDER BY jepum_cd"
-        else:
-            sql += " ORDER BY jepum_nm"
-
-        # 쿼리 실행 (params 튜플로 변환)
-        cur.execute(sql, tuple(params))
-        rows = cur.fetchall()
-        conn.close()
+        # sort_type이 'cd'면 코드순, 그 외엔 이름순 (DB ORDER BY 와 같은 순서)
+        rows = jepum.ordered(rows, "code" if sort_type == 'cd' else "name")
 
         data = []
         for row in rows:
             data.append({
-                "jepum_cd": row[0],
-                "jepum_nm": row[1]
+                "jepum_cd": row["jepum_cd"],
+                "jepum_nm": row["jepum_nm"]
             })
-            
-        return jsonify(data), 200
+
+        return with_etag(jsonify(data), etag), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -74,34 +67,29 @@ def get_vender_list():
         return jsonify({"error": "v_db 파라미터가 필요합니다."}), 400
 
     try:
-        conn = get_db_connection(v_db)
-        cur = conn.cursor()
-
-        # 1. 기본 쿼리 (vender_code 테이블)
-        sql = "SELECT vender_cd, vender_nm FROM vender_code WHERE 1=1"
-        params = []
+        # 1. 거래처 기준정보는 업체별 메모리 캐시에서 조회 (services/ref_cache.py)
+        vender = get_ref(v_db, "vender")
 
-        # 2. 구분 코드가 있으면 조건 추가
-        if tab_gbn_cd:
-            sql += " AND tab_gbn_cd = ?"
-            params.append(tab_gbn_cd)
+        etag = make_etag(v_db, "vender", tab_gbn_cd, vender.version)
+        cached = not_modified(etag)
+        if cached:
+            return cached
 
-        sql += " ORDER BY vender_nm"
-        
-        cur.execute(sql, tuple(params))
-        rows = cur.fetchall()
-        conn.close()
+        # 2. 구분 코드가 있으면 조건 적용
+        rows = [row for row in vender.rows.values() if not tab_gbn_cd or sql_equal(row["tab_gbn_cd"], tab_gbn_cd)]
+        rows = vender.ordered(rows, "name")
 
         data = []
         for row in rows:
             # 리액트에서 사용할 키 이름도 'vender_'로 통일
             data.append({
-                "vender_cd": row[0],
-                "vender_nm": row[1]
+                "vender_cd": row["vender_cd"],
+                "vender_nm": row["vender_nm"]
             })
 
-        return jsonify(data), 200
+        return with_etag(jsonify(data), etag), 200
 
     except Exception as e:
         print(f"Error fetching vender list: {str(e)}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
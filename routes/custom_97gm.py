@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, jsonify
 from db import get_db_connection
+from services.http_cache import make_etag, not_modified, with_etag
 
 bp_97gm = Blueprint('custom_97gm', __name__)
 
@@ -9,6 +10,36 @@ bp_97gm = Blueprint('custom_97gm', __name__)
 # [97gm 전용] 통합 제품 목록 조회
 # URL: /api/97gm/jepum/line
 # ==========================================
+def _load_jepum_line(v_db):
+    """
+    jepum_code_line_v3 목록과 ETag(목록 내용 해시)를 반환합니다.
+    재고(stock_tot)가 실시간 값이므로 요청마다 뷰를 조회합니다. (ETag 는 응답 전송량만 줄임)
+    """
+    conn = get_db_connection(v_db)
+    if conn is None:
+        raise ConnectionError(f"DB 연결 실패: {v_db}")
+    try:
+        cur = conn.cursor()
+        # 완제품 등록/생산 등록 등에서 사용하는 공통 뷰 (v3)
+        cur.execute("SELECT * FROM jepum_code_line_v3 ORDER BY jepum_cd")
+        column_names = [desc[0] for desc in cur.description]
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    data = [dict(zip(column_names, row)) for row in rows]
+
+    # ✅ [추가] 리스트 API에서도 NULL 방지 처리
+    for item in data:
+        if item.get('sub_cnt') is None:
+            item['sub_cnt'] = 0
+        if item.get('stock_tot') is None:
+            item['stock_tot'] = 0
+
+    etag = make_etag(v_db, "jepum_line", [tuple(row) for row in rows])
+    return data, etag
+
+
 @bp_97gm.route('/jepum/line', methods=['GET'])
 def get_jepum_line_v_list():
     v_db = request.args.get("v_db")
@@ -16,26 +47,13 @@ def get_jepum_line_v_list():
         return jsonify({"error": "v_db 파라미터가 필요합니다."}), 400
 
     try:
-        conn = get_db_connection(v_db)
-        cur = conn.cursor()
-        
-        # 완제품 등록/생산 등록 등에서 사용하는 공통 뷰 (v3)
-        sql = "SELECT * FROM jepum_code_line_v3 ORDER BY jepum_cd"
-        cur.execute(sql)
-        
-        column_names = [desc[0] for desc in cur.description]
-        rows = cur.fetchall()
-        data = [dict(zip(column_names, row)) for row in rows]
-        
-        # ✅ [추가] 리스트 API에서도 NULL 방지 처리
-        for item in data:
-            if item.get('sub_cnt') is None:
-                item['sub_cnt'] = 0
-            if item.get('stock_tot') is None:
-                item['stock_tot'] = 0
+        # 목록 내용이 직전 응답과 같으면 내려보내지 않고 304 (ETag 는 이번 조회 결과로 만듦)
+        data, etag = _load_jepum_line(v_db)
+        cached = not_modified(etag)
+        if cached:
+            return cached
 
-        conn.close()
-        return jsonify(data), 200
+        return with_etag(jsonify(data), etag), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1,7 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, current_app
 from db import get_db_connection
 from datetime import datetime
 import json
+import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from services.smart_snapshot import get_snapshot
+from services.runtime_counter import get_runtime_totals
+from services.welding_baseline import get_welding_baseline
+from services.http_cache import make_etag, not_modified, with_etag
+from services.downsample import parse_max_points, downsample_rows
+from services.json_stream import is_stream_requested, stream_json_array, stream_json_rows
+from services.smart_log_cache import parse_dt, check_range, load_range, to_rows
+from services.rollup import get_rollup
+from services.single_flight import coalesce
+from services.channels import (get_channels, scale_columns, scale_rows, scale_value, is_running, runtime_rules,
+                               info_mask, is_info_value)
+from services.ref_cache import get_ref
 
 # Blueprint 정의
 data_bp = Blueprint('data_bp', __name__, url_prefix='/api/data')
@@ -67,6 +83,11 @@ def get_measurement_data():
             ORDER BY cr_dt DESC, auto_id
         """
         cur.execute(sql, (from_dt, to_dt)) 
+
+        # ?stream=true: fetchmany 로 나눠 읽으며 바로 전송 (장기간 조회용)
+        if is_stream_requested():
+            return stream_json_array(conn, cur, lambda i, row: [row_to_dict(row)])
+
         rows = cur.fetchall()
         conn.close()
 
@@ -107,10 +128,12 @@ def update_measurement_data():
             WHERE cr_dt = CONVERT(DATETIME, ?, 121) AND auto_id = ?
         """
         cur.execute(sql, (float(data1), float(data2), cr_dt_str, auto_id))
+        # 커넥션 반납 시 커서가 닫히면 rowcount 가 -1 로 바뀌므로 미리 보관
+        affected = cur.rowcount
         conn.commit()
         conn.close()
         
-        if cur.rowcount == 0:
+        if affected == 0:
             return jsonify({"message": "수정 실패: 일치하는 행 없음"}), 404
             
         return jsonify({"message": "수정 성공"}), 200
@@ -142,10 +165,12 @@ def delete_measurement_data():
             WHERE cr_dt = CONVERT(DATETIME, ?, 121) AND auto_id = ?
         """
         cur.execute(sql, (cr_dt_str, auto_id))
+        # 커넥션 반납 시 커서가 닫히면 rowcount 가 -1 로 바뀌므로 미리 보관
+        affected = cur.rowcount
         conn.commit()
         conn.close()
         
-        if cur.rowcount == 0:
+        if affected == 0:
             return jsonify({"message": "삭제 실패: 일치하는 행 없음"}), 404
             
         return jsonify({"message": "삭제 성공"}), 200
@@ -224,6 +249,9 @@ def get_smart_log_data():
     to_dt   = request.args.get("to_dt")   
     auto_id = request.args.get("auto_id") 
     only_valid = request.args.get("only_valid", "true")
+    # 차트용 다운샘플링 (설비별 최대 점 수, 미지정 시 원본 전체)
+    max_points = parse_max_points(request.args.get("max_points"))
+    ds_method = request.args.get("downsample", "minmax")
 
     if not v_db: return jsonify({"error": "v_db missing"}), 400
 
@@ -246,13 +274,18 @@ def get_smart_log_data():
         rows = cur.fetchall()
         conn.close()
 
+        if max_points:
+            rows = downsample_rows(rows, max_points, time_idx=9, value_idxs=[7, 8], group_idx=3, method=ds_method)
+
+        # ⭐️ [핵심] DB에는 104로 들어있으므로 프론트엔드로 보낼 땐 10.0으로 나누어 10.4V로 전달! (전체 행 한 번에)
+        values = scale_rows(rows, [7, 8], get_channels(v_db, "201", default="welding"), ["col_3", "col_4"])
+
         data = []
-        for row in rows:
+        for row, (volt, ampere) in zip(rows, values):
             data.append({
                 "ymd": row[0], "hh": row[1], "mm": row[2], "auto_id": row[3], "gbn": row[4], "bigo": row[5],
-                # ⭐️ [핵심] DB에는 104로 들어있으므로 프론트엔드로 보낼 땐 10.0으로 나누어 10.4V로 전달!
-                "col_1": (float(row[7]) / 10.0) if row[7] is not None else 0,
-                "col_2": float(row[8]) if row[8] is not None else 0,
+                "col_1": volt,
+                "col_2": ampere,
                 "cr_dt": row[9].strftime('%Y-%m-%d %H:%M:%S') if row[9] else f"{row[0]} {row[1]}:{row[2]}"
             })
         return jsonify(data), 200
@@ -349,110 +382,109 @@ def get_analysis_history():
 # ==============================================================
 # 9. [GET] 용접공정 전용 실시간 관제 및 동적 임계치 데이터 조회
 # ==============================================================
+def _build_welding_realtime(v_db):
+    """용접(201/203) 실시간 화면 데이터를 (payload, status) 로 반환합니다. (SSE 스트림과 공용)"""
+    # 실시간 값은 공유 스냅샷(smart_last)에서 가져옵니다.
+    snapshot = get_snapshot(v_db, ["201", "203"])
+    if snapshot is None: return {"error": "DB 연결 실패"}, 500
+
+    # ⭐️ [핵심] 고정값이 아니라, 전류가 전압의 0.7~1.3배 사이인 정상 '비율'을 가진 최근 5건의 평균 계산!
+    # (services/welding_baseline 링버퍼에서 새로 쌓인 로그만 반영해 유지)
+    baseline = get_welding_baseline(v_db, ["201", "203"])
+    if baseline is None: return {"error": "DB 연결 실패"}, 500
+
+    result = {
+        "201": {"realtime": {"v":0, "a":0, "time":""}, "target": {"v": 15.0, "a": 150.0}},
+        "203": {"realtime": {"v":0, "a":0, "time":""}, "target": {"v": 15.0, "a": 150.0}}
+    }
+
+    for aid, r in snapshot.items():
+        if aid in result:
+            ch = get_channels(v_db, aid, default="welding")
+            result[aid]["realtime"] = {
+                "v": scale_value(ch["col_3"], r["col_3"]), # 실시간 전압도 / 10 처리 (services/channels)
+                "a": scale_value(ch["col_4"], r["col_4"]),
+                "time": r["cr_dt"].strftime('%H:%M:%S') if r["cr_dt"] else ""
+            }
+    for aid, (avg_v, avg_a) in baseline.items():
+        if aid in result and avg_v and avg_a:
+            ch = get_channels(v_db, aid, default="welding")
+            result[aid]["target"] = {"v": round(scale_value(ch["col_3"], avg_v), 1), "a": round(scale_value(ch["col_4"], avg_a), 1)}
+
+    return result, 200
+
 @data_bp.route('/welding-realtime', methods=['GET'])
+@coalesce
 def get_welding_realtime():
     v_db = request.args.get("v_db", "18_DY")
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
-        cur = conn.cursor()
-
-        sql_last = "SELECT auto_id, col_3, col_4, cr_dt FROM dbo.smart_last WHERE auto_id IN ('201', '203')"
-        cur.execute(sql_last)
-        last_rows = cur.fetchall()
-
-        # ⭐️ [핵심] 고정값이 아니라, 전류가 전압의 0.7~1.3배 사이인 정상 '비율'을 가진 최근 5건의 평균 계산!
-        sql_baseline = """
-            SELECT auto_id, AVG(col_3)/10.0 as avg_v, AVG(col_4) as avg_a
-            FROM (
-                SELECT auto_id, col_3, col_4,
-                       ROW_NUMBER() OVER(PARTITION BY auto_id ORDER BY cr_dt DESC) as rn
-                FROM dbo.smart_log
-                WHERE auto_id IN ('201', '203') 
-                  AND col_4 BETWEEN (col_3 * 0.7) AND (col_3 * 1.3)
-            ) t
-            WHERE rn <= 5
-            GROUP BY auto_id
-        """
-        cur.execute(sql_baseline)
-        baseline_rows = cur.fetchall()
-        conn.close()
-
-        result = {
-            "201": {"realtime": {"v":0, "a":0, "time":""}, "target": {"v": 15.0, "a": 150.0}},
-            "203": {"realtime": {"v":0, "a":0, "time":""}, "target": {"v": 15.0, "a": 150.0}}
-        }
-
-        for r in last_rows:
-            aid = str(r[0])
-            if aid in result:
-                result[aid]["realtime"] = {
-                    "v": (float(r[1]) / 10.0) if r[1] else 0.0, # 실시간 전압도 / 10 처리
-                    "a": float(r[2]) if r[2] else 0.0,
-                    "time": r[3].strftime('%H:%M:%S') if r[3] else ""
-                }
-        for r in baseline_rows:
-            aid = str(r[0])
-            if aid in result and r[1] and r[2]:
-                result[aid]["target"] = {"v": round(float(r[1]), 1), "a": round(float(r[2]), 1)}
-
-        return jsonify(result), 200
+        payload, status = _build_welding_realtime(v_db)
+        return jsonify(payload), status
     except Exception as e:
         return jsonify({"error": f"데이터 조회 오류: {str(e)}"}), 500
 
 # ==============================================================
 # 10. [GET] 절곡공정 전용 실시간 관제 데이터 조회 (smart_last 테이블)
 # ==============================================================
+def _build_bending_realtime(v_db, snapshot=None):
+    """절곡(205) 실시간 화면 데이터를 (payload, status) 로 반환합니다. (SSE 스트림과 공용)
+    snapshot 을 넘기면 그 스냅샷으로 만듭니다. (ETag 와 본문을 같은 스냅샷에서 만들 때)"""
+    # 절곡기(205)의 규격(col_1~5)과 횟수(col_6) 조회 (공유 스냅샷 사용)
+    if snapshot is None:
+        snapshot = get_snapshot(v_db, ["205"])
+    if snapshot is None: return {"error": "DB 연결 실패"}, 500
+    row = snapshot.get("205")
+
+    if not row:
+        return {"stroke": 0, "spec": 0, "time": ""}, 200
+
+    col_1 = float(row["col_1"]) if row["col_1"] is not None else 0
+    col_2 = float(row["col_2"]) if row["col_2"] is not None else 0
+    col_3 = float(row["col_3"]) if row["col_3"] is not None else 0
+    col_4 = float(row["col_4"]) if row["col_4"] is not None else 0
+    col_5 = float(row["col_5"]) if row["col_5"] is not None else 0
+    col_6 = float(row["col_6"]) if row["col_6"] is not None else 0
+    cr_dt = row["cr_dt"]
+
+    # ⭐️ 토글 스위치 우선순위 로직 (1번이 최우선)
+    spec_val = 0
+    if col_1 == 1:
+        spec_val = 1
+    elif col_2 == 2:
+        spec_val = 2
+    elif col_3 == 3:
+        spec_val = 3
+    elif col_4 == 4:
+        spec_val = 4
+    elif col_5 == 5:
+        spec_val = 5
+
+    return {
+        "stroke": int(col_6),
+        "spec": spec_val,  # 0이면 대기중, 1~5면 해당 규격 작업중
+        "time": cr_dt.strftime('%H:%M:%S') if cr_dt else ""
+    }, 200
+
 @data_bp.route('/bending-realtime', methods=['GET'])
+@coalesce
 def get_bending_realtime():
     v_db = request.args.get("v_db", "18_DY")
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
-        cur = conn.cursor()
-
-        # 절곡기(205)의 규격(col_1~5)과 횟수(col_6) 조회
-        sql = """
-            SELECT col_1, col_2, col_3, col_4, col_5, col_6, cr_dt
-            FROM dbo.smart_last
-            WHERE auto_id = '205'
-        """
-        cur.execute(sql)
-        row = cur.fetchone()
-        conn.close()
-
-        if not row:
-            return jsonify({"stroke": 0, "spec": 0, "time": ""}), 200
-
-        col_1 = float(row[0]) if row[0] is not None else 0
-        col_2 = float(row[1]) if row[1] is not None else 0
-        col_3 = float(row[2]) if row[2] is not None else 0
-        col_4 = float(row[3]) if row[3] is not None else 0
-        col_5 = float(row[4]) if row[4] is not None else 0
-        col_6 = float(row[5]) if row[5] is not None else 0
-        cr_dt = row[6]
-
-        # ⭐️ 토글 스위치 우선순위 로직 (1번이 최우선)
-        spec_val = 0
-        if col_1 == 1:
-            spec_val = 1
-        elif col_2 == 2:
-            spec_val = 2
-        elif col_3 == 3:
-            spec_val = 3
-        elif col_4 == 4:
-            spec_val = 4
-        elif col_5 == 5:
-            spec_val = 5
-
-        return jsonify({
-            "stroke": int(col_6),
-            "spec": spec_val,  # 0이면 대기중, 1~5면 해당 규격 작업중
-            "time": cr_dt.strftime('%H:%M:%S') if cr_dt else ""
-        }), 200
-        
+        # smart_last(205) 행이 직전 응답과 같으면 304 (ETag = 스냅샷 행 내용)
+        # 사이에 폴러가 스냅샷을 바꿔도 본문과 ETag 가 어긋나지 않도록 한 번 읽은 스냅샷으로 둘 다 만듦
+        snapshot = get_snapshot(v_db, ["205"])
+        etag = make_etag(v_db, "bending", snapshot.get("205")) if snapshot is not None else None
+        if etag:
+            cached = not_modified(etag)
+            if cached:
+                return cached
+
+        payload, status = _build_bending_realtime(v_db, snapshot)
+        if etag and status == 200:
+            return with_etag(jsonify(payload), etag), status
+        return jsonify(payload), status
     except Exception as e:
         print(f"Error in get_bending_realtime: {str(e)}")
         return jsonify({"error": f"데이터 조회 오류: {str(e)}"}), 500
@@ -460,44 +492,34 @@ def get_bending_realtime():
 # ==============================================================
 # 11. [GET] 절곡공정 시간대별 생산량 추이 (smart_log 테이블)
 # ==============================================================
+def _build_bending_hourly(v_db):
+    """절곡(205) 시간대별 생산량을 (payload, status) 로 반환합니다. (대시보드 묶음 조회와 공용)"""
+    # ⭐️ [핵심] 오늘 날짜 기준, 각 시간대별 누적타발(col_6)의 MAX - MIN 을 구하면
+    # 해당 시간에 몇 번 절곡했는지 순수 생산량이 나옵니다. (services/rollup 1시간 집계 사용)
+    rollup = get_rollup(v_db, "205")
+    if rollup is None: return {"error": "DB 연결 실패"}, 500
+
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    data = []
+    for b in rollup.series("1h", "col_6", from_dt=today):
+        # 생산량이 0보다 작게 나오는 오류(누적값 리셋 등) 방지
+        prod = b["max"] - b["min"]
+        if prod < 0: prod = 0 
+        
+        data.append({
+            "time": f"{b['bucket'].hour:02d}시",
+            "production": int(prod)
+        })
+    return data, 200
+
 @data_bp.route('/bending-hourly', methods=['GET'])
+@coalesce
 def get_bending_hourly():
     v_db = request.args.get("v_db", "18_DY")
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
-        cur = conn.cursor()
-
-        # ⭐️ [핵심] 오늘 날짜(ymd) 기준, 각 시간대(hh)별 누적타발(col_6)의 MAX - MIN 을 구하면
-        # 해당 시간에 몇 번 절곡했는지 순수 생산량이 나옵니다.
-        sql = """
-            SELECT 
-                hh, 
-                (MAX(col_6) - MIN(col_6)) as hourly_production
-            FROM dbo.smart_log
-            WHERE auto_id = '205' 
-              AND ymd = CONVERT(VARCHAR(8), GETDATE(), 112)
-            GROUP BY hh
-            ORDER BY hh ASC
-        """
-        cur.execute(sql)
-        rows = cur.fetchall()
-        conn.close()
-
-        data = []
-        for row in rows:
-            # 생산량이 0보다 작게 나오는 오류(누적값 리셋 등) 방지
-            prod = float(row[1]) if row[1] is not None else 0
-            if prod < 0: prod = 0 
-            
-            data.append({
-                "time": f"{row[0]}시",
-                "production": int(prod)
-            })
-
-        return jsonify(data), 200
-        
+        payload, status = _build_bending_hourly(v_db)
+        return jsonify(payload), status
     except Exception as e:
         print(f"Error in get_bending_hourly: {str(e)}")
         return jsonify({"error": f"데이터 조회 오류: {str(e)}"}), 500
@@ -505,14 +527,13 @@ def get_bending_hourly():
 # ==============================================================
 # 12. [GET] 작업 진행 모니터링 데이터 조회 (segsan_req_mst)
 # ==============================================================
-@data_bp.route('/production-orders', methods=['GET'])
-def get_production_orders():
-    v_db = request.args.get("v_db", "18_DY") 
-
+# 대시보드 여러 대가 동시에 폴링하므로 같은 v_db 의 동시 요청은 쿼리 한 번으로 합칩니다. (@coalesce, services/single_flight)
+def _build_production_orders(v_db):
+    """작업 진행(segsan_req_mst 최근 100건)을 (payload, status) 로 반환합니다. (대시보드 묶음 조회와 공용)"""
+    conn = get_db_connection(v_db)
+    if conn is None: 
+        return {"error": "DB 연결 실패"}, 500
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: 
-            return jsonify({"error": "DB 연결 실패"}), 500
         cur = conn.cursor()
 
         # ⭐️ bigo10 ~ bigo14까지 모두 조회하도록 수정
@@ -525,24 +546,33 @@ def get_production_orders():
         """
         cur.execute(sql)
         rows = cur.fetchall()
+    finally:
         conn.close()
 
-        data = []
-        for row in rows:
-            data.append({
-                "segsan_req_cd": row[0] if row[0] else "",
-                "segsan_req_dt": row[1] if row[1] else "",
-                "bigo4": row[2] if row[2] else "",  
-                "bigo5": row[3] if row[3] else "",  
-                "bigo8": row[4] if row[4] else "",  
-                "bigo10": row[5] if row[5] else "", # 가공/조립
-                "bigo11": row[6] if row[6] else "", # 용접
-                "bigo12": row[7] if row[7] else "", # 절곡
-                "bigo13": row[8] if row[8] else "", # 사급출고
-                "bigo14": row[9] if row[9] else ""  # 사급입고
-            })
+    data = []
+    for row in rows:
+        data.append({
+            "segsan_req_cd": row[0] if row[0] else "",
+            "segsan_req_dt": row[1] if row[1] else "",
+            "bigo4": row[2] if row[2] else "",  
+            "bigo5": row[3] if row[3] else "",  
+            "bigo8": row[4] if row[4] else "",  
+            "bigo10": row[5] if row[5] else "", # 가공/조립
+            "bigo11": row[6] if row[6] else "", # 용접
+            "bigo12": row[7] if row[7] else "", # 절곡
+            "bigo13": row[8] if row[8] else "", # 사급출고
+            "bigo14": row[9] if row[9] else ""  # 사급입고
+        })
+    return data, 200
 
-        return jsonify(data), 200
+@data_bp.route('/production-orders', methods=['GET'])
+@coalesce
+def get_production_orders():
+    v_db = request.args.get("v_db", "18_DY") 
+
+    try:
+        payload, status = _build_production_orders(v_db)
+        return jsonify(payload), status
         
     except Exception as e:
         print(f"Error in get_production_orders: {str(e)}")
@@ -552,11 +582,15 @@ def get_production_orders():
 # 13. [GET] 품질 대시보드 데이터 조회 (banpum_mst + smart_log 연동)
 # ==============================================================
 @data_bp.route('/quality-dashboard', methods=['GET'])
+@coalesce
 def get_quality_dashboard():
     v_db = request.args.get("v_db", "18_DY")
     from_dt = request.args.get("from_dt") # 'YYYY-MM-DD HH:MM:SS'
     to_dt   = request.args.get("to_dt")
     auto_id = request.args.get("auto_id")
+    # 센서 차트용 다운샘플링 (설비별 최대 점 수, 미지정 시 원본 전체)
+    max_points = parse_max_points(request.args.get("max_points"))
+    ds_method = request.args.get("downsample", "minmax")
 
     if not from_dt or not to_dt:
         return jsonify({"error": "날짜 파라미터 누락"}), 400
@@ -565,52 +599,78 @@ def get_quality_dashboard():
     from_ymd = from_dt[:10].replace("-", "")
     to_ymd = to_dt[:10].replace("-", "")
 
-    try:
+    # 1. 일자별 용접불량(0201) 양품/불량 합계 (banpum_mst) - 기간 수율과 불량 발생일 판정에 함께 사용
+    def fetch_defect_days():
         conn = get_db_connection(v_db)
-        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
-        cur = conn.cursor()
+        if conn is None: return None
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT banpum_dt, ISNULL(SUM(ok_amt), 0), ISNULL(SUM(amt), 0), MAX(ISNULL(amt, 0))
+                FROM dbo.banpum_mst
+                WHERE banpum_dt >= ? AND banpum_dt <= ?
+                  AND err_cd = '0201'
+                GROUP BY banpum_dt
+            """, (from_ymd, to_ymd))
+            return cur.fetchall()
+        finally:
+            conn.close()
 
-        # 1. 수율 데이터 (banpum_mst) - 해당 기간의 용접불량(0201) 양품/불량 합계
-        sql_yield = """
-            SELECT ISNULL(SUM(ok_amt), 0) as total_ok, ISNULL(SUM(amt), 0) as total_err
-            FROM dbo.banpum_mst
-            WHERE banpum_dt >= ? AND banpum_dt <= ?
-              AND err_cd = '0201'
-        """
-        cur.execute(sql_yield, (from_ymd, to_ymd))
-        yield_row = cur.fetchone()
-        total_ok = int(yield_row[0]) if yield_row else 0
-        total_err = int(yield_row[1]) if yield_row else 0
+    # 2. 센서 데이터 (smart_log) - 불량 여부는 DB JOIN 대신 메모리에서 일자(ymd)로 매칭
+    def fetch_sensor():
+        conn = get_db_connection(v_db)
+        if conn is None: return None
+        try:
+            cur = conn.cursor()
+            if auto_id and auto_id != 'all':
+                auto_id_cond, params = "AND auto_id = ?", (from_dt, to_dt, auto_id)
+            else:
+                auto_id_cond, params = "AND auto_id IN ('201', '203')", (from_dt, to_dt)
+            cur.execute(f"""
+                SELECT 
+                    cr_dt, 
+                    col_3 as volt, 
+                    col_4 as ampere,
+                    auto_id,
+                    ymd
+                FROM dbo.smart_log
+                WHERE cr_dt >= CONVERT(DATETIME, ?, 120) 
+                  AND cr_dt <= CONVERT(DATETIME, ?, 120)
+                  AND col_3 > 5
+                  {auto_id_cond}
+                ORDER BY cr_dt ASC
+            """, params)
+            return cur.fetchall()
+        finally:
+            conn.close()
 
-        # 2. 센서 데이터 (smart_log) + 해당 일자의 불량 등록 여부 조인
-        auto_id_cond = f"AND s.auto_id = '{auto_id}'" if auto_id and auto_id != 'all' else "AND s.auto_id IN ('201', '203')"
+    try:
+        # 두 조회는 서로 독립적이므로 풀의 커넥션 2개로 동시에 실행
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            defect_future = pool.submit(fetch_defect_days)
+            sensor_future = pool.submit(fetch_sensor)
+            defect_rows = defect_future.result()
+            sensor_rows = sensor_future.result()
+        if defect_rows is None or sensor_rows is None:
+            return jsonify({"error": "DB 연결 실패"}), 500
 
-        sql_sensor = f"""
-            SELECT 
-                s.cr_dt, 
-                s.col_3 as volt, 
-                s.col_4 as ampere,
-                ISNULL(b.amt, 0) as defect_cnt
-            FROM dbo.smart_log s
-            LEFT JOIN dbo.banpum_mst b 
-                ON s.ymd = b.banpum_dt AND b.err_cd = '0201'
-            WHERE s.cr_dt >= CONVERT(DATETIME, ?, 120) 
-              AND s.cr_dt <= CONVERT(DATETIME, ?, 120)
-              AND s.col_3 > 5
-              {auto_id_cond}
-            ORDER BY s.cr_dt ASC
-        """
-        cur.execute(sql_sensor, (from_dt, to_dt))
-        sensor_rows = cur.fetchall()
-        conn.close()
+        total_ok = int(sum(r[1] for r in defect_rows))
+        total_err = int(sum(r[2] for r in defect_rows))
+        defect_days = {str(r[0]).strip() for r in defect_rows if r[3] and r[3] > 0}
+
+        if max_points:
+            sensor_rows = downsample_rows(sensor_rows, max_points, time_idx=0, value_idxs=[1, 2], group_idx=3, method=ds_method)
+
+        # ⭐️ 핵심: 전압 / 10.0 (services/channels, 전체 행 한 번에)
+        values = scale_rows(sensor_rows, [1, 2], get_channels(v_db, "201", default="welding"), ["col_3", "col_4"])
 
         sensor_data = []
-        for r in sensor_rows:
+        for r, (volt, ampere) in zip(sensor_rows, values):
             sensor_data.append({
                 "time": r[0].strftime('%Y-%m-%d %H:%M:%S') if r[0] else "",
-                "v": (float(r[1]) / 10.0) if r[1] else 0,  # ⭐️ 핵심: / 10.0 추가
-                "a": float(r[2]) if r[2] else 0,
-                "is_defect_day": True if r[3] > 0 else False
+                "v": volt,
+                "a": ampere,
+                "is_defect_day": str(r[4]).strip() in defect_days
             })
 
         return jsonify({
@@ -625,76 +685,63 @@ def get_quality_dashboard():
 # ==============================================================
 # [GET] 혼합 및 추출공정 실시간 모니터링 데이터 조회 (205번 설비)
 # ==============================================================
-@data_bp.route('/mixing-realtime', methods=['GET'])
-def get_mixing_realtime():
-    v_db = request.args.get("v_db", "31_ST_2025")
-
-    try:
-        conn = get_db_connection(v_db)
-        if conn is None: 
-            return jsonify({"error": "DB 연결 실패"}), 500
-        
-        cur = conn.cursor()
+def _build_mixing_realtime(v_db):
+    """혼합/추출(205) 실시간 화면 데이터를 (payload, status) 로 반환합니다. (SSE 스트림과 공용)"""
+    # 1. 실시간 최신 데이터 조회 (smart_last 공유 스냅샷 사용)
+    snapshot = get_snapshot(v_db, ["205"])
+    if snapshot is None:
+        return {"error": "DB 연결 실패"}, 500
+    row = snapshot.get("205")
+    ch = get_channels(v_db, "205", default="mixing")
+
+    # 2. 금일 기준 누적 가동시간 (smart_log 증분 집계, 채널별 가동 기준: 추출 80도 / 농축 40도 이상일 때 1분 추가)
+    runtime = get_runtime_totals(v_db, "205", runtime_rules(ch))
+    if runtime is None:
+        return {"error": "DB 연결 실패"}, 500
+
+    run_time_1st = runtime["temp1"]
+    run_time_2nd = runtime["temp2"]
+    run_time_con = runtime["conTemp"]
 
-        # 1. 실시간 최신 데이터 조회 (smart_last 사용 - 속도 및 최신화 보장)
-        sql_realtime = """
-            SELECT col_1, col_2, col_3, col_4, col_5, col_6, col_7, col_8, cr_dt
-            FROM dbo.smart_last
-            WHERE auto_id = '205'
-        """
-        cur.execute(sql_realtime)
-        row = cur.fetchone()
-
-        # 2. 금일 기준 누적 가동시간 계산 (smart_log 사용)
-        # col_4, col_5(추출)는 80도 이상(800), col_7(농축)은 40도 이상(400)일 때 1분 추가
-        sql_runtime = """
-            SELECT 
-                SUM(CASE WHEN col_4 >= 800 THEN 1 ELSE 0 END) as run_time_1st,
-                SUM(CASE WHEN col_5 >= 800 THEN 1 ELSE 0 END) as run_time_2nd,
-                SUM(CASE WHEN col_7 >= 400 THEN 1 ELSE 0 END) as run_time_con
-            FROM dbo.smart_log
-            WHERE auto_id = '205'
-              AND ymd = CONVERT(VARCHAR(8), GETDATE(), 112)
-        """
-        cur.execute(sql_runtime)
-        runtime_row = cur.fetchone()
-        conn.close()
-
-        run_time_1st = int(runtime_row[0]) if runtime_row and runtime_row[0] else 0
-        run_time_2nd = int(runtime_row[1]) if runtime_row and runtime_row[1] else 0
-        run_time_con = int(runtime_row[2]) if runtime_row and runtime_row[2] else 0
+    if not row:
+        return {"error": "데이터가 없습니다."}, 404
 
-        if not row:
-            return jsonify({"error": "데이터가 없습니다."}), 404
+    # 데이터 변환 및 스케일링 (services/channels 정의: 온도 /10, 당도 /100)
+    a_cnt = int(row["col_1"]) if row["col_1"] is not None else 0
+    b_cnt = int(row["col_2"]) if row["col_2"] is not None else 0
+    weight = int(row["col_3"]) if row["col_3"] is not None else 0
+    
+    temp_1st = scale_value(ch["col_4"], row["col_4"])
+    temp_2nd = scale_value(ch["col_5"], row["col_5"])
+    ext_brix = scale_value(ch["col_6"], row["col_6"])
+    
+    con_temp = scale_value(ch["col_7"], row["col_7"])
+    con_brix = scale_value(ch["col_8"], row["col_8"])
+    
+    cr_dt = row["cr_dt"]
+    time_str = cr_dt.strftime('%H:%M:%S') if cr_dt else ""
 
-        # 데이터 변환 및 스케일링 (/10, /100)
-        a_cnt = int(row[0]) if row[0] is not None else 0
-        b_cnt = int(row[1]) if row[1] is not None else 0
-        weight = int(row[2]) if row[2] is not None else 0
-        
-        temp_1st = float(row[3]) / 10.0 if row[3] is not None else 0.0
-        temp_2nd = float(row[4]) / 10.0 if row[4] is not None else 0.0
-        ext_brix = float(row[5]) / 100.0 if row[5] is not None else 0.0
-        
-        con_temp = float(row[6]) / 10.0 if row[6] is not None else 0.0
-        con_brix = float(row[7]) / 100.0 if row[7] is not None else 0.0
-        
-        cr_dt = row[8]
-        time_str = cr_dt.strftime('%H:%M:%S') if cr_dt else ""
+    # 가동 판정
+    is_running_1st = is_running(ch["col_4"], row["col_4"])
+    is_running_2nd = is_running(ch["col_5"], row["col_5"])
+    is_running_con = is_running(ch["col_7"], row["col_7"])
 
-        # 가동 판정
-        is_running_1st = temp_1st >= 80.0
-        is_running_2nd = temp_2nd >= 80.0
-        is_running_con = con_temp >= 40.0
+    return {
+        "time": time_str,
+        "ext_1st": {"temp": temp_1st, "brix": ext_brix, "is_running": is_running_1st, "run_time_min": run_time_1st},
+        "ext_2nd": {"temp": temp_2nd, "brix": ext_brix, "is_running": is_running_2nd, "run_time_min": run_time_2nd},
+        "con":     {"temp": con_temp, "brix": con_brix, "is_running": is_running_con, "run_time_min": run_time_con},
+        "material": {"a_cnt": a_cnt, "b_cnt": b_cnt, "total_weight": weight}
+    }, 200
 
-        return jsonify({
-            "time": time_str,
-            "ext_1st": {"temp": temp_1st, "brix": ext_brix, "is_running": is_running_1st, "run_time_min": run_time_1st},
-            "ext_2nd": {"temp": temp_2nd, "brix": ext_brix, "is_running": is_running_2nd, "run_time_min": run_time_2nd},
-            "con":     {"temp": con_temp, "brix": con_brix, "is_running": is_running_con, "run_time_min": run_time_con},
-            "material": {"a_cnt": a_cnt, "b_cnt": b_cnt, "total_weight": weight}
-        }), 200
+@data_bp.route('/mixing-realtime', methods=['GET'])
+@coalesce
+def get_mixing_realtime():
+    v_db = request.args.get("v_db", "31_ST_2025")
 
+    try:
+        payload, status = _build_mixing_realtime(v_db)
+        return jsonify(payload), status
     except Exception as e:
         print(f"Error in get_mixing_realtime: {str(e)}")
         return jsonify({"error": f"데이터 조회 오류: {str(e)}"}), 500
@@ -703,24 +750,27 @@ def get_mixing_realtime():
 # [GET] 숙성공정 실시간 가동 모니터링 데이터 조회 (206번 설비 전용)
 # ==============================================================
 @data_bp.route('/aging-realtime', methods=['GET'])
+@coalesce
 def get_aging_realtime():
     v_db = request.args.get("v_db", "31_ST_2025")
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: 
+        # 1. 숙성공정(206) 실시간 가동 여부 조회 (smart_last 공유 스냅샷 우선)
+        snapshot = get_snapshot(v_db, ["206"])
+        if snapshot is None:
             return jsonify({"error": "DB 연결 실패"}), 500
-        
-        cur = conn.cursor()
+        last = snapshot.get("206")
+        row_last = (last["col_1"], last["col_2"], last["col_3"], last["cr_dt"]) if last else None
 
-        # 1. 숙성공정(206) 실시간 가동 여부 조회 (smart_last 우선)
-        cur.execute("SELECT col_1, col_2, col_3, cr_dt FROM dbo.smart_last WHERE auto_id = '206'")
-        row_last = cur.fetchone()
-        
         # smart_last에 데이터가 없는 경우 smart_log에서 최신 1건 조회 (Fallback)
         if not row_last:
+            conn = get_db_connection(v_db)
+            if conn is None: 
+                return jsonify({"error": "DB 연결 실패"}), 500
+            cur = conn.cursor()
             cur.execute("SELECT TOP 1 col_1, col_2, col_3, cr_dt FROM dbo.smart_log WHERE auto_id = '206' ORDER BY cr_dt DESC")
             row_last = cur.fetchone()
+            conn.close()
 
         # 가동 상태 (1: True, 0: False)
         t1_run = bool(row_last[0]) if row_last and row_last[0] else False
@@ -728,33 +778,35 @@ def get_aging_realtime():
         t3_run = bool(row_last[2]) if row_last and row_last[2] else False
         time_str = row_last[3].strftime('%H:%M:%S') if row_last and row_last[3] else ""
 
-        # 2. 금일 누적 가동 시간(분) 계산 (1분당 1개 로그 기준)
+        # 2. 금일 누적 가동 시간(분) (1분당 1개 로그 기준, services/rollup 1일 집계 사용)
         # col_1, col_2, col_3의 합계를 구하면 오늘 가동된 총 시간이 나옵니다.
-        sql_runtime = """
-            SELECT 
-                SUM(ISNULL(col_1, 0)) as run_time_t1,
-                SUM(ISNULL(col_2, 0)) as run_time_t2,
-                SUM(ISNULL(col_3, 0)) as run_time_t3
-            FROM dbo.smart_log
-            WHERE auto_id = '206'
-              AND ymd = CONVERT(VARCHAR(8), GETDATE(), 112)
-        """
-        cur.execute(sql_runtime)
-        run_row = cur.fetchone()
-        conn.close()
+        rollup = get_rollup(v_db, "206")
+        if rollup is None:
+            return jsonify({"error": "DB 연결 실패"}), 500
 
-        t1_time = int(run_row[0]) if run_row and run_row[0] else 0
-        t2_time = int(run_row[1]) if run_row and run_row[1] else 0
-        t3_time = int(run_row[2]) if run_row and run_row[2] else 0
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        def day_sum(col):
+            days = rollup.series("1d", col, from_dt=today)
+            return int(days[0]["sum"]) if days else 0
 
-        return jsonify({
+        t1_time = day_sum("col_1")
+        t2_time = day_sum("col_2")
+        t3_time = day_sum("col_3")
+
+        # 가동 상태와 누적 시간이 직전 응답과 같으면 304
+        etag = make_etag(v_db, "aging", tuple(row_last) if row_last else None, t1_time, t2_time, t3_time)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        return with_etag(jsonify({
             "time": time_str,
             "tanks": {
                 "tank1": { "isRunning": t1_run, "runTimeMin": t1_time },
                 "tank2": { "isRunning": t2_run, "runTimeMin": t2_time },
                 "tank3": { "isRunning": t3_run, "runTimeMin": t3_time }
             }
-        }), 200
+        }), etag), 200
 
     except Exception as e:
         print(f"Error in get_aging_realtime: {str(e)}")
@@ -768,36 +820,40 @@ def get_mixing_history():
     v_db = request.args.get("v_db", "31_ST_2025")
     from_dt = request.args.get("from_dt") # 포맷: YYYY-MM-DD
     to_dt = request.args.get("to_dt")     # 포맷: YYYY-MM-DD
+    # 차트용 다운샘플링 (기본 minmax: 구간별 최고/최저 온도 행을 남겨 알람 판정에 필요한 피크 보존)
+    max_points = parse_max_points(request.args.get("max_points"))
+    ds_method = request.args.get("downsample", "minmax")
 
-    if not from_dt or not to_dt:
+    from_t = parse_dt(from_dt)
+    to_t = parse_dt(to_dt, end_of_day=True)
+    if not from_t or not to_t:
         return jsonify({"error": "날짜 파라미터가 필요합니다."}), 400
+    range_error = check_range(from_t, to_t)
+    if range_error:
+        return jsonify({"error": range_error}), 400
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: 
+        # 마감 일자는 로컬 캐시(services/smart_log_cache), 오늘 데이터만 DB 에서 조회
+        loaded = load_range(v_db, "205", from_t, to_t)
+        if loaded is None: 
             return jsonify({"error": "DB 연결 실패"}), 500
-        cur = conn.cursor()
+        times, cols = loaded
+        # 온도 스케일(/10)은 컬럼 배열 단위로 한 번에 적용 (services/channels)
+        cols = scale_columns(cols, get_channels(v_db, "205", default="mixing"))
 
         # 알람의 흐름을 파악하기 위해 시간 오름차순(ASC)으로 가져옵니다.
-        sql = """
-            SELECT cr_dt, col_4, col_5, col_7
-            FROM dbo.smart_log
-            WHERE auto_id = '205'
-              AND cr_dt >= CONVERT(DATETIME, ?, 120)
-              AND cr_dt <= CONVERT(DATETIME, ? + ' 23:59:59', 120)
-            ORDER BY cr_dt ASC
-        """
-        cur.execute(sql, (from_dt, to_dt))
-        rows = cur.fetchall()
-        conn.close()
+        rows = to_rows(times, cols, ["cr_dt", "col_4", "col_5", "col_7"])
+
+        if max_points:
+            rows = downsample_rows(rows, max_points, time_idx=0, value_idxs=[1, 2, 3], method=ds_method)
 
         data = []
         for r in rows:
             data.append({
                 "time": r[0].strftime('%Y-%m-%d %H:%M:%S') if r[0] else "",
-                "temp1": float(r[1]) / 10.0 if r[1] is not None else 0,
-                "temp2": float(r[2]) / 10.0 if r[2] is not None else 0,
-                "tempCon": float(r[3]) / 10.0 if r[3] is not None else 0,
+                "temp1": r[1] if r[1] is not None else 0,
+                "temp2": r[2] if r[2] is not None else 0,
+                "tempCon": r[3] if r[3] is not None else 0,
             })
 
         return jsonify(data), 200
@@ -815,53 +871,93 @@ def get_data_info_inquiry():
     from_dt = request.args.get("from_dt")
     to_dt = request.args.get("to_dt")
     process_type = request.args.get("process", "all")
+    # format=columnar: 공정별 숫자 컬럼 배열로 반환 (collectedData 문자열 없이, 차트/표 가공용)
+    out_format = request.args.get("format", "rows")
 
-    try:
-        conn = get_db_connection(v_db)
-        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
-        cur = conn.cursor()
+    from_t = parse_dt(from_dt)
+    to_t = parse_dt(to_dt, end_of_day=True)
+    if not from_t or not to_t:
+        return jsonify({"error": "날짜 파라미터가 필요합니다."}), 400
+    range_error = check_range(from_t, to_t)
+    if range_error:
+        return jsonify({"error": range_error}), 400
 
-        sql = """
-            SELECT 
-                cr_dt, auto_id, 
-                col_4, col_5, col_6, -- 추출 1차온도, 2차온도, 당도
-                col_7, col_8,        -- 농축 온도, 당도
-                col_1, col_2, col_3  -- 숙성 탱크 가동상태
-            FROM dbo.smart_log
-            WHERE cr_dt >= CONVERT(DATETIME, ?, 120) 
-              AND cr_dt <= CONVERT(DATETIME, ? + ' 23:59:59', 120)
-            ORDER BY cr_dt DESC
-        """
-        cur.execute(sql, (from_dt, to_dt))
-        rows = cur.fetchall()
-        conn.close()
+    show_ext = process_type in ['all', 'ext']
+    show_con = process_type in ['all', 'con']
+    show_age = process_type in ['all', 'age']
 
-        data = []
-        for i, r in enumerate(rows):
+    try:
+        # 화면에 표시되는 설비는 205(추출/농축), 206(숙성) 뿐이므로 해당 설비만 읽습니다.
+        # 마감 일자는 로컬 캐시(services/smart_log_cache), 오늘 데이터만 DB 에서 조회
+        src = {}
+        for aid, needed in (('205', show_ext or show_con), ('206', show_age)):
+            if not needed:
+                continue
+            loaded = load_range(v_db, aid, from_t, to_t)
+            if loaded is None: return jsonify({"error": "DB 연결 실패"}), 500
+            src[aid] = loaded
+
+        # 공정별 판정 조건을 행 단위 루프 대신 배열 조건으로 먼저 적용
+        # 추출/농축: 채널 정의의 데이터 조회 기준(services/channels info_threshold) 초과, 숙성: 가동 탱크가 하나라도 있음
+        ch205 = get_channels(v_db, '205', default="mixing")
+        masks = {}
+        if '205' in src:
+            _, c = src['205']
+            masks['ext'] = info_mask(ch205, c, ["col_4", "col_5"]) if show_ext else np.zeros(len(c["col_4"]), dtype=bool)
+            masks['con'] = info_mask(ch205, c, ["col_7"]) if show_con else np.zeros(len(c["col_7"]), dtype=bool)
+        if '206' in src:
+            _, c = src['206']
+            masks['age'] = (np.nan_to_num(c["col_1"]) != 0) | (np.nan_to_num(c["col_2"]) != 0) | (np.nan_to_num(c["col_3"]) != 0)
+
+        # 온도/당도 스케일은 컬럼 배열 단위로 한 번에 적용 (services/channels, 판정 조건은 위에서 저장값 기준)
+        for aid, default in (('205', "mixing"), ('206', "aging")):
+            if aid in src:
+                times, cols = src[aid]
+                src[aid] = (times, scale_columns(cols, get_channels(v_db, aid, default=default)))
+
+        if out_format == "columnar":
+            return jsonify(_data_info_columnar(src, masks)), 200
+
+        rows = []
+        if '205' in src:
+            times, cols = src['205']
+            # (cr_dt, auto_id, 추출 1차온도, 2차온도, 당도, 농축 온도, 당도, 숙성 탱크 가동상태 1~3)
+            for r in to_rows(times, cols, ["cr_dt", "col_4", "col_5", "col_6", "col_7", "col_8", "col_1", "col_2", "col_3"],
+                             mask=masks['ext'] | masks['con']):
+                rows.append((r[0], '205') + r[1:])
+        if '206' in src:
+            times, cols = src['206']
+            for r in to_rows(times, cols, ["cr_dt", "col_4", "col_5", "col_6", "col_7", "col_8", "col_1", "col_2", "col_3"],
+                             mask=masks['age']):
+                rows.append((r[0], '206') + r[1:])
+        rows.sort(key=lambda r: r[0], reverse=True)   # 최신순
+
+        def convert(i, r):
+            items = []
             cr_dt = r[0].strftime('%Y-%m-%d %H:%M:%S') if r[0] else ""
             auto_id = str(r[1])
-            
+        
             # 205 (추출/농축 공정)
             if auto_id == '205':
-                temp1 = float(r[2])/10.0 if r[2] else 0
-                temp2 = float(r[3])/10.0 if r[3] else 0
-                extBrix = float(r[4])/100.0 if r[4] else 0
-                conTemp = float(r[5])/10.0 if r[5] else 0
-                conBrix = float(r[6])/100.0 if r[6] else 0
-                
-                if process_type in ['all', 'ext'] and (temp1 > 40 or temp2 > 40):
-                    data.append({
+                temp1 = r[2] or 0
+                temp2 = r[3] or 0
+                extBrix = r[4] or 0
+                conTemp = r[5] or 0
+                conBrix = r[6] or 0
+            
+                if process_type in ['all', 'ext'] and (is_info_value(ch205.get("col_4"), temp1) or is_info_value(ch205.get("col_5"), temp2)):
+                    items.append({
                         "key": f"ext_{i}", "date": cr_dt, 
                         "process": "추출공정", "equipment": "추출기 (205)", 
                         "collectedData": f"1차온도: {temp1}°C | 2차온도: {temp2}°C | 추출당도: {extBrix} Brix"
                     })
-                if process_type in ['all', 'con'] and conTemp > 30:
-                    data.append({
+                if process_type in ['all', 'con'] and is_info_value(ch205.get("col_7"), conTemp):
+                    items.append({
                         "key": f"con_{i}", "date": cr_dt, 
                         "process": "농축공정", "equipment": "농축기 (205)", 
                         "collectedData": f"농축온도: {conTemp}°C | 농축당도: {conBrix} Brix"
                     })
-            
+        
             # 206 (숙성 공정)
             elif auto_id == '206' and process_type in ['all', 'age']:
                 if r[7] or r[8] or r[9]: # 가동 중인 탱크가 하나라도 있으면
@@ -869,16 +965,51 @@ def get_data_info_inquiry():
                     if r[7]: active_tanks.append("1호기")
                     if r[8]: active_tanks.append("2호기")
                     if r[9]: active_tanks.append("3호기")
-                    data.append({
+                    items.append({
                         "key": f"age_{i}", "date": cr_dt, 
                         "process": "숙성공정", "equipment": "숙성탱크 (206)", 
                         "collectedData": f"가동 탱크: {', '.join(active_tanks)}"
                     })
+            return items
+
+        # ?stream=true: 배치 단위로 변환하며 바로 전송 (장기간 조회용)
+        if is_stream_requested():
+            return stream_json_rows(rows, convert)
+
+        data = []
+        for i, r in enumerate(rows):
+            data.extend(convert(i, r))
 
         return jsonify(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def _data_info_columnar(src, masks):
+    """
+    data-info-inquiry 의 format=columnar 응답을 만듭니다. (최신순)
+    {"ext": {"time": [...], "temp1": [...], "temp2": [...], "extBrix": [...]},
+     "con": {"time": [...], "conTemp": [...], "conBrix": [...]},
+     "age": {"time": [...], "tank1": [...], "tank2": [...], "tank3": [...]}}
+    src 의 컬럼 배열은 이미 채널 스케일이 적용된 실제값입니다.
+    """
+    def pick(aid, mask, fields):
+        times, cols = src[aid]
+        sel = np.flatnonzero(mask)[::-1]
+        out = {"time": np.char.replace(np.datetime_as_string(times[sel], unit='s'), 'T', ' ').tolist()}
+        for name, (col, as_flag) in fields.items():
+            values = np.nan_to_num(cols[col][sel])
+            out[name] = (values != 0).tolist() if as_flag else values.tolist()
+        return out
+
+    result = {}
+    if 'ext' in masks and masks['ext'].any():
+        result["ext"] = pick('205', masks['ext'], {"temp1": ("col_4", False), "temp2": ("col_5", False), "extBrix": ("col_6", False)})
+    if 'con' in masks and masks['con'].any():
+        result["con"] = pick('205', masks['con'], {"conTemp": ("col_7", False), "conBrix": ("col_8", False)})
+    if 'age' in masks and masks['age'].any():
+        result["age"] = pick('206', masks['age'], {"tank1": ("col_1", True), "tank2": ("col_2", True), "tank3": ("col_3", True)})
+    return result
+
 # ==============================================================
 # 15. [GET] 통계/분석용 Raw 데이터 조회 (Regression, SPC 용)
 # ==============================================================
@@ -887,36 +1018,48 @@ def get_analytics_raw():
     v_db = request.args.get("v_db", "31_ST_2025")
     from_dt = request.args.get("from_dt")
     to_dt = request.args.get("to_dt")
+    # 차트용 다운샘플링 (미지정 시 통계 계산을 위해 원본 전체)
+    max_points = parse_max_points(request.args.get("max_points"))
+    ds_method = request.args.get("downsample", "minmax")
+
+    from_t = parse_dt(from_dt)
+    to_t = parse_dt(to_dt, end_of_day=True)
+    if not from_t or not to_t:
+        return jsonify({"error": "날짜 파라미터가 필요합니다."}), 400
+    range_error = check_range(from_t, to_t)
+    if range_error:
+        return jsonify({"error": range_error}), 400
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: return jsonify({"error": "DB 실패"}), 500
-        cur = conn.cursor()
-        
-        # 1차추출온도(4), 2차추출온도(5), 추출당도(6), 농축온도(7), 농축당도(8)
-        sql = """
-            SELECT col_4, col_5, col_6, col_7, col_8, cr_dt
-            FROM dbo.smart_log
-            WHERE auto_id = '205'
-              AND cr_dt >= CONVERT(DATETIME, ?, 120) 
-              AND cr_dt <= CONVERT(DATETIME, ? + ' 23:59:59', 120)
-              AND col_7 > 200 -- 20도 이상인 유의미한 가동 데이터만 필터링
-            ORDER BY cr_dt ASC
-        """
-        cur.execute(sql, (from_dt, to_dt))
-        rows = cur.fetchall()
-        conn.close()
+        # 마감 일자는 로컬 캐시(services/smart_log_cache), 오늘 데이터만 DB 에서 조회
+        loaded = load_range(v_db, "205", from_t, to_t)
+        if loaded is None: return jsonify({"error": "DB 실패"}), 500
+        times, cols = loaded
 
-        data = []
-        for r in rows:
-            data.append({
-                "temp1": float(r[0])/10.0 if r[0] else 0,     # 1차 추출 온도
-                "temp2": float(r[1])/10.0 if r[1] else 0,     # 2차 추출 온도
-                "extBrix": float(r[2])/100.0 if r[2] else 0,  # 추출 당도
-                "conTemp": float(r[3])/10.0 if r[3] else 0,   # 농축 온도
-                "conBrix": float(r[4])/100.0 if r[4] else 0,  # 농축 당도
+        # 1차추출온도(4), 2차추출온도(5), 추출당도(6), 농축온도(7), 농축당도(8)
+        # 20도 이상(col_7 > 200)인 유의미한 가동 데이터만 필터링
+        running = cols["col_7"] > 200
+        cols = scale_columns(cols, get_channels(v_db, "205", default="mixing"))
+        rows = to_rows(times, cols, ["col_4", "col_5", "col_6", "col_7", "col_8", "cr_dt"], mask=running)
+
+        def convert(r):
+            return {
+                "temp1": r[0] or 0,     # 1차 추출 온도
+                "temp2": r[1] or 0,     # 2차 추출 온도
+                "extBrix": r[2] or 0,   # 추출 당도
+                "conTemp": r[3] or 0,   # 농축 온도
+                "conBrix": r[4] or 0,   # 농축 당도
                 "time": r[5].strftime('%Y-%m-%d %H:%M') if r[5] else ""
-            })
+            }
+
+        # ?stream=true: 배치 단위로 변환하며 바로 전송 (다운샘플링과는 함께 쓰지 않음)
+        if is_stream_requested() and not max_points:
+            return stream_json_rows(rows, lambda i, r: [convert(r)])
+
+        if max_points:
+            rows = downsample_rows(rows, max_points, time_idx=5, value_idxs=[0, 1, 2, 3, 4], method=ds_method)
+
+        data = [convert(r) for r in rows]
         return jsonify(data), 200
         
     except Exception as e:
@@ -935,18 +1078,16 @@ def get_suju_schedule():
             return jsonify({"error": "DB 연결 실패"}), 500
         cur = conn.cursor()
 
-        # ⭐️ [수정] jepum_code 테이블을 LEFT JOIN하여 jepum_nm(제품명)을 가져옵니다.
+        # jepum_nm(제품명)은 JOIN 대신 기준정보 캐시에서 붙입니다. (services/ref_cache.py)
         sql = """
             SELECT 
                 s.suju_cd, 
                 s.suju_seq, 
                 s.jepum_cd, 
-                j.jepum_nm,
                 s.out_dt_to, 
                 s.amt, 
                 s.process_cd
             FROM dbo.suju_mst s
-            LEFT JOIN dbo.jepum_code j ON s.jepum_cd = j.jepum_cd
             WHERE s.process_cd IN ('01', '20')
               AND s.out_dt_to IS NOT NULL 
               AND s.out_dt_to != ''
@@ -955,6 +1096,7 @@ def get_suju_schedule():
         cur.execute(sql)
         rows = cur.fetchall()
         conn.close()
+        jepum = get_ref(v_db, "jepum")
 
         data = []
         for row in rows:
@@ -962,10 +1104,10 @@ def get_suju_schedule():
                 "suju_cd": row[0] if row[0] else "",
                 "suju_seq": row[1] if row[1] else "",
                 "jepum_cd": row[2] if row[2] else "",
-                "jepum_nm": row[3] if row[3] else "이름 없음", # ⭐️ 제품명 추가
-                "out_dt": row[4] if row[4] else "",  
-                "amt": float(row[5]) if row[5] else 0, 
-                "process_cd": row[6] if row[6] else "" 
+                "jepum_nm": jepum.name(row[2]) or "이름 없음", # ⭐️ 제품명 추가
+                "out_dt": row[3] if row[3] else "",  
+                "amt": float(row[4]) if row[4] else 0, 
+                "process_cd": row[5] if row[5] else "" 
             })
 
         return jsonify(data), 200
@@ -978,6 +1120,7 @@ def get_suju_schedule():
 # 17. [GET] 계획(mst) vs 지시(plan) vs 실적(mst) 통합 모니터링
 # ==============================================================
 @data_bp.route('/production-monitoring', methods=['GET'])
+@coalesce
 def get_production_monitoring():
     v_db = request.args.get("v_db", "34_GN")
 
@@ -1086,56 +1229,40 @@ def get_production_monitoring():
 # [GET] 증숙로 온도/시간 실시간 모니터링
 # ==============================================================
 @data_bp.route('/steaming-realtime', methods=['GET'])
+@coalesce
 def get_steaming_realtime():
     v_db = request.args.get("v_db", "34_GN")
     auto_id = request.args.get("auto_id", "203") 
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None:
+        # 1. 실시간 최신 데이터 조회 (smart_last 공유 스냅샷)
+        snapshot = get_snapshot(v_db, [auto_id])
+        if snapshot is None:
             return jsonify({"error": "DB 연결 실패"}), 500
+        row = snapshot.get(auto_id)
+        ch = get_channels(v_db, auto_id, default="steaming")
 
-        cur = conn.cursor()
-
-        # 1. 실시간 최신 데이터 조회 (smart_last)
-        sql_realtime = """
-            SELECT col_1, col_2, cr_dt
-            FROM dbo.smart_last
-            WHERE auto_id = ?
-        """
-        cur.execute(sql_realtime, (auto_id,))
-        row = cur.fetchone()
-
-        # 2. 금일 누적 가동 시간 계산 (smart_log)
-        # col_1, col_2는 10배수 저장되어 있으므로 40도 = 400 이상일 때 가동으로 판정(1분 추가)
-        sql_runtime = """
-            SELECT
-                SUM(CASE WHEN ISNULL(col_1, 0) >= 400 THEN 1 ELSE 0 END) as run_time_t1,
-                SUM(CASE WHEN ISNULL(col_2, 0) >= 400 THEN 1 ELSE 0 END) as run_time_t2
-            FROM dbo.smart_log
-            WHERE auto_id = ?
-              AND ymd = CONVERT(VARCHAR(8), GETDATE(), 112)
-        """
-        cur.execute(sql_runtime, (auto_id,))
-        runtime_row = cur.fetchone()
-        conn.close()
+        # 2. 금일 누적 가동 시간 (smart_log 증분 집계, 채널 가동 기준: 40도(저장값 400) 이상일 때 1분 추가)
+        runtime = get_runtime_totals(v_db, auto_id, runtime_rules(ch))
+        if runtime is None:
+            return jsonify({"error": "DB 연결 실패"}), 500
 
         if not row:
             return jsonify({"error": "데이터가 없습니다."}), 404
 
-        run_time_t1 = int(runtime_row[0]) if runtime_row and runtime_row[0] else 0
-        run_time_t2 = int(runtime_row[1]) if runtime_row and runtime_row[1] else 0
+        run_time_t1 = runtime["temp1"]
+        run_time_t2 = runtime["temp2"]
 
-        # 데이터 변환 (스케일 1/10 적용)
-        temp_t1 = float(row[0]) / 10.0 if row[0] is not None else 0.0
-        temp_t2 = float(row[1]) / 10.0 if row[1] is not None else 0.0
+        # 데이터 변환 (services/channels 정의: 온도 /10)
+        temp_t1 = scale_value(ch["col_1"], row["col_1"])
+        temp_t2 = scale_value(ch["col_2"], row["col_2"])
         
-        cr_dt = row[2]
+        cr_dt = row["cr_dt"]
         time_str = cr_dt.strftime('%H:%M:%S') if cr_dt else ""
 
         # 가동 판정 (40도 이상)
-        is_running_t1 = temp_t1 >= 40.0
-        is_running_t2 = temp_t2 >= 40.0
+        is_running_t1 = is_running(ch["col_1"], row["col_1"])
+        is_running_t2 = is_running(ch["col_2"], row["col_2"])
 
         return jsonify({
             "time": time_str,
@@ -1151,6 +1278,7 @@ def get_steaming_realtime():
 # [GET] 포장(생산) 실적 대시보드 모니터링
 # ==============================================================
 @data_bp.route('/packaging-performance', methods=['GET'])
+@coalesce
 def get_packaging_performance():
     v_db = request.args.get("v_db", "34_GN")
 
@@ -1235,6 +1363,7 @@ def get_packaging_performance():
 from datetime import datetime # 파일 상단에 없다면 추가해 주세요.
 
 @data_bp.route('/env-realtime', methods=['GET'])
+@coalesce
 def get_env_realtime():
     v_db = request.args.get("v_db", "34_GN")
     target_ids = request.args.get("target_ids") # 예: "1001,1002,1003"
@@ -1243,34 +1372,24 @@ def get_env_realtime():
         return jsonify({"error": "조회할 대상 ID가 필요합니다."}), 400
 
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: 
+        id_list = [x.strip() for x in target_ids.split(",") if x.strip()]
+        if not id_list:
+            return jsonify({"error": "조회할 대상 ID가 필요합니다."}), 400
+
+        # ⭐️ 구역별 값은 smart_last 공유 스냅샷에서 가져옵니다.
+        snapshot = get_snapshot(v_db, id_list)
+        if snapshot is None: 
             return jsonify({"error": "DB 연결 실패"}), 500
-        cur = conn.cursor()
-        
-        id_list = [x.strip() for x in target_ids.split(",")]
-        placeholders = ",".join(["?"] * len(id_list))
-        
-        # ⭐️ cr_dt를 제거하여 쿼리를 단순화했습니다.
-        sql = f"""
-            SELECT auto_id, col_1, col_2, col_3, col_4
-            FROM dbo.smart_last
-            WHERE auto_id IN ({placeholders})
-        """
-        cur.execute(sql, id_list)
-        rows = cur.fetchall()
-        conn.close()
         
         result = {}
         
-        for r in rows:
-            aid = str(r[0])
-            # 인덱스가 딱 4번(절대습도)까지만 깔끔하게 떨어집니다.
+        for aid, r in snapshot.items():
+            # col_1(온도) ~ col_4(절대습도)
             result[aid] = {
-                "temp": float(r[1]) if r[1] is not None else 0.0,
-                "relHumid": float(r[2]) if r[2] is not None else 0.0,
-                "dewPoint": float(r[3]) if r[3] is not None else 0.0,
-                "absHumid": float(r[4]) if r[4] is not None else 0.0
+                "temp": float(r["col_1"]) if r["col_1"] is not None else 0.0,
+                "relHumid": float(r["col_2"]) if r["col_2"] is not None else 0.0,
+                "dewPoint": float(r["col_3"]) if r["col_3"] is not None else 0.0,
+                "absHumid": float(r["col_4"]) if r["col_4"] is not None else 0.0
             }
             
         # ⭐️ 시간 정보는 파이썬 서버의 현재 시간을 바로 생성해서 내려줍니다.
@@ -1297,8 +1416,10 @@ def get_data_info_inquiry_steaming():
         if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
         cur = conn.cursor()
 
-        # ⭐️ 가동 중(40도 이상) 필터 조건 동적 추가 (DB는 10배수인 400으로 비교)
-        active_cond = "AND (col_1 >= 400 OR col_2 >= 400)" if only_active.lower() == 'true' else ""
+        # ⭐️ 가동 중(40도 이상) 필터 조건 동적 추가 (DB는 10배수인 400으로 비교, services/channels 가동 기준)
+        ch = get_channels(v_db, "203", default="steaming")
+        t1, t2 = int(ch["col_1"].run_threshold), int(ch["col_2"].run_threshold)
+        active_cond = f"AND (col_1 >= {t1} OR col_2 >= {t2})" if only_active.lower() == 'true' else ""
 
         sql = f"""
             SELECT 
@@ -1315,15 +1436,12 @@ def get_data_info_inquiry_steaming():
         rows = cur.fetchall()
         conn.close()
 
+        # 스케일링 적용 (services/channels 정의: 온도 /10, 염도/당도 /1000, 소수 1자리) - 전체 행 한 번에
+        values = scale_rows(rows, [2, 3, 4, 5], ch, ["col_1", "col_2", "col_3", "col_4"], decimals=1)
+
         data = []
-        for i, r in enumerate(rows):
+        for i, (r, (temp1, temp2, salinity, brix)) in enumerate(zip(rows, values)):
             cr_dt = r[0].strftime('%Y-%m-%d %H:%M:%S') if r[0] else ""
-            
-            # 스케일링 적용
-            temp1 = round(float(r[2]) / 10.0, 1) if r[2] is not None else 0.0
-            temp2 = round(float(r[3]) / 10.0, 1) if r[3] is not None else 0.0
-            salinity = round(float(r[4]) / 1000.0, 1) if r[4] is not None else 0.0
-            brix = round(float(r[5]) / 1000.0, 1) if r[5] is not None else 0.0
 
             data.append({
                 "key": f"steam_{i}", 
@@ -1348,37 +1466,316 @@ def get_analytics_raw_steaming():
     from_dt = request.args.get("from_dt")
     to_dt = request.args.get("to_dt")
 
+    from_t = parse_dt(from_dt)
+    to_t = parse_dt(to_dt, end_of_day=True)
+    if not from_t or not to_t:
+        return jsonify({"error": "날짜 파라미터가 필요합니다."}), 400
+    range_error = check_range(from_t, to_t)
+    if range_error:
+        return jsonify({"error": range_error}), 400
+
     try:
-        conn = get_db_connection(v_db)
-        if conn is None: return jsonify({"error": "DB 실패"}), 500
-        cur = conn.cursor()
-        
+        # 마감 일자는 로컬 캐시(services/smart_log_cache), 오늘 데이터만 DB 에서 조회
+        loaded = load_range(v_db, "203", from_t, to_t)
+        if loaded is None: return jsonify({"error": "DB 실패"}), 500
+        times, cols = loaded
+
         # 증숙로(203)의 가동 중인 데이터(온도 40도 이상)만 가져옵니다.
-        sql = """
-            SELECT col_1, col_2, col_3, col_4, cr_dt
-            FROM dbo.smart_log
-            WHERE auto_id = '203'
-              AND cr_dt >= CONVERT(DATETIME, ?, 120) 
-              AND cr_dt <= CONVERT(DATETIME, ? + ' 23:59:59', 120)
-              AND (col_1 >= 400 OR col_2 >= 400) 
-            ORDER BY cr_dt ASC
-        """
-        cur.execute(sql, (from_dt, to_dt))
-        rows = cur.fetchall()
-        conn.close()
+        ch = get_channels(v_db, "203", default="steaming")
+        running = (cols["col_1"] >= ch["col_1"].run_threshold) | (cols["col_2"] >= ch["col_2"].run_threshold)
+        # 증숙로 스케일링 규칙 적용 (온도 1/10, 염도/당도 1/1000) - 컬럼 배열 단위로 한 번에
+        cols = scale_columns(cols, ch, decimals=1)
+        rows = to_rows(times, cols, ["col_1", "col_2", "col_3", "col_4", "cr_dt"], mask=running)
 
         data = []
         for r in rows:
-            # 증숙로 스케일링 규칙 적용 (온도 1/10, 염도/당도 1/1000)
             data.append({
-                "temp1": round(float(r[0])/10.0, 1) if r[0] else 0,
-                "temp2": round(float(r[1])/10.0, 1) if r[1] else 0,
-                "salinity": round(float(r[2])/1000.0, 1) if r[2] else 0,
-                "brix": round(float(r[3])/1000.0, 1) if r[3] else 0,
+                "temp1": r[0] or 0,
+                "temp2": r[1] or 0,
+                "salinity": r[2] or 0,
+                "brix": r[3] or 0,
                 "time": r[4].strftime('%Y-%m-%d %H:%M') if r[4] else ""
             })
         return jsonify(data), 200
         
     except Exception as e:
         print(f"Error in get_analytics_raw_steaming: {str(e)}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+# ==============================================================
+# 21. [GET] 실시간 관제 SSE 스트림 (용접/절곡/혼합)
+# URL: /api/data/realtime-stream?v_db=18_DY&panel=welding
+# 1초 폴링 대신 연결 하나를 유지하고, smart_last.cr_dt 가 바뀔 때만 새 데이터를 보냅니다.
+# 스트림 하나가 서버 스레드 하나를 점유하므로 SSE_MAX_LIFETIME_SEC 가 지나면 닫고(EventSource 가 자동 재연결),
+# 동시 스트림은 SSE_MAX_STREAMS 개까지만 받습니다. (초과 시 503, 클라이언트는 retry 후 재시도)
+# ==============================================================
+SSE_CHECK_INTERVAL_SEC = 1.0   # 스냅샷 변경 여부 확인 주기
+SSE_HEARTBEAT_SEC = 15         # 변경이 없어도 이 주기로 주석 라인을 보내 연결 유지
+SSE_MAX_LIFETIME_SEC = 300     # 스트림 최대 유지 시간 (지나면 종료 -> 브라우저 재연결)
+SSE_MAX_STREAMS = 20           # 동시에 열어 둘 수 있는 최대 스트림 수
+
+_sse_active = 0
+_sse_lock = threading.Lock()
+
+# panel -> (구독 auto_id 목록, 기본 v_db, 화면 데이터 생성 함수)
+REALTIME_PANELS = {
+    "welding": (["201", "203"], "18_DY", _build_welding_realtime),
+    "bending": (["205"], "18_DY", _build_bending_realtime),
+    "mixing":  (["205"], "31_ST_2025", _build_mixing_realtime),
+}
+
+@data_bp.route('/realtime-stream', methods=['GET'])
+def stream_realtime():
+    panel = request.args.get("panel", "welding")
+    if panel not in REALTIME_PANELS:
+        return jsonify({"error": f"지원하지 않는 panel 입니다: {panel}"}), 400
+
+    auto_ids, default_db, build_payload = REALTIME_PANELS[panel]
+    v_db = request.args.get("v_db", default_db)
+
+    global _sse_active
+    with _sse_lock:
+        if _sse_active >= SSE_MAX_STREAMS:
+            return jsonify({"error": "실시간 스트림 연결 수가 초과되었습니다. 잠시 후 다시 시도하세요."}), 503
+        _sse_active += 1
+
+    # 제너레이터는 요청 컨텍스트 밖에서 돌므로 JSON 공급자(msgspec)를 미리 잡아 둠
+    json_provider = current_app.json
+
+    def release():
+        # 클라이언트가 끊거나 최대 유지 시간이 지나 응답이 닫히면 자리 반납
+        global _sse_active
+        with _sse_lock:
+            _sse_active -= 1
+
+    def generate():
+        started = last_sent = time.monotonic()
+        last_version = None
+        # 연결이 끊기면 브라우저(EventSource)가 3초 후 자동 재연결
+        yield "retry: 3000\n\n"
+
+        while time.monotonic() - started < SSE_MAX_LIFETIME_SEC:
+            snapshot = get_snapshot(v_db, auto_ids)
+            version = None
+            if snapshot is not None:
+                version = tuple(snapshot[a]["cr_dt"] if a in snapshot else None for a in auto_ids)
+
+            if version is not None and version != last_version:
+                try:
+                    payload, status = build_payload(v_db)
+                except Exception as e:
+                    print(f"Error in stream_realtime ({panel}): {str(e)}")
+                    payload, status = None, 500
+                if status == 200:
+                    yield f"data: {json_provider.dumps(payload)}\n\n"
+                    last_version = version
+                    last_sent = time.monotonic()
+
+            if time.monotonic() - last_sent >= SSE_HEARTBEAT_SEC:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+
+            time.sleep(SSE_CHECK_INTERVAL_SEC)
+
+    response = Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # 프록시(nginx) 버퍼링 방지
+    })
+    response.call_on_close(release)
+    return response
+
+# ==============================================================
+# 22. [GET] 공통 센서 시계열 집계 조회 (공정 공용)
+# URL: /api/data/series?v_db=31_ST_2025&auto_id=205&cols=col_4,col_7
+#          &from_dt=2025-01-01&to_dt=2025-01-31&bucket=1h&agg=avg,max&scale=col_4:0.1,col_7:0.1
+# 공정별 이력 API 를 따로 만들지 않고, 설비/컬럼/구간/집계 방식을 파라미터로 받아
+# GROUP BY 쿼리 한 번으로 구간별 집계를 반환합니다.
+# 응답: {"bucket": ["2025-01-01 00:00:00", ...], "col_4": {"avg": [...], "max": [...]}, ...}
+# scale 을 생략한 컬럼은 업체/설비 채널 정의(services/channels)의 배율로 실제값 변환 (scale=raw 면 저장값)
+# ==============================================================
+SERIES_COLUMNS = ["col_1", "col_2", "col_3", "col_4", "col_5", "col_6", "col_7", "col_8"]
+SERIES_AGGS = ["avg", "min", "max", "last", "count"]
+SERIES_MAX_BUCKETS = 20000     # 한 번에 반환할 수 있는 최대 구간 수
+
+# bucket -> (구간 시작 계산식, 구간 길이(분))
+SERIES_BUCKETS = {
+    "1m": ("DATEADD(MINUTE, DATEDIFF(MINUTE, 0, cr_dt), 0)", 1),
+    "5m": ("DATEADD(MINUTE, DATEDIFF(MINUTE, 0, cr_dt) / 5 * 5, 0)", 5),
+    "1h": ("DATEADD(HOUR, DATEDIFF(HOUR, 0, cr_dt), 0)", 60),
+    "1d": ("DATEADD(DAY, DATEDIFF(DAY, 0, cr_dt), 0)", 1440),
+}
+
+def _parse_scales(value):
+    """'col_4:0.1,col_7:0.01' -> {"col_4": 0.1, "col_7": 0.01}"""
+    scales = {}
+    for part in (value or "").split(","):
+        if ":" not in part:
+            continue
+        col, factor = part.split(":", 1)
+        scales[col.strip()] = float(factor)
+    return scales
+
+@data_bp.route('/series', methods=['GET'])
+def get_series():
+    v_db = request.args.get("v_db")
+    auto_id = request.args.get("auto_id")
+    cols = [c.strip() for c in request.args.get("cols", "").split(",") if c.strip()]
+    aggs = [a.strip() for a in request.args.get("agg", "avg").split(",") if a.strip()]
+    bucket = request.args.get("bucket", "1h")
+    from_t = parse_dt(request.args.get("from_dt"))
+    to_t = parse_dt(request.args.get("to_dt"), end_of_day=True)
+
+    if not v_db or not auto_id or not cols:
+        return jsonify({"error": "v_db, auto_id, cols 파라미터가 필요합니다."}), 400
+    if not from_t or not to_t:
+        return jsonify({"error": "날짜 파라미터가 필요합니다."}), 400
+    if any(c not in SERIES_COLUMNS for c in cols):
+        return jsonify({"error": f"cols 는 {', '.join(SERIES_COLUMNS)} 중에서 선택하세요."}), 400
+    if not aggs or any(a not in SERIES_AGGS for a in aggs):
+        return jsonify({"error": f"agg 는 {', '.join(SERIES_AGGS)} 중에서 선택하세요."}), 400
+    if bucket not in SERIES_BUCKETS:
+        return jsonify({"error": f"bucket 은 {', '.join(SERIES_BUCKETS)} 중에서 선택하세요."}), 400
+    try:
+        scales = _parse_scales(request.args.get("scale"))
+    except ValueError:
+        return jsonify({"error": "scale 형식이 올바르지 않습니다. (예: col_4:0.1)"}), 400
+
+    bucket_expr, bucket_min = SERIES_BUCKETS[bucket]
+    if (to_t - from_t).total_seconds() / 60 / bucket_min > SERIES_MAX_BUCKETS:
+        return jsonify({"error": f"구간 수가 {SERIES_MAX_BUCKETS}개를 넘습니다. 기간을 줄이거나 bucket 을 늘려주세요."}), 400
+
+    # 집계식 구성 (컬럼/집계명은 위에서 화이트리스트 검증됨)
+    exprs = []
+    for c in cols:
+        for a in aggs:
+            if a == "avg":
+                exprs.append(f"AVG(CAST({c} AS FLOAT))")
+            elif a == "min":
+                exprs.append(f"MIN({c})")
+            elif a == "max":
+                exprs.append(f"MAX({c})")
+            elif a == "count":
+                exprs.append(f"COUNT({c})")
+            elif a == "last":
+                # 구간 내 가장 마지막 행(rn = 1)의 값
+                exprs.append(f"MAX(CASE WHEN rn = 1 THEN {c} END)")
+
+    rn_expr = f", ROW_NUMBER() OVER(PARTITION BY {bucket_expr} ORDER BY cr_dt DESC) as rn" if "last" in aggs else ""
+    sql = f"""
+        SELECT bucket, {", ".join(exprs)}
+        FROM (
+            SELECT {bucket_expr} as bucket, {", ".join(cols)}{rn_expr}
+            FROM dbo.smart_log
+            WHERE auto_id = ?
+              AND cr_dt >= ? AND cr_dt <= ?
+        ) t
+        GROUP BY bucket
+        ORDER BY bucket
+    """
+
+    try:
+        conn = get_db_connection(v_db)
+        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
+        cur = conn.cursor()
+        cur.execute(sql, (auto_id, from_t, to_t))
+        rows = cur.fetchall()
+        conn.close()
+
+        buckets = [r[0] for r in rows]
+        values = np.array([[np.nan if v is None else float(v) for v in r[1:]] for r in rows], dtype=float).reshape(len(rows), len(exprs))
+
+        # 컬럼별 스케일을 열 단위로 한 번에 적용 (count 는 제외)
+        # scale 파라미터가 없는 컬럼은 채널 정의(services/channels)의 저장 배율을 사용, scale=raw 면 저장값 그대로
+        ch = {} if request.args.get("scale") == "raw" else get_channels(v_db, auto_id)
+        factors = np.array([1.0 if a == "count" else scales.get(c, 1.0 / ch[c].scale if c in ch else 1.0)
+                            for c in cols for a in aggs])
+        values = values * factors
+
+        result = {"bucket": [b.strftime('%Y-%m-%d %H:%M:%S') for b in buckets]}
+        i = 0
+        for c in cols:
+            result[c] = {}
+            for a in aggs:
+                column = values[:, i]
+                if a == "count":
+                    result[c][a] = np.nan_to_num(column).astype(int).tolist()
+                else:
+                    # 값이 없는 구간(NULL)은 null
+                    result[c][a] = [None if np.isnan(v) else v for v in column.tolist()]
+                i += 1
+
+        return jsonify(result), 200
+
+    except Exception as e:
+        print(f"Error in get_series: {str(e)}")
+        return jsonify({"error": f"데이터 조회 오류: {str(e)}"}), 500
+
+# ==============================================================
+# 23. [GET] 설비 채널 정의 조회 (컬럼별 이름/단위/배율/가동 기준)
+# URL: /api/data/channels?v_db=31_ST_2025&auto_id=205
+# 화면에서 col_n 의 표시명/단위를 하드코딩하지 않도록 services/channels 정의를 그대로 내려줍니다.
+# ==============================================================
+@data_bp.route('/channels', methods=['GET'])
+def get_channel_info():
+    v_db = request.args.get("v_db")
+    auto_id = request.args.get("auto_id")
+    if not v_db or not auto_id:
+        return jsonify({"error": "v_db, auto_id 파라미터가 필요합니다."}), 400
+
+    channels = get_channels(v_db, auto_id)
+    return jsonify([
+        {"col": col, "key": ch.key, "label": ch.label, "unit": ch.unit,
+         "scale": ch.scale, "run_threshold": ch.run_threshold, "info_threshold": ch.info_threshold}
+        for col, ch in sorted(channels.items())
+    ]), 200
+
+# ==============================================================
+# 24. [GET] 대시보드 묶음 조회 (여러 패널을 한 번의 요청으로)
+# URL: /api/data/dashboard?v_db=18_DY&panels=welding,bending,bending-hourly,production-orders
+# 패널별 API 를 따로 호출하면 요청마다 HTTP 왕복, 커넥션 대여, 사용 로그 기록이 반복됩니다.
+# 요청한 패널들을 풀의 커넥션으로 병렬 계산해 하나의 JSON 으로 반환합니다.
+# 응답: {"welding": {...}, "bending-hourly": [...], ..., "errors": {패널: 오류 메시지}}
+# ==============================================================
+DASHBOARD_MAX_WORKERS = 4      # 패널 병렬 계산 스레드 수 (업체별 풀 크기 POOL_MAX_SIZE 보다 작게)
+
+# panel -> 화면 데이터 생성 함수 (payload, status)
+DASHBOARD_PANELS = {
+    "welding": _build_welding_realtime,
+    "bending": _build_bending_realtime,
+    "bending-hourly": _build_bending_hourly,
+    "production-orders": _build_production_orders,
+    "mixing": _build_mixing_realtime,
+}
+
+@data_bp.route('/dashboard', methods=['GET'])
+@coalesce
+def get_dashboard():
+    v_db = request.args.get("v_db", "18_DY")
+    panels = [p.strip() for p in request.args.get("panels", "").split(",") if p.strip()]
+    if not panels:
+        return jsonify({"error": "panels 파라미터가 필요합니다."}), 400
+    unknown = [p for p in panels if p not in DASHBOARD_PANELS]
+    if unknown:
+        return jsonify({"error": f"지원하지 않는 panel 입니다: {', '.join(unknown)}"}), 400
+    panels = list(dict.fromkeys(panels))   # 중복 제거 (순서 유지)
+
+    def build(panel):
+        try:
+            return DASHBOARD_PANELS[panel](v_db)
+        except Exception as e:
+            print(f"Error in get_dashboard ({panel}): {str(e)}")
+            return {"error": f"데이터 조회 오류: {str(e)}"}, 500
+
+    # 패널끼리는 서로 독립적이므로 동시에 계산 (각 패널은 풀에서 커넥션을 빌려 씀)
+    with ThreadPoolExecutor(max_workers=min(DASHBOARD_MAX_WORKERS, len(panels))) as pool:
+        results = list(pool.map(build, panels))
+
+    # 패널 하나가 실패해도 나머지는 그대로 반환하고, 실패한 패널은 errors 에 기록
+    result = {"errors": {}}
+    for panel, (payload, status) in zip(panels, results):
+        if status >= 400:
+            result["errors"][panel] = payload.get("error") if isinstance(payload, dict) else str(payload)
+        else:
+            result[panel] = payload
+    return jsonify(result), 200
@@ -1,5 +1,9 @@
 from flask import Blueprint, request, jsonify
 from db import get_db_connection
+from services.delta_snapshot import delta_response
+from services.sequence import insert_with_code, executemany_with_codes
+from services.bulk import read_items, bulk_result
+from services.ref_cache import get_ref
 import datetime
 
 segsan_bp = Blueprint('segsan', __name__, url_prefix='/api/segsan')
@@ -21,14 +25,10 @@ def insert_segsan():
         conn = get_db_connection(v_db)
         cur = conn.cursor()
 
-        # PK 자동생성
+        # PK 자동생성 (services/sequence 예약 구간에서 채번, 중복 키면 새 번호로 재시도)
         yy = segsan_dt[2:4]
         mm = segsan_dt[4:6]
         prefix = f"B{yy}{mm}F"
-        cur.execute(f"SELECT MAX(segsan_cd) FROM segsan_mst WHERE segsan_cd LIKE '{prefix}%'")
-        row = cur.fetchone()
-        new_seq = str(int(row[0][-5:]) + 1).zfill(5) if row and row[0] else "00001"
-        new_segsan_cd = f"{prefix}{new_seq}"
 
         # INSERT
         sql = """
@@ -39,7 +39,11 @@ def insert_segsan():
             (?, '01', ?, ?, ?, 
              'P1200', '모바일', '모바일', '0900', '1800', GETDATE(), '1', 'Y', '01')
         """
-        cur.execute(sql, (new_segsan_cd, segsan_dt, jepum_cd, amt))
+        new_segsan_cd = insert_with_code(conn, v_db, "segsan_mst", "segsan_cd", prefix,
+                                         lambda code: cur.execute(sql, (code, segsan_dt, jepum_cd, amt)))
+        if new_segsan_cd is None:
+            conn.close()
+            return jsonify({"error": "DB 연결 실패"}), 500
         conn.commit()
         conn.close()
         return jsonify({"message": "등록 성공", "segsan_cd": new_segsan_cd}), 200
@@ -49,6 +53,7 @@ def insert_segsan():
 # ==============================================================
 #  2. [GET] 생산실적 조회 (기간별)
 #  URL: /api/segsan/list?v_db=...&from_dt=20251101&to_dt=20251130
+#       &since=<이전 응답 토큰> 이면 변경분만 (services/delta_snapshot.py)
 # ==============================================================
 @segsan_bp.route('/list', methods=['GET'])
 def get_segsan_list():
@@ -60,17 +65,17 @@ def get_segsan_list():
         conn = get_db_connection(v_db)
         cur = conn.cursor()
 
-        # 제품명(jepum_nm)을 가져오기 위해 JOIN 사용
+        # 제품명(jepum_nm)은 JOIN 대신 기준정보 캐시에서 붙임 (services/ref_cache.py)
         sql = """
-            SELECT s.segsan_cd, s.segsan_dt, s.jepum_cd, j.jepum_nm, s.amt
+            SELECT s.segsan_cd, s.segsan_dt, s.jepum_cd, s.amt
             FROM segsan_mst s
-            LEFT JOIN jepum_code j ON s.jepum_cd = j.jepum_cd
             WHERE s.segsan_dt BETWEEN ? AND ?
             ORDER BY s.segsan_dt DESC, s.segsan_cd DESC
         """
         cur.execute(sql, (from_dt, to_dt))
         rows = cur.fetchall()
         conn.close()
+        jepum = get_ref(v_db, "jepum")
 
         data = []
         for row in rows:
@@ -78,9 +83,13 @@ def get_segsan_list():
                 "segsan_cd": row[0],
                 "segsan_dt": row[1],
                 "jepum_cd": row[2],
-                "jepum_nm": row[3],
-                "amt": float(row[4]) if row[4] else 0
+                "jepum_nm": jepum.name(row[2]),
+                "amt": float(row[3]) if row[3] else 0
             })
+        # ?since=<토큰> : 이전 응답 이후 추가/변경/삭제된 행만 (빈 값이면 전체 + 토큰)
+        if "since" in request.args:
+            scope = (v_db, "segsan-list", from_dt, to_dt)
+            return jsonify(delta_response(data, "segsan_cd", scope, request.args.get("since"))), 200
         return jsonify(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -125,4 +134,68 @@ def delete_segsan():
         conn.close()
         return jsonify({"message": "삭제 성공"}), 200
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+# ==============================================================
+#  5. [POST] 생산실적 일괄 등록
+#  Body: [{"segsan_dt": "20251101", "jepum_cd": "...", "amt": 10}, ...]
+#  검증 -> segsan_cd 일괄 채번 -> fast_executemany 한 번 -> 커밋 한 번 (services/bulk)
+# ==============================================================
+@segsan_bp.route('/insert-bulk', methods=['POST'])
+def insert_segsan_bulk():
+    v_db = request.args.get("v_db")
+    if not v_db: return jsonify({"error": "v_db missing"}), 400
+
+    items, error = read_items()
+    if error: return jsonify({"error": error}), 400
+
+    results, rows = [], []
+    for i, item in enumerate(items):
+        segsan_dt = str(item.get("segsan_dt") or "").replace("-", "")
+        jepum_cd  = item.get("jepum_cd")
+        amt       = item.get("amt", 0)
+        if len(segsan_dt) != 8 or not segsan_dt.isdigit():
+            results.append({"index": i, "ok": False, "error": "segsan_dt 형식 오류 (YYYYMMDD)"})
+        elif not jepum_cd:
+            results.append({"index": i, "ok": False, "error": "jepum_cd 누락"})
+        elif isinstance(amt, bool) or not isinstance(amt, (int, float)):
+            results.append({"index": i, "ok": False, "error": "amt 는 숫자여야 합니다."})
+        else:
+            rows.append((i, segsan_dt, jepum_cd, amt))
+
+    if not rows:
+        return jsonify(bulk_result(results)), 400
+
+    try:
+        conn = get_db_connection(v_db)
+        if conn is None: return jsonify({"error": "DB 연결 실패"}), 500
+
+        sql = """
+            INSERT INTO segsan_mst 
+            (segsan_cd, segsan_seq, segsan_dt, jepum_cd, amt, 
+             dept_cd, man_cd, write_nm, from_tm, to_tm, write_dt, stock_how, last_yn, segsan_plan_seq)
+            VALUES 
+            (?, '01', ?, ?, ?, 
+             'P1200', '모바일', '모바일', '0900', '1800', GETDATE(), '1', 'Y', '01')
+        """
+        # PK 는 생산일자 연월별 prefix (B + YYMM + F) 로 채번
+        prefixes = [f"B{r[1][2:4]}{r[1][4:6]}F" for r in rows]
+        inserted = executemany_with_codes(conn, v_db, "segsan_mst", "segsan_cd", prefixes, sql,
+                                       lambda k, code: (code, rows[k][1], rows[k][2], rows[k][3]))
+        if inserted is None:
+            conn.close()
+            return jsonify({"error": "DB 연결 실패"}), 500
+        conn.commit()
+        conn.close()
+
+        # DB 에서 실패한 항목(FK, 길이 초과 등)은 그 항목만 제외하고 나머지는 등록됨
+        codes, errors = inserted
+        for r, code, err in zip(rows, codes, errors):
+            if err is None:
+                results.append({"index": r[0], "ok": True, "segsan_cd": code})
+            else:
+                results.append({"index": r[0], "ok": False, "error": err})
+        body = bulk_result(results)
+        return jsonify(body), 200 if body["inserted"] else 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
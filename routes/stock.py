@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, jsonify
 from db import get_db_connection
+from services.ref_cache import get_ref
 
 stock_bp = Blueprint('stock', __name__, url_prefix='/api/stock')
 
@@ -26,12 +27,12 @@ def get_stock_list():
         # ---------------------------------------------------------
         # SQL 작성
         # 1. A: stock_sum_v6 (재고 뷰)
-        # 2. B: jepum_code (제품 기준정보 - 이름, 구분코드 등)
+        # 2. B: jepum_code (구분코드 필터, 제품명 정렬용)
+        #    제품명 값 자체는 기준정보 캐시에서 붙임 (services/ref_cache.py)
         # ---------------------------------------------------------
         sql = """
             SELECT 
                 A.jepum_cd, 
-                B.jepum_nm, 
                 A.stock_tot
             FROM stock_sum_v6 A
             LEFT JOIN jepum_code B ON A.jepum_cd = B.jepum_cd
@@ -53,13 +54,15 @@ def get_stock_list():
         cur.execute(sql, tuple(params))
         rows = cur.fetchall()
         conn.close()
+        jepum = get_ref(v_db, "jepum")
 
         data = []
         for row in rows:
+            jepum_nm = jepum.name(row[0])
             data.append({
                 "jepum_cd": row[0],
-                "jepum_nm": row[1] if row[1] else row[0],
-                "stock_tot": float(row[2])
+                "jepum_nm": jepum_nm if jepum_nm else row[0],
+                "stock_tot": float(row[1])
             })
 
         return jsonify(data), 200
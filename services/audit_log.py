@@ -0,0 +1,120 @@
+# services/audit_log.py
+# bmtlogh(사용 로그) 비동기 일괄 기록기
+#
+# 요청 처리 스레드는 큐에 한 줄을 넣고 바로 반환하고,
+# 백그라운드 스레드가 업체(v_db)별로 모아서 executemany 한 번으로 INSERT 합니다.
+
+import atexit
+import queue
+import threading
+import time
+
+import pyodbc
+from db import get_db_connection
+
+FLUSH_INTERVAL_MS = 1000   # 최대 이 시간(ms)마다 한 번씩 기록
+FLUSH_BATCH_SIZE = 200     # 이만큼 쌓이면 시간과 관계없이 바로 기록
+QUEUE_MAX_SIZE = 10000     # DB 장애 시 메모리가 무한히 늘지 않도록 상한 (초과분은 버림)
+
+INSERT_SQL = """
+    INSERT INTO bmtlogh (
+        emp_no, in_time, user_id, org_cd, dept_cd,
+        used_pgm, used_cnt,
+        emp_nmk, ip_addr, used_cnt3
+    ) VALUES (
+        ?, ?, ?, ?, ?,
+        ?, ?,
+        ?, ?, ?
+    )
+"""
+
+_queue = queue.Queue(maxsize=QUEUE_MAX_SIZE)
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def enqueue(v_db, row):
+    """
+    로그 한 줄을 큐에 넣습니다. 절대 블로킹하지 않습니다.
+    row: INSERT_SQL 의 파라미터 순서와 동일한 튜플
+    """
+    _ensure_worker()
+    try:
+        _queue.put_nowait((v_db, row))
+    except queue.Full:
+        print(f"[Log Error] audit queue full, dropped log (vendor={v_db})")
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            # gunicorn 등에서 fork 이후 첫 요청 시점에 프로세스별로 스레드가 생성됩니다.
+            _worker = threading.Thread(target=_run, name="audit-log-writer", daemon=True)
+            _worker.start()
+
+
+def _run():
+    while True:
+        batch = _collect_batch()
+        if batch:
+            _flush(batch)
+
+
+def _collect_batch():
+    """첫 건을 기다린 뒤, FLUSH_INTERVAL_MS 또는 FLUSH_BATCH_SIZE 중 먼저 도달할 때까지 모읍니다."""
+    batch = [_queue.get()]
+    deadline = time.monotonic() + FLUSH_INTERVAL_MS / 1000.0
+    while len(batch) < FLUSH_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _flush(batch):
+    by_tenant = {}
+    for v_db, row in batch:
+        by_tenant.setdefault(v_db, []).append(row)
+
+    for v_db, rows in by_tenant.items():
+        conn = None
+        try:
+            conn = get_db_connection(v_db)
+            if not conn:
+                continue
+            cur = conn.cursor()
+            cur.executemany(INSERT_SQL, rows)
+            conn.commit()
+        except pyodbc.ProgrammingError as e:
+            # SQL State 42S02: Base table or view not found
+            # 테이블이 없는 업체는 조용히 무시
+            if '42S02' not in str(e):
+                print(f"[Log Error] Programming Error: {e}")
+        except Exception as e:
+            # 로그 기록 실패가 API 동작에 영향을 주지 않도록 출력만 하고 넘어감
+            print(f"[Log Error] Failed to insert {len(rows)} logs (vendor={v_db}): {e}")
+        finally:
+            if conn:
+                conn.close()
+
+
+def flush_pending():
+    """큐에 남은 로그를 현재 스레드에서 바로 기록합니다. (프로세스 종료 시)"""
+    batch = []
+    while True:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _flush(batch)
+
+
+atexit.register(flush_pending)
@@ -0,0 +1,79 @@
+# services/bulk.py
+# 일괄 등록 API 공통 처리
+#
+# 작업자가 LOT 수십 건을 연달아 입력할 때 1건 = HTTP 1회(커넥션, 채번, 커밋, 사용 로그 각 1회) 대신
+# 배열 하나로 받아 검증 -> 번호 일괄 채번 -> fast_executemany 한 번 -> 커밋 한 번으로 처리합니다.
+#
+# 요청 본문: [{...}, {...}] 또는 {"items": [{...}, ...]}
+# 응답: {"inserted": 등록 건수, "results": [{"index": 0, "ok": true, ...}, {"index": 1, "ok": false, "error": "..."}]}
+#       검증에 실패한 항목만 제외하고 나머지는 한 트랜잭션으로 등록합니다.
+#       DB 에서 실패하면(이미 있는 키, FK, 길이 초과 등) 롤백 후 한 건씩 저장점(SAVE TRANSACTION) 안에서 다시 실행해
+#       실패한 항목만 되돌리고 "ok": false 로 알려 줍니다. (트랜잭션 전체가 중단되는 오류면 전체 실패)
+
+import pyodbc
+from flask import request
+
+BULK_MAX_ITEMS = 500     # 한 번에 받을 수 있는 최대 건수
+SAVEPOINT = "bulk_item"  # 항목별 저장점 이름
+
+
+def read_items():
+    """요청 본문에서 항목 배열을 꺼냅니다. 반환값: (items, 오류 메시지)"""
+    data = request.get_json(silent=True)
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return None, "등록할 항목 배열이 필요합니다."
+    if len(items) > BULK_MAX_ITEMS:
+        return None, f"한 번에 최대 {BULK_MAX_ITEMS}건까지 등록할 수 있습니다."
+    if not all(isinstance(item, dict) for item in items):
+        return None, "항목은 JSON 객체여야 합니다."
+    return items, None
+
+
+def bulk_result(results):
+    """항목별 결과 리스트(index 순)로 응답 본문을 만듭니다."""
+    results = sorted(results, key=lambda r: r["index"])
+    return {"inserted": sum(1 for r in results if r["ok"]), "results": results}
+
+
+def save_point(cur):
+    """항목 하나를 실행하기 전 저장점을 만듭니다. (수동 커밋 모드에서 트랜잭션이 아직 없으면 시작)"""
+    cur.execute(f"IF @@TRANCOUNT = 0 BEGIN TRANSACTION; SAVE TRANSACTION {SAVEPOINT}")
+
+
+def rollback_to_save_point(cur):
+    """실패한 항목 하나만 되돌립니다. 앞서 성공한 항목은 트랜잭션에 남습니다."""
+    cur.execute(f"ROLLBACK TRANSACTION {SAVEPOINT}")
+
+
+def execute_each(conn, sql, params_list):
+    """
+    params_list 를 한 건씩 저장점 안에서 실행합니다. 실패한 항목만 되돌리고 나머지는 계속합니다.
+    반환값: 항목별 오류 메시지 리스트 (성공은 None). 커밋은 호출부에서 합니다.
+    """
+    cur = conn.cursor()
+    errors = []
+    for params in params_list:
+        save_point(cur)
+        try:
+            cur.execute(sql, params)
+            errors.append(None)
+        except pyodbc.Error as e:
+            rollback_to_save_point(cur)
+            errors.append(str(e))
+    return errors
+
+
+def executemany_or_each(conn, sql, params_list):
+    """
+    fast_executemany 로 한 번에 실행하고, DB 오류가 나면 롤백 후 execute_each 로 다시 실행해 실패한 항목을 찾습니다.
+    반환값: 항목별 오류 메시지 리스트 (성공은 None). 커밋은 호출부에서 합니다.
+    """
+    try:
+        cur = conn.cursor()
+        cur.fast_executemany = True
+        cur.executemany(sql, params_list)
+        return [None] * len(params_list)
+    except pyodbc.Error:
+        conn.rollback()
+    return execute_each(conn, sql, params_list)
@@ -0,0 +1,136 @@
+# services/channels.py
+# 업체별 센서 채널 정의 (auto_id + col_n -> 이름 / 단위 / 스케일 / 가동 기준)
+#
+# smart_log / smart_last 의 col_1 ~ col_8 은 설비마다 의미와 저장 배율이 다릅니다.
+# (예: 온도는 10배, 당도는 100배, 증숙로 염도/당도는 1000배 정수로 저장)
+# 이 배율과 가동 판정 기준을 API 마다 / 10.0, >= 800 처럼 따로 적지 않고 여기 한 곳에 정의합니다.
+# 새 설비를 붙일 때는 DEVICES 에 설비 유형을, TENANTS 에 업체의 auto_id -> 설비 유형을 추가하면 됩니다.
+#
+# 변환은 행마다 float(r[i]) / 10.0 을 반복하지 않고, 컬럼 배열 전체를 scale 벡터로 한 번에 나눕니다.
+
+from collections import namedtuple
+
+import numpy as np
+
+# key: 응답 필드명, scale: 저장값 / scale = 실제값, run_threshold: 저장값이 이 값 이상이면 가동 (없으면 None)
+# info_threshold: 저장값이 이 값을 넘으면 데이터 정보 조회(data-info-inquiry) 대상 (없으면 None)
+Channel = namedtuple("Channel", ["key", "label", "unit", "scale", "run_threshold", "info_threshold"],
+                     defaults=(None,))
+
+# 설비 유형 -> {컬럼: Channel}
+DEVICES = {
+    # 용접기 (두영기전 201/203)
+    "welding": {
+        "col_3": Channel("v", "전압", "V", 10.0, None),
+        "col_4": Channel("a", "전류", "A", 1.0, None),
+    },
+    # 절곡기 (두영기전 205) - col_1~5 는 규격 토글 스위치, col_6 은 누적 타발 수
+    "bending": {
+        "col_1": Channel("spec1", "규격 1", "", 1.0, None),
+        "col_2": Channel("spec2", "규격 2", "", 1.0, None),
+        "col_3": Channel("spec3", "규격 3", "", 1.0, None),
+        "col_4": Channel("spec4", "규격 4", "", 1.0, None),
+        "col_5": Channel("spec5", "규격 5", "", 1.0, None),
+        "col_6": Channel("stroke", "누적 타발", "회", 1.0, None),
+    },
+    # 혼합/추출/농축 (205) - 추출 80도(800), 농축 40도(400) 이상이면 가동
+    #                       데이터 정보 조회는 추출 40도(400), 농축 30도(300) 초과
+    "mixing": {
+        "col_1": Channel("a_cnt", "A 원료 투입", "회", 1.0, None),
+        "col_2": Channel("b_cnt", "B 원료 투입", "회", 1.0, None),
+        "col_3": Channel("weight", "투입 중량", "kg", 1.0, None),
+        "col_4": Channel("temp1", "1차 추출 온도", "°C", 10.0, 800, 400),
+        "col_5": Channel("temp2", "2차 추출 온도", "°C", 10.0, 800, 400),
+        "col_6": Channel("extBrix", "추출 당도", "Brix", 100.0, None),
+        "col_7": Channel("conTemp", "농축 온도", "°C", 10.0, 400, 300),
+        "col_8": Channel("conBrix", "농축 당도", "Brix", 100.0, None),
+    },
+    # 숙성 탱크 (206) - 탱크별 가동 여부 (0/1)
+    "aging": {
+        "col_1": Channel("tank1", "숙성 탱크 1호기", "", 1.0, 1),
+        "col_2": Channel("tank2", "숙성 탱크 2호기", "", 1.0, 1),
+        "col_3": Channel("tank3", "숙성 탱크 3호기", "", 1.0, 1),
+    },
+    # 증숙로 (203) - 온도 40도(400) 이상이면 가동
+    "steaming": {
+        "col_1": Channel("temp1", "탱크1 온도", "°C", 10.0, 400),
+        "col_2": Channel("temp2", "탱크2 온도", "°C", 10.0, 400),
+        "col_3": Channel("salinity", "염도", "%", 1000.0, None),
+        "col_4": Channel("brix", "당도", "Brix", 1000.0, None),
+    },
+}
+
+# 업체(v_db) -> {auto_id: 설비 유형}
+TENANTS = {
+    "18_DY": {"201": "welding", "203": "welding", "205": "bending"},
+    "31_ST_2025": {"205": "mixing", "206": "aging"},
+    "34_GN": {"203": "steaming"},
+}
+
+
+def get_channels(v_db, auto_id, default=None):
+    """
+    업체/설비의 채널 정의 {컬럼: Channel} 를 반환합니다.
+    TENANTS 에 없는 업체(테스트 DB 등)는 default 설비 유형을 사용하고, 그것도 없으면 빈 dict.
+    """
+    device = TENANTS.get(v_db, {}).get(str(auto_id), default)
+    return DEVICES.get(device, {})
+
+
+def scales_for(channels, cols):
+    """cols 순서의 스케일 벡터 (정의되지 않은 컬럼은 1)"""
+    return np.array([channels[c].scale if c in channels else 1.0 for c in cols], dtype=float)
+
+
+def scale_columns(cols, channels, decimals=None):
+    """smart_log_cache.load_range 의 {컬럼: 배열} 을 실제값 배열로 변환합니다. (NaN 은 그대로)"""
+    scaled = {}
+    for name, values in cols.items():
+        ch = channels.get(name)
+        values = values / ch.scale if ch is not None and ch.scale != 1.0 else values
+        scaled[name] = np.round(values, decimals) if decimals is not None else values
+    return scaled
+
+
+def scale_rows(rows, value_idxs, channels, cols, fill=0.0, decimals=None):
+    """
+    DB 조회 행들의 value_idxs 위치 값(각각 cols 컬럼)을 (n, k) 배열로 모아 한 번에 실제값으로 변환합니다.
+    NULL 은 fill 로 채운 2차원 리스트를 반환합니다.
+    """
+    values = np.array([[np.nan if r[i] is None else float(r[i]) for i in value_idxs] for r in rows],
+                      dtype=float).reshape(len(rows), len(value_idxs))
+    values = values / scales_for(channels, cols)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    return np.where(np.isnan(values), fill, values).tolist()
+
+
+def scale_value(channel, raw, fill=0.0):
+    """실시간 스냅샷 값 1개를 실제값으로 변환합니다."""
+    return float(raw) / channel.scale if raw is not None else fill
+
+
+def is_running(channel, raw):
+    """저장값이 채널의 가동 기준 이상인지 판정합니다."""
+    return raw is not None and channel.run_threshold is not None and float(raw) >= channel.run_threshold
+
+
+def info_mask(channels, cols, names):
+    """names 컬럼 중 하나라도 저장값이 채널의 데이터 조회 기준(info_threshold)을 넘는 행의 bool 배열. 기준이 없는 컬럼은 제외"""
+    mask = np.zeros(len(cols[names[0]]), dtype=bool)
+    for name in names:
+        ch = channels.get(name)
+        if ch is not None and ch.info_threshold is not None:
+            mask |= cols[name] > ch.info_threshold
+    return mask
+
+
+def is_info_value(channel, value):
+    """실제값(스케일 적용 후)이 채널의 데이터 조회 기준을 넘는지 판정합니다."""
+    return channel is not None and channel.info_threshold is not None and value > channel.info_threshold / channel.scale
+
+
+def runtime_rules(channels):
+    """가동 기준이 있는 채널로 services.runtime_counter 규칙 ((이름, 컬럼, 기준), ...) 을 만듭니다. 이름은 채널 key."""
+    return tuple((ch.key, col, ch.run_threshold) for col, ch in sorted(channels.items())
+                 if ch.run_threshold is not None)
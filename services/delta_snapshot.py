@@ -0,0 +1,76 @@
+# services/delta_snapshot.py
+# 목록 조회 증분(since) 응답
+#
+# 태블릿 앱은 등록/수정 직후 같은 기간 목록을 매번 통째로 다시 받습니다.
+# 마지막 응답의 행별 해시를 서버 메모리에 스냅샷으로 남기고, 토큰(since)으로 돌려받으면
+# 같은 조건의 현재 결과와 비교해 추가/변경된 행과 삭제된 키만 내려보냅니다.
+#
+# lot_hst 처럼 수정 시각 컬럼이 없는 테이블도 다룰 수 있고, 삭제도 감지됩니다.
+# 토큰이 만료되었거나(SNAPSHOT_TTL_SEC) 다른 워커 프로세스에서 발급된 경우에는
+# 전체 목록을 "full": true 로 내려보내므로 클라이언트는 목록을 통째로 교체하면 됩니다.
+#
+# 응답 형식: {"data": [추가/변경 행], "deleted": [삭제된 키], "since": 새 토큰, "full": bool}
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from services.json_provider import dumps_bytes
+from services.pagination import encode_cursor, decode_cursor
+
+SNAPSHOT_TTL_SEC = 3600      # 스냅샷 보관 시간
+SNAPSHOT_MAX = 500           # 보관 스냅샷 최대 개수 (오래된 것부터 제거)
+
+_snapshots = OrderedDict()   # sid -> (scope, {key: hash}, 생성 시각)
+_snapshots_lock = threading.Lock()
+
+
+def _row_hash(item):
+    return hashlib.md5(dumps_bytes(item)).hexdigest()
+
+
+def _get_snapshot(token, scope):
+    try:
+        sid = decode_cursor(token).get("sid")
+    except ValueError:
+        return None
+    with _snapshots_lock:
+        entry = _snapshots.get(sid)
+        if entry is None or entry[0] != scope or time.monotonic() - entry[2] > SNAPSHOT_TTL_SEC:
+            return None
+        return entry[1]
+
+
+def _put_snapshot(scope, hashes):
+    sid = uuid.uuid4().hex
+    now = time.monotonic()
+    with _snapshots_lock:
+        _snapshots[sid] = (scope, hashes, now)
+        while len(_snapshots) > SNAPSHOT_MAX:
+            _snapshots.popitem(last=False)
+        expired = [k for k, v in _snapshots.items() if now - v[2] > SNAPSHOT_TTL_SEC]
+        for k in expired:
+            del _snapshots[k]
+    return encode_cursor({"sid": sid})
+
+
+def delta_response(items, key, scope, since):
+    """
+    items: 현재 조회 결과(dict 리스트), key: 행 식별 컬럼명
+    scope: 같은 조건의 조회인지 구분하는 값 (v_db, 경로, 조회 조건 등의 튜플)
+    since: 이전 응답의 토큰 (빈 값이면 전체 응답)
+    """
+    hashes = {}
+    for item in items:
+        hashes[item[key]] = _row_hash(item)
+
+    prev = _get_snapshot(since, scope) if since else None
+    token = _put_snapshot(scope, hashes)
+    if prev is None:
+        return {"data": items, "deleted": [], "since": token, "full": True}
+
+    changed = [item for item in items if prev.get(item[key]) != hashes[item[key]]]
+    deleted = [k for k in prev if k not in hashes]
+    return {"data": changed, "deleted": deleted, "since": token, "full": False}
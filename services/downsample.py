@@ -0,0 +1,124 @@
+# services/downsample.py
+# 센서 이력 데이터 서버측 다운샘플링 (min/max 구간, LTTB)
+#
+# 기간 조회 API 는 1분 단위 원본 행을 모두 돌려주므로 한 달이면 수만 건이 됩니다.
+# 차트가 그릴 수 있는 점 수(max_points)에 맞춰 대표 행만 골라 응답 크기와 화면 렌더링 시간을 제한합니다.
+# 값을 새로 만들지 않고 원본 행 중 일부를 고르는 방식이라, 응답 형식은 그대로입니다.
+#
+#   minmax : 구간마다 각 값의 최소/최대 행을 남김 (알람/피크 보존, 기본값)
+#   lttb   : Largest-Triangle-Three-Buckets, 선 모양을 가장 잘 보존하는 점을 구간마다 1개 선택
+
+import numpy as np
+
+MIN_POINTS = 10           # max_points 하한 (너무 작으면 의미가 없음)
+DEFAULT_METHOD = "minmax"
+
+
+def parse_max_points(value):
+    """요청 파라미터 max_points 를 정수로 변환합니다. 없거나 잘못된 값이면 None (다운샘플링 안 함)."""
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return None
+    if n <= 0:
+        return None
+    return max(n, MIN_POINTS)
+
+
+def _to_float(values):
+    return np.array([float(v) if v is not None else np.nan for v in values], dtype=float)
+
+
+def _minmax_indices(ys, max_points):
+    """ys: (계열 수, n). 구간마다 계열별 최소/최대 위치를 남깁니다."""
+    n_series, n = ys.shape
+    n_buckets = max(max_points // (2 * n_series), 1)
+    size = -(-n // n_buckets)                  # ceil
+    pad = n_buckets * size - n
+
+    padded = np.pad(ys, ((0, 0), (0, pad)), constant_values=np.nan).reshape(n_series, n_buckets, size)
+    offsets = (np.arange(n_buckets) * size)[None, :]
+    lo = np.where(np.isnan(padded), np.inf, padded).argmin(axis=2) + offsets
+    hi = np.where(np.isnan(padded), -np.inf, padded).argmax(axis=2) + offsets
+
+    keep = np.concatenate([lo.ravel(), hi.ravel(), [0, n - 1]])
+    return np.unique(keep[keep < n])
+
+
+def _lttb_indices(x, ys, max_points):
+    """x: (n,), ys: (계열 수, n). 계열이 여러 개면 범위로 정규화한 삼각형 넓이의 합으로 판정합니다."""
+    n = len(x)
+    if max_points < 3:
+        return np.array([0, n - 1])
+
+    ys = np.nan_to_num(ys)
+    span = np.ptp(ys, axis=1)
+    ys = ys / np.where(span > 0, span, 1.0)[:, None]
+    x_span = np.ptp(x) or 1.0
+    x = x / x_span
+
+    n_buckets = max_points - 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(int)
+
+    keep = np.empty(max_points, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_buckets):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 1 < n_buckets:
+            c_x = x[edges[i + 1]:edges[i + 2]].mean()
+            c_y = ys[:, edges[i + 1]:edges[i + 2]].mean(axis=1)
+        else:
+            c_x, c_y = x[n - 1], ys[:, n - 1]
+
+        b_x, b_y = x[lo:hi], ys[:, lo:hi]
+        area = np.abs((x[a] - c_x) * (b_y - ys[:, [a]]) - (x[a] - b_x) * (c_y[:, None] - ys[:, [a]])).sum(axis=0)
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def select_indices(x, ys, max_points, method=DEFAULT_METHOD):
+    """
+    남길 행의 위치(오름차순)를 반환합니다.
+    x: 시간축 (n,) / ys: 값 계열 (계열 수, n) / method: 'minmax' 또는 'lttb'
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+    if method == "lttb":
+        return _lttb_indices(x, ys, max_points)
+    return _minmax_indices(ys, max_points)
+
+
+def downsample_rows(rows, max_points, time_idx, value_idxs, group_idx=None, method=DEFAULT_METHOD):
+    """
+    DB 조회 결과(rows)에서 max_points 에 맞춰 대표 행만 남깁니다. 원래 행 순서는 유지됩니다.
+    time_idx: cr_dt 컬럼 위치 / value_idxs: 값 컬럼 위치 목록
+    group_idx: 설비(auto_id) 컬럼 위치. 지정하면 설비별로 각각 max_points 까지 남깁니다.
+    """
+    if not max_points or len(rows) <= max_points:
+        return rows
+
+    groups = {}
+    for i, r in enumerate(rows):
+        groups.setdefault(r[group_idx] if group_idx is not None else None, []).append(i)
+
+    keep = []
+    for positions in groups.values():
+        if len(positions) <= max_points:
+            keep.extend(positions)
+            continue
+        sub = [rows[i] for i in positions]
+        times = [r[time_idx] for r in sub]
+        if all(t is not None for t in times):
+            x = np.array([t.timestamp() for t in times], dtype=float)
+        else:
+            x = np.arange(len(sub), dtype=float)
+        ys = np.vstack([_to_float(r[idx] for r in sub) for idx in value_idxs])
+        chosen = select_indices(x, ys, max_points, method)
+        keep.extend(positions[i] for i in chosen)
+
+    keep.sort()
+    return [rows[i] for i in keep]
@@ -0,0 +1,38 @@
+# services/http_cache.py
+# 조건부 GET (ETag / 304 Not Modified) 도우미
+#
+# 1초 주기 폴링이나 기준정보 목록은 직전 응답과 내용이 같은 경우가 대부분입니다.
+# 원천 데이터의 버전(smart_last.cr_dt, 기준정보 캐시 버전 등)으로 ETag 를 만들고,
+# 클라이언트가 보낸 If-None-Match 와 같으면 본문 없이 304 를 돌려줍니다.
+#
+# 사용 예:
+#     etag = make_etag(v_db, "bending", row)
+#     cached = not_modified(etag)
+#     if cached:
+#         return cached
+#     ...
+#     return with_etag(jsonify(data), etag), 200
+
+import hashlib
+
+from flask import Response, request
+
+
+def make_etag(*parts):
+    """버전 구성값들로 ETag 문자열을 만듭니다. (repr 가 같으면 같은 ETag)"""
+    return hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+
+
+def with_etag(response, etag):
+    """응답에 ETag 를 붙입니다. no-cache: 브라우저는 보관하되 매번 서버에 재검증"""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def not_modified(etag):
+    """If-None-Match 가 etag 와 일치하면 304 응답을, 아니면 None 을 반환합니다."""
+    if request.if_none_match.contains(etag):
+        return with_etag(Response(status=304), etag)
+    return None
+
@@ -0,0 +1,67 @@
+# services/json_provider.py
+# msgspec 기반 Flask JSON 공급자
+#
+# jsonify / json.dumps(cls=DecimalEncoder, NumpyEncoder) 대신 msgspec 으로 직렬화합니다.
+# 수만 건 행 목록 응답에서 표준 json 모듈보다 직렬화 CPU 사용량이 훨씬 적습니다.
+#
+# - 한글은 이스케이프하지 않고 UTF-8 그대로 출력 (ensure_ascii=False 와 동일)
+# - Decimal 은 Flask 기본 jsonify 와 같이 문자열로 출력 ("1.50")
+#   예전에 json.dumps(cls=DecimalEncoder) 로 숫자를 내려주던 API 는 jsonify_numeric() 으로 숫자를 유지합니다.
+# - datetime/date 는 ISO 8601 문자열 ("2025-01-01T09:00:00")
+# - numpy 스칼라/배열은 파이썬 값/리스트로 변환 (NumpyEncoder 대체)
+# - NaN/Infinity 는 null (표준 JSON 에는 NaN 이 없음)
+
+import datetime
+
+import msgspec
+import numpy as np
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+
+def _enc_hook(obj):
+    """msgspec 이 기본으로 지원하지 않는 타입 변환"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    # pandas.Timestamp 등 datetime 하위 클래스
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+_sorted_encoder = msgspec.json.Encoder(enc_hook=_enc_hook, order="sorted")        # sort_keys=True
+_number_encoder = msgspec.json.Encoder(enc_hook=_enc_hook, decimal_format="number")
+
+
+def dumps_bytes(obj):
+    """obj 를 UTF-8 JSON bytes 로 직렬화합니다."""
+    return _encoder.encode(obj)
+
+
+def dumps(obj, sort_keys=False):
+    """obj 를 JSON 문자열로 직렬화합니다. (DB 저장용 등) sort_keys 이면 dict 키 순으로 정렬"""
+    encoder = _sorted_encoder if sort_keys else _encoder
+    return encoder.encode(obj).decode("utf-8")
+
+
+def jsonify_numeric(obj):
+    """Decimal 을 숫자로 출력하는 jsonify. (기존 json.dumps(cls=DecimalEncoder) 응답과 같은 형식)"""
+    return current_app.response_class(_number_encoder.encode(obj), mimetype=current_app.json.mimetype)
+
+
+class MsgspecJSONProvider(DefaultJSONProvider):
+    """app.json 으로 등록하면 jsonify / Response 반환 dict, list 모두 msgspec 으로 직렬화됩니다.
+    요청 본문 파싱(loads)은 기존 json 모듈을 그대로 사용합니다."""
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop("sort_keys", False)
+        if kwargs:
+            raise TypeError(f"지원하지 않는 JSON 옵션입니다: {', '.join(sorted(kwargs))}")
+        return dumps(obj, sort_keys=sort_keys)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
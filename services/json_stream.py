@@ -0,0 +1,61 @@
+# services/json_stream.py
+# 대용량 조회 결과 스트리밍 JSON 응답
+#
+# fetchall() -> dict 리스트 -> jsonify 는 결과 전체를 메모리에 여러 벌 만들고,
+# 마지막 행까지 읽은 뒤에야 첫 바이트를 보냅니다.
+# 여기서는 커서를 fetchmany 로 조금씩 읽어 JSON 배열을 조각조각 내려보내므로
+# 메모리 사용량이 배치 크기만큼으로 일정하고, 첫 응답이 빨라집니다.
+#
+# 사용 예 (cur.execute 이후, conn.close() 는 호출하지 않음):
+#     if is_stream_requested():
+#         return stream_json_array(conn, cur, lambda i, r: [convert(r)])
+
+from flask import Response, request
+
+from services.json_provider import dumps
+
+STREAM_BATCH_SIZE = 1000     # fetchmany 1회에 읽는 행 수
+
+
+def is_stream_requested():
+    """?stream=true (또는 1, y) 이면 스트리밍 응답을 사용합니다."""
+    return request.args.get("stream", "").lower() in ("true", "1", "y")
+
+
+def _generate(batches, convert, on_close=None):
+    try:
+        yield "["
+        first = True
+        i = 0
+        for rows in batches:
+            parts = []
+            for row in rows:
+                for item in convert(i, row):
+                    parts.append(dumps(item))
+                i += 1
+            if parts:
+                yield ("" if first else ",") + ",".join(parts)
+                first = False
+        yield "]"
+    except Exception as e:
+        # 이미 200 헤더가 나간 뒤라 상태코드를 바꿀 수 없음. 배열을 닫지 않아 클라이언트가 오류로 인식
+        print(f"[Stream Error] {e}")
+    finally:
+        if on_close:
+            on_close()
+
+
+def stream_json_array(conn, cur, convert, batch_size=STREAM_BATCH_SIZE):
+    """
+    실행된 커서의 결과를 JSON 배열로 스트리밍합니다.
+    convert(i, row): 행 번호와 행을 받아 응답에 넣을 항목 리스트(0개 이상)를 반환
+    연결은 스트림이 끝나거나 클라이언트가 끊으면 반환됩니다.
+    """
+    batches = iter(lambda: cur.fetchmany(batch_size), [])
+    return Response(_generate(batches, convert, conn.close), mimetype="application/json")
+
+
+def stream_json_rows(rows, convert, batch_size=STREAM_BATCH_SIZE):
+    """이미 메모리에 있는 행 목록(로컬 캐시 등)을 같은 방식으로 스트리밍합니다. (dict 변환을 배치 단위로 지연)"""
+    batches = (rows[i:i + batch_size] for i in range(0, len(rows), batch_size))
+    return Response(_generate(batches, convert), mimetype="application/json")
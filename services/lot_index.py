@@ -0,0 +1,163 @@
+# services/lot_index.py
+# LOT 바코드 조회용 메모리 색인 (lot_no_inform)
+#
+# 바코드 스캔마다 SUBSTRING(lot_no, 2, LEN(lot_no)) = ? OR bigo39 + '-' + bigo40 = ? 조건으로
+# lot_mst + lot_bigo 전체를 스캔했습니다. (두 조건 모두 인덱스를 탈 수 없음)
+# 업체(v_db)별로 두 가지 키 -> (jepum_cd, jepum_nm, bigo39, bigo40) 색인을 메모리에 올려 두고 dict 로 찾습니다.
+#
+# - 최초 조회 시 백그라운드에서 전체를 읽어 색인을 만들고, 그 전까지는 기존 쿼리로 조회합니다.
+# - 색인에 없는 키는 기존 쿼리로 DB 를 확인해, 찾으면 색인에 바로 추가합니다. (새로 등록된 LOT)
+#   DB 에도 없는 키(오타/미등록 바코드)는 MISS_TTL_SEC 동안 기억해, 같은 바코드를 다시 찍어도 전체 스캔하지 않습니다.
+# - 제품 변경 등 기존 LOT 수정분은 REFRESH_INTERVAL_SEC 마다 백그라운드 전체 재적재로 반영합니다.
+# - 요청이 IDLE_STOP_SEC 동안 없으면 색인을 버리고 스레드를 종료합니다.
+
+import threading
+import time
+from collections import OrderedDict
+
+from db import get_db_connection
+
+REFRESH_INTERVAL_SEC = 600     # 전체 재적재 주기
+IDLE_STOP_SEC = 3600           # 이 시간 동안 조회가 없으면 색인 해제
+MISS_TTL_SEC = 30              # DB 에도 없던 키를 '없음' 으로 기억하는 시간
+MISS_MAX = 5000                # 기억할 최대 '없음' 키 개수 (넘으면 오래된 것부터 삭제)
+
+LOAD_SQL = """
+    SELECT h.lot_no, h.jepum_cd, j.jepum_nm, l.bigo39, l.bigo40
+    FROM lot_mst h
+    LEFT JOIN jepum_code j ON h.jepum_cd = j.jepum_cd
+    LEFT JOIN lot_bigo l ON h.lot_no = l.lot_no
+"""
+
+LOOKUP_SQL = """
+    SELECT TOP 1 h.jepum_cd, j.jepum_nm, l.bigo39, l.bigo40
+    FROM lot_mst h
+    LEFT JOIN jepum_code j ON h.jepum_cd = j.jepum_cd
+    LEFT JOIN lot_bigo l ON h.lot_no = l.lot_no
+    WHERE
+        SUBSTRING(h.lot_no, 2, LEN(h.lot_no)) = ?
+        OR
+        (ISNULL(l.bigo39, '') + '-' + ISNULL(l.bigo40, '')) = ?
+"""
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _norm(key):
+    # MSSQL 문자열 비교처럼 뒤 공백은 무시
+    return key.rstrip() if key else key
+
+
+class LotIndex(object):
+    """한 업체의 LOT 색인. keys[바코드 키] = (jepum_cd, jepum_nm, bigo39, bigo40)"""
+
+    def __init__(self, v_db):
+        self.v_db = v_db
+        self.keys = None           # 첫 적재 전에는 None
+        self.misses = OrderedDict()  # DB 에도 없던 키 -> 기억 만료 시각
+        self._misses_lock = threading.Lock()
+        self.last_access = time.monotonic()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"lot-index-{self.v_db}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self.reload()
+            time.sleep(REFRESH_INTERVAL_SEC)
+            if time.monotonic() - self.last_access > IDLE_STOP_SEC:
+                _remove_index(self)
+                return
+
+    def reload(self):
+        conn = None
+        try:
+            conn = get_db_connection(self.v_db)
+            if conn is None:
+                return False
+            cur = conn.cursor()
+            cur.execute(LOAD_SQL)
+            keys = {}
+            while True:
+                rows = cur.fetchmany(5000)
+                if not rows:
+                    break
+                for lot_no, jepum_cd, jepum_nm, bigo39, bigo40 in rows:
+                    value = (jepum_cd, jepum_nm, bigo39, bigo40)
+                    if lot_no:
+                        keys.setdefault(_norm(lot_no[1:]), value)
+                    if bigo39 or bigo40:
+                        keys.setdefault(_norm(f"{bigo39 or ''}-{bigo40 or ''}"), value)
+            # 새 dict 로 통째로 교체하므로 조회 중인 요청은 이전 색인을 그대로 봄
+            self.keys = keys
+            with self._misses_lock:
+                self.misses.clear()
+            return True
+        except Exception as e:
+            print(f"[LotIndex Error] reload failed (vendor={self.v_db}): {e}")
+            return False
+        finally:
+            if conn:
+                conn.close()
+
+    def lookup(self, lot_no2):
+        """
+        바코드 값으로 LOT 정보를 찾습니다.
+        반환값: (jepum_cd, jepum_nm, bigo39, bigo40) 또는 None (DB 에도 없음)
+        DB 연결 실패 시 ConnectionError
+        """
+        now = self.last_access = time.monotonic()
+        key = _norm(lot_no2)
+        keys = self.keys
+        if keys is not None:
+            value = keys.get(key)
+            if value is not None:
+                return value
+        with self._misses_lock:
+            expires = self.misses.get(key)
+            if expires is not None:
+                if expires > now:
+                    return None
+                del self.misses[key]
+
+        # 색인 적재 전이거나 색인 이후 새로 등록된 LOT: 기존 쿼리로 확인
+        conn = get_db_connection(self.v_db)
+        if conn is None:
+            raise ConnectionError(f"DB 연결 실패: {self.v_db}")
+        try:
+            cur = conn.cursor()
+            cur.execute(LOOKUP_SQL, (lot_no2, lot_no2))
+            row = cur.fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            with self._misses_lock:
+                self.misses[key] = time.monotonic() + MISS_TTL_SEC
+                while len(self.misses) > MISS_MAX:
+                    self.misses.popitem(last=False)
+            return None
+        value = tuple(row)
+        if keys is not None:
+            keys[key] = value
+        return value
+
+
+def _remove_index(index):
+    with _indexes_lock:
+        if _indexes.get(index.v_db) is index:
+            del _indexes[index.v_db]
+
+
+def get_lot_index(v_db):
+    """업체의 LOT 색인을 반환합니다. 처음 조회하면 백그라운드 적재를 시작합니다."""
+    index = _indexes.get(v_db)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(v_db)
+            if index is None:
+                index = _indexes[v_db] = LotIndex(v_db)
+                index.start()
+    return index
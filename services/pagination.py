@@ -0,0 +1,50 @@
+# services/pagination.py
+# 키셋(keyset) 페이지네이션 커서 토큰
+#
+# 마지막으로 내려준 행의 정렬 키(예: cr_dt, auto_id)를 URL-safe base64 JSON 으로 감싸
+# 다음 페이지 요청의 cursor 파라미터로 돌려받습니다. OFFSET 과 달리 페이지가 뒤로 갈수록
+# 느려지지 않고, 조회 중에 행이 추가되어도 중복/누락이 없습니다.
+
+import base64
+import json
+from datetime import datetime
+
+_DT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def encode_cursor(values):
+    """정렬 키 dict 를 커서 토큰 문자열로 변환합니다. datetime 값은 마이크로초까지 보존합니다."""
+    payload = {}
+    for key, value in values.items():
+        if isinstance(value, datetime):
+            payload[key] = {"dt": value.strftime(_DT_FORMAT)}
+        else:
+            payload[key] = value
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """커서 토큰을 정렬 키 dict 로 되돌립니다. 잘못된 토큰이면 ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        if not isinstance(payload, dict):
+            raise ValueError
+        values = {}
+        for key, value in payload.items():
+            if isinstance(value, dict) and "dt" in value:
+                value = datetime.strptime(value["dt"], _DT_FORMAT)
+            values[key] = value
+        return values
+    except (ValueError, TypeError, KeyError, UnicodeDecodeError) as e:
+        raise ValueError(f"잘못된 cursor 입니다: {token}") from e
+
+
+def parse_limit(value, default, maximum):
+    """limit 파라미터를 1 ~ maximum 범위의 정수로 변환합니다. 없거나 잘못되면 default."""
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(n, maximum))
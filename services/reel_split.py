@@ -0,0 +1,44 @@
+# services/reel_split.py
+# Taping(180) 릴 분할 계산
+#
+# 총수량(amt)을 릴당 수량(reel_min_amt)씩 reel_count 개 릴에 앞에서부터 채웁니다.
+# 릴마다 남은 수량을 줄여 가며 반복 계산하던 것을 배열 연산 한 번으로 구하고,
+# 등록/수정 API 는 결과 행 전체를 executemany 한 번으로 INSERT 합니다.
+#
+#     i 번째 릴 수량 = clip(amt - (i-1) * reel_min_amt, 0, reel_min_amt)
+#     마지막 릴 bigo_a1 = 릴에 담지 못한 잔량 = max(amt - reel_count * reel_min_amt, 0), 나머지 릴은 0
+
+import numpy as np
+
+REEL_COUNT_MAX = 1000     # 한 LOT 에 등록할 수 있는 최대 릴 개수
+
+
+def _is_number(value):
+    return not isinstance(value, bool) and isinstance(value, (int, float))
+
+
+def check_reel_params(amt, reel_count, reel_min_amt):
+    """릴 분할 값이 올바르면 None, 아니면 오류 메시지를 반환합니다. (API 에서 DB 작업 전에 400 응답용)"""
+    if not _is_number(reel_count) or reel_count != int(reel_count) or not 0 < reel_count <= REEL_COUNT_MAX:
+        return f"reel_count 는 1 ~ {REEL_COUNT_MAX} 사이의 정수여야 합니다."
+    if not _is_number(amt) or not amt > 0:
+        return "amt 는 0보다 큰 숫자여야 합니다."
+    if not _is_number(reel_min_amt) or not reel_min_amt > 0:
+        return "reel_min_amt 는 0보다 큰 숫자여야 합니다."
+    return None
+
+
+def split_reels(amt, reel_count, reel_min_amt):
+    """
+    반환값: [(lot_seq, 릴 수량, bigo_a1), ...]  lot_seq 는 1 부터
+    값이 올바르지 않으면 ValueError (check_reel_params 로 먼저 확인)
+    """
+    error = check_reel_params(amt, reel_count, reel_min_amt)
+    if error:
+        raise ValueError(error)
+    reel_count = int(reel_count)
+    seqs = np.arange(1, reel_count + 1)
+    uses = np.clip(amt - (seqs - 1) * reel_min_amt, 0, reel_min_amt)
+    leftovers = np.zeros(reel_count, dtype=uses.dtype)
+    leftovers[-1] = max(amt - reel_count * reel_min_amt, 0)
+    return list(zip(seqs.tolist(), uses.tolist(), leftovers.tolist()))
@@ -0,0 +1,125 @@
+# services/ref_cache.py
+# 업체별 기준정보(제품 jepum_code, 거래처 vender_code) 메모리 캐시
+#
+# 생산/출하/수주/재고 목록 API 대부분이 이름(jepum_nm, vender_nm) 하나를 붙이려고
+# jepum_code / vender_code 를 LEFT JOIN 했고, /api/common/jepum·vender 는 호출마다 테이블 전체를 다시 읽었습니다.
+# 업체(v_db)별로 코드 -> 기준정보 dict 를 메모리에 올려 두고, 목록 API 는 JOIN 없이 여기서 이름을 붙입니다.
+#
+# - REF_TTL_SEC 가 지나면 다음 조회 때 다시 읽습니다. 기준정보는 이 API 가 아니라 ERP 에서 등록/수정하므로,
+#   ERP 에서 바꾼 제품/거래처가 목록에 보이기까지 최대 REF_TTL_SEC(5분) 걸립니다.
+# - 조건 비교는 sql_equal() 로 DB 콜레이션처럼 대소문자/뒤 공백을 무시합니다.
+# - version 은 적재한 내용의 해시라, 재적재해도 내용이 같으면 그대로입니다. (ETag 용)
+# - 이름순/코드순 정렬은 DB 콜레이션(대소문자 무시 등)과 같도록 적재할 때 DB 가 매긴 순번으로 합니다.
+#
+# 사용 예:
+#     jepum = get_ref(v_db, "jepum")
+#     jepum.name(row["jepum_cd"])            # 없으면 None
+#     jepum.rows                             # {jepum_cd: {"jepum_cd": ..., "jepum_nm": ..., ...}}
+#     jepum.ordered(rows, "name")            # rows 를 ORDER BY jepum_nm 순서로
+
+import hashlib
+import threading
+import time
+
+from db import get_db_connection
+
+REF_TTL_SEC = 300        # 기준정보 재적재 주기
+
+# 이름 -> (테이블, 코드 컬럼, 이름 컬럼, 함께 올릴 컬럼)
+REF_TABLES = {
+    "jepum":  ("jepum_code",  "jepum_cd",  "jepum_nm",  ("tab_gbn_cd", "jepum_flg2")),
+    "vender": ("vender_code", "vender_cd", "vender_nm", ("tab_gbn_cd",)),
+}
+
+_tables = {}             # (v_db, 이름) -> RefTable
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _norm(code):
+    # MSSQL 문자열 비교(JOIN)처럼 뒤 공백은 무시
+    return code.rstrip() if isinstance(code, str) else code
+
+
+def sql_equal(value, param):
+    """MSSQL '=' 비교(대소문자 무시 콜레이션)처럼 뒤 공백과 대소문자를 무시하고 비교합니다. NULL 은 같지 않음"""
+    if value is None or param is None:
+        return False
+    return str(value).rstrip().casefold() == str(param).rstrip().casefold()
+
+
+def _lock_for(key):
+    with _locks_lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+class RefTable(object):
+    """한 업체의 기준정보 테이블 하나. rows[코드] = {컬럼: 값}"""
+
+    def __init__(self, name, rows, ranks, version):
+        self.code_col, self.name_col = REF_TABLES[name][1:3]
+        self.rows = rows
+        self.ranks = ranks         # {"name": {코드: 이름순 순번}, "code": {코드: 코드순 순번}}
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def get(self, code):
+        return self.rows.get(_norm(code))
+
+    def name(self, code, default=None):
+        row = self.rows.get(_norm(code))
+        if row is None or row[self.name_col] is None:
+            return default
+        return row[self.name_col]
+
+    def ordered(self, rows, by="name"):
+        """rows(이 테이블의 행 dict 목록)를 DB 의 ORDER BY 이름/코드 순서로 정렬해 반환합니다."""
+        rank = self.ranks[by]
+        return sorted(rows, key=lambda row: rank[_norm(row[self.code_col])])
+
+
+def _load(v_db, name):
+    table, code_col, name_col, extra_cols = REF_TABLES[name]
+    columns = (code_col, name_col) + extra_cols
+    conn = get_db_connection(v_db)
+    if conn is None:
+        raise ConnectionError(f"DB 연결 실패: {v_db}")
+    try:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT {', '.join(columns)},
+                   ROW_NUMBER() OVER (ORDER BY {name_col}, {code_col}) AS name_rank,
+                   ROW_NUMBER() OVER (ORDER BY {code_col}) AS code_rank
+            FROM {table}
+            ORDER BY name_rank
+        """)
+        rows, ranks = {}, {"name": {}, "code": {}}
+        digest = hashlib.md5()
+        for row in cur.fetchall():
+            code = _norm(row[0])
+            rows[code] = dict(zip(columns, row))
+            ranks["name"][code], ranks["code"][code] = row[-2], row[-1]
+            digest.update(repr(tuple(row)).encode("utf-8"))
+    finally:
+        conn.close()
+    return RefTable(name, rows, ranks, digest.hexdigest())
+
+
+def get_ref(v_db, name):
+    """
+    업체의 기준정보 테이블(name: "jepum" 또는 "vender")을 반환합니다.
+    없거나 REF_TTL_SEC 가 지났으면 DB 에서 다시 읽습니다. DB 연결 실패 시 ConnectionError
+    """
+    key = (v_db, name)
+    ref = _tables.get(key)
+    if ref is not None and time.monotonic() - ref.loaded_at < REF_TTL_SEC:
+        return ref
+    # 같은 업체/테이블을 동시에 요청하면 한 요청만 읽고 나머지는 그 결과를 사용
+    with _lock_for(key):
+        ref = _tables.get(key)
+        if ref is None or time.monotonic() - ref.loaded_at >= REF_TTL_SEC:
+            ref = _tables[key] = _load(v_db, name)
+    return ref
+
@@ -0,0 +1,191 @@
+# services/rollup.py
+# smart_log 백그라운드 롤업 (1시간 / 1일 집계)
+#
+# 시간대별/일별 화면은 요청마다 smart_log 원본 행을 GROUP BY 로 다시 집계했습니다.
+# 업체(v_db) + 설비(auto_id)별 백그라운드 스레드가 워터마크(cr_dt) 이후의 새 행만 읽어
+# col_1 ~ col_8 의 count / sum / min / max 를 구간별로 누적하고, API 는 메모리의 집계값을 읽습니다.
+# 평균(avg)은 sum / count 로 계산합니다.
+#
+# 집계는 당일 00:00 부터 시작합니다 (최초 조회 시 오늘 행을 한 번 읽어 채움).
+# 요청이 IDLE_STOP_SEC 동안 없으면 스레드는 종료되고 다음 조회 때 다시 채웁니다.
+# 수집기가 늦게 커밋해 워터마크보다 이른 cr_dt 로 들어오는 행이 있으므로, 매번 워터마크 - OVERLAP_SEC 부터
+# 다시 읽고 이미 반영한 행(cr_dt + 값 기준)은 빼고 반영합니다. (services/runtime_counter 와 같은 방식)
+# 마지막 갱신 성공이 STALE_AFTER_SEC 보다 오래되면(DB 장애 등) 멈춘 집계를 내주지 않고 None 을 반환합니다.
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from db import get_db_connection
+
+POLL_INTERVAL_SEC = 5      # 새 행 반영 주기
+IDLE_STOP_SEC = 600        # 이 시간 동안 조회가 없으면 롤업 중지
+STALE_AFTER_SEC = 60       # 마지막 갱신 성공 후 이 시간이 지나면 집계를 사용하지 않음
+OVERLAP_SEC = 120          # 증분 조회 시 워터마크 이전으로 다시 읽는 구간 (늦게 커밋된 행 반영)
+
+COLUMNS = ["col_1", "col_2", "col_3", "col_4", "col_5", "col_6", "col_7", "col_8"]
+
+# 단위 -> (numpy datetime 단위, 보관 기간)
+GRANULARITIES = {
+    "1h": ("h", timedelta(days=35)),
+    "1d": ("D", timedelta(days=400)),
+}
+
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+class Rollup(object):
+    """한 업체/설비의 구간별 집계. buckets[단위][구간 시작] = (4, 8) 배열 [count, sum, min, max] x col_1~8"""
+
+    def __init__(self, v_db, auto_id):
+        self.v_db = v_db
+        self.auto_id = auto_id
+        self.buckets = {g: {} for g in GRANULARITIES}
+        self.start_dt = datetime.combine(datetime.now().date(), datetime.min.time())
+        self.watermark = None      # 마지막으로 반영한 smart_log.cr_dt
+        self.window = Counter()    # 겹침 구간에서 이미 반영한 행 (cr_dt, col_1~8) -> 개수
+        self.last_success = None   # 마지막 갱신 성공 시각 (monotonic), 한 번도 못 채웠으면 None
+        self.last_access = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name=f"rollup-{self.v_db}-{self.auto_id}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(POLL_INTERVAL_SEC)
+            if time.monotonic() - self.last_access > IDLE_STOP_SEC:
+                _remove_rollup(self)
+                return
+            self.refresh()
+
+    def refresh(self):
+        with self._lock:
+            conn = None
+            try:
+                conn = get_db_connection(self.v_db)
+                if conn is None:
+                    return False
+                cur = conn.cursor()
+                sql = f"""
+                    SELECT cr_dt, {", ".join(COLUMNS)}
+                    FROM dbo.smart_log
+                    WHERE auto_id = ?
+                """
+                if self.watermark is None:
+                    sql += " AND cr_dt >= ?"
+                    params = (self.auto_id, self.start_dt)
+                else:
+                    sql += " AND cr_dt > ?"
+                    params = (self.auto_id, self.watermark - timedelta(seconds=OVERLAP_SEC))
+                cur.execute(sql + " ORDER BY cr_dt", params)
+                rows = [tuple(r) for r in cur.fetchall()]
+
+                # 겹침 구간에서 이미 반영한 행은 제외하고 새 행(늦게 커밋된 행 포함)만 반영
+                seen = Counter(rows)
+                new_rows = []
+                for key, count in seen.items():
+                    new_rows.extend([key] * max(count - self.window.get(key, 0), 0))
+                if new_rows:
+                    self._apply(sorted(new_rows, key=lambda r: r[0]))
+                if rows:
+                    self.watermark = max(self.watermark or rows[-1][0], rows[-1][0])
+                    since = self.watermark - timedelta(seconds=OVERLAP_SEC)
+                    self.window = Counter({key: n for key, n in seen.items() if key[0] > since})
+                self._prune()
+                self.last_success = time.monotonic()
+                return True
+            except Exception as e:
+                print(f"[Rollup Error] refresh failed (vendor={self.v_db}, auto_id={self.auto_id}): {e}")
+                return False
+            finally:
+                if conn:
+                    conn.close()
+
+    def is_fresh(self):
+        return self.last_success is not None and time.monotonic() - self.last_success <= STALE_AFTER_SEC
+
+    def _apply(self, rows):
+        times = np.array([r[0] for r in rows], dtype="datetime64[ms]")
+        cols = np.array([[np.nan if v is None else float(v) for v in r[1:]] for r in rows], dtype=float)
+
+        for g, (unit, _) in GRANULARITIES.items():
+            keys, inverse = np.unique(times.astype(f"datetime64[{unit}]"), return_inverse=True)
+            for k, key in enumerate(keys):
+                part = cols[inverse == k]
+                stats = np.vstack([
+                    (~np.isnan(part)).sum(axis=0),
+                    np.nansum(part, axis=0),
+                    np.fmin.reduce(part, axis=0),
+                    np.fmax.reduce(part, axis=0),
+                ])
+                bucket = key.astype("datetime64[s]").astype(datetime)
+                prev = self.buckets[g].get(bucket)
+                if prev is not None:
+                    stats[0] += prev[0]
+                    stats[1] += prev[1]
+                    stats[2] = np.fmin(stats[2], prev[2])
+                    stats[3] = np.fmax(stats[3], prev[3])
+                self.buckets[g][bucket] = stats
+
+    def _prune(self):
+        now = datetime.now()
+        for g, (_, keep) in GRANULARITIES.items():
+            old = [b for b in self.buckets[g] if b < now - keep]
+            for b in old:
+                del self.buckets[g][b]
+
+    def series(self, granularity, column, from_dt=None, to_dt=None):
+        """
+        구간별 집계를 시간순으로 반환합니다.
+        반환값: [{"bucket": datetime, "count", "sum", "min", "max", "avg"}, ...] (값이 없는 구간 제외)
+        """
+        idx = COLUMNS.index(column)
+        with self._lock:
+            items = sorted(self.buckets[granularity].items())
+        result = []
+        for bucket, stats in items:
+            if (from_dt and bucket < from_dt) or (to_dt and bucket > to_dt):
+                continue
+            count = int(stats[0][idx])
+            if count == 0:
+                continue
+            total = float(stats[1][idx])
+            result.append({
+                "bucket": bucket, "count": count, "sum": total,
+                "min": float(stats[2][idx]), "max": float(stats[3][idx]), "avg": total / count,
+            })
+        return result
+
+
+def _remove_rollup(rollup):
+    with _rollups_lock:
+        key = (rollup.v_db, rollup.auto_id)
+        if _rollups.get(key) is rollup:
+            del _rollups[key]
+
+
+def get_rollup(v_db, auto_id):
+    """
+    업체/설비의 롤업을 반환합니다. 처음 조회하면 오늘 행을 읽어 채운 뒤 백그라운드 갱신을 시작합니다.
+    아직 채우지 못했거나 마지막 갱신 성공이 STALE_AFTER_SEC 보다 오래됐고 지금 갱신도 실패하면 None.
+    """
+    key = (v_db, str(auto_id))
+    rollup = _rollups.get(key)
+    if rollup is None:
+        with _rollups_lock:
+            rollup = _rollups.get(key)
+            if rollup is None:
+                rollup = _rollups[key] = Rollup(v_db, str(auto_id))
+                rollup.start()
+    rollup.last_access = time.monotonic()
+    if not rollup.is_fresh():
+        rollup.refresh()
+    return rollup if rollup.is_fresh() else None
@@ -0,0 +1,136 @@
+# services/runtime_counter.py
+# 금일 누적 가동시간(분) 증분 집계기
+#
+# 실시간 관제 화면(혼합/숙성/증숙)은 조회할 때마다 오늘자 smart_log 전체를 SUM(CASE ...) 로
+# 다시 집계했습니다. 업체(v_db) + 설비(auto_id) + 일자별로 누계와 마지막으로 읽은 cr_dt(워터마크)를
+# 메모리에 보관하고, 이후에는 워터마크 근처에 새로 쌓인 행만 집계해 더합니다.
+#
+# - 금일은 DB 날짜(CONVERT(VARCHAR(8), GETDATE(), 112))로 정하고 ymd 가 같은 행만 집계합니다.
+#   날짜가 바뀌면(자정) 새 일자로 다시 집계하고, 오늘 로그가 없는 설비는 0 입니다.
+# - 수집기가 늦게 커밋해 워터마크보다 이른 cr_dt 로 들어오는 행이 있으므로, 매번 워터마크 - OVERLAP_SEC 부터
+#   다시 읽고 이미 더한 행(cr_dt + 값 기준)은 빼고 더합니다.
+# - 그보다 더 늦게 들어온 행까지 맞추기 위해 RESEED_INTERVAL_SEC 마다 해당 일자를 전체 집계로 다시 맞춥니다.
+
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from db import get_db_connection
+
+OVERLAP_SEC = 120            # 증분 조회 시 워터마크 이전으로 다시 읽는 구간 (늦게 커밋된 행 반영)
+RESEED_INTERVAL_SEC = 600    # 전체 집계로 누계를 다시 맞추는 주기
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+class RuntimeCounter(object):
+    """
+    한 업체/설비의 금일 누계를 보관합니다.
+    rules: ((이름, 컬럼, 기준값), ...)
+           기준값이 있으면 '컬럼 >= 기준값' 인 행 수(분), None 이면 컬럼 값의 합계를 누적합니다.
+    """
+
+    def __init__(self, v_db, auto_id, rules):
+        self.v_db = v_db
+        self.auto_id = auto_id
+        self.rules = rules
+        self.ymd = None
+        self.totals = {name: 0 for name, _, _ in rules}
+        self.watermark = None     # 마지막으로 집계에 반영한 smart_log.cr_dt
+        self.window = Counter()   # 겹침 구간에서 이미 더한 행 (cr_dt, 행별 값...) -> 개수
+        self.seeded_at = None
+        self._lock = threading.Lock()
+
+    def _row_exprs(self):
+        # 행 하나가 각 누계에 더하는 값
+        exprs = []
+        for name, col, threshold in self.rules:
+            if threshold is None:
+                exprs.append(f"ISNULL({col}, 0) as {name}")
+            else:
+                exprs.append(f"CASE WHEN ISNULL({col}, 0) >= {int(threshold)} THEN 1 ELSE 0 END as {name}")
+        return ", ".join(exprs)
+
+    def _seed(self, cur, ymd):
+        """ymd 일자를 전체 집계해 누계와 워터마크를 다시 맞춥니다. (행이 없으면 0)"""
+        self.ymd = ymd
+        self.totals = {name: 0 for name, _, _ in self.rules}
+        self.watermark = None
+        self.window = Counter()
+        self.seeded_at = time.monotonic()
+
+        sums = ", ".join(f"SUM({name}) as {name}" for name, _, _ in self.rules)
+        cur.execute(f"""
+            SELECT {sums}, MAX(cr_dt) as last_dt
+            FROM (SELECT cr_dt, {self._row_exprs()} FROM dbo.smart_log WHERE auto_id = ? AND ymd = ?) t
+        """, (self.auto_id, ymd))
+        row = cur.fetchone()
+        if not row or row[-1] is None:
+            return
+        for i, (name, _, _) in enumerate(self.rules):
+            self.totals[name] = row[i] or 0
+        self.watermark = row[-1]
+
+        # 다음 증분 조회와 겹치는 구간의 행은 이미 더한 것으로 기록
+        cur.execute(f"""
+            SELECT cr_dt, {self._row_exprs()}
+            FROM dbo.smart_log
+            WHERE auto_id = ? AND ymd = ? AND cr_dt > ?
+        """, (self.auto_id, ymd, self.watermark - timedelta(seconds=OVERLAP_SEC)))
+        self.window = Counter(tuple(r) for r in cur.fetchall())
+
+    def _advance(self, cur):
+        """금일 행 중 워터마크 - OVERLAP_SEC 이후 행을 읽어, 아직 더하지 않은 행만 누계에 더합니다."""
+        cur.execute(f"""
+            SELECT cr_dt, {self._row_exprs()}
+            FROM dbo.smart_log
+            WHERE auto_id = ? AND ymd = ? AND cr_dt > ?
+        """, (self.auto_id, self.ymd, self.watermark - timedelta(seconds=OVERLAP_SEC)))
+
+        seen = Counter(tuple(r) for r in cur.fetchall())
+        for key, count in seen.items():
+            extra = count - self.window.get(key, 0)
+            if extra > 0:
+                for i, (name, _, _) in enumerate(self.rules):
+                    self.totals[name] += (key[i + 1] or 0) * extra
+        self.window = seen
+        if seen:
+            self.watermark = max(self.watermark, max(key[0] for key in seen))
+
+    def update(self):
+        """새로 들어온 행을 누계에 반영하고, 현재 누계를 반환합니다. 실패 시 None."""
+        with self._lock:
+            conn = get_db_connection(self.v_db)
+            if conn is None:
+                return None
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT CONVERT(VARCHAR(8), GETDATE(), 112)")
+                today = cur.fetchone()[0]
+                # 날짜가 바뀌었거나, 아직 오늘 행이 없었거나, 재집계 주기가 지났으면 전체 집계
+                if (today != self.ymd or self.watermark is None
+                        or time.monotonic() - self.seeded_at >= RESEED_INTERVAL_SEC):
+                    self._seed(cur, today)
+                else:
+                    self._advance(cur)
+            finally:
+                conn.close()
+
+            return {name: int(value) for name, value in self.totals.items()}
+
+
+def get_runtime_totals(v_db, auto_id, rules):
+    """
+    금일 누계를 반환합니다.
+    반환값: {이름: 누계(int)}, DB 연결 실패 시 None
+    """
+    key = (v_db, str(auto_id), tuple(rules))
+    counter = _counters.get(key)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.get(key)
+            if counter is None:
+                counter = _counters[key] = RuntimeCounter(v_db, str(auto_id), tuple(rules))
+    return counter.update()
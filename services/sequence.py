@@ -0,0 +1,215 @@
+# services/sequence.py
+# 업체별 문서번호 채번기 (segsan_cd, chulha_cd, suju_cd, inout_no 등)
+#
+# 기존 등록 API 는 매번 SELECT MAX(x) ... LIKE 'prefix%' 로 마지막 번호를 찾은 뒤 별도로 INSERT 해서,
+# 동시에 등록하면 같은 번호를 만들어 충돌했습니다.
+# 여기서는 업체(v_db) + 테이블 + prefix 별로 DB 의 채번 테이블(api_seq_block)에서
+# 번호 구간(SEQ_BLOCK_SIZE 개)을 UPDLOCK 트랜잭션으로 한 번에 예약하고, 구간 안의 번호는 메모리에서 나눠줍니다.
+#
+# - 예약할 때마다 해당 prefix 의 MAX 도 함께 확인하므로, 채번기를 거치지 않는 기존 ERP 프로그램이 먼저
+#   번호를 쓴 경우에도 그 뒤부터 예약합니다. 예약 구간 안에서 충돌(중복 키)이 나면 구간을 버리고 다시 예약합니다.
+# - 프로세스가 재시작되면 쓰지 않은 예약 번호는 건너뛰므로 번호 사이에 빈 번호가 생길 수 있습니다.
+# - 채번 테이블은 migrations/001_api_seq_block.sql 로 업체 DB 마다 미리 만들어 둡니다. (API 는 DDL 을 실행하지 않음)
+
+import threading
+
+import pyodbc
+
+from db import get_db_connection
+from services.bulk import save_point, rollback_to_save_point
+
+SEQ_BLOCK_SIZE = 10      # 한 번에 예약하는 번호 개수
+SEQ_WIDTH = 5            # 일련번호 자릿수 (예: B2512F00001)
+SEQ_RETRY = 3            # 중복 키 발생 시 재시도 횟수
+DUPLICATE_KEY_ERRORS = ("(2627)", "(2601)")   # PRIMARY KEY / UNIQUE 인덱스 위반 (SQL Server 오류 번호)
+
+_blocks = {}             # (v_db, 테이블, prefix) -> [다음 번호, 구간 끝 번호]
+_locks = {}
+_locks_lock = threading.Lock()
+_ready = set()           # 채번 테이블 존재 확인이 끝난 업체
+
+
+def _lock_for(key):
+    with _locks_lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def _is_duplicate_key(e):
+    # NOT NULL, FK, 길이 초과 등 다른 IntegrityError 는 번호를 바꿔도 똑같이 실패하므로 재시도하지 않음
+    message = " ".join(str(arg) for arg in e.args)
+    return any(code in message for code in DUPLICATE_KEY_ERRORS)
+
+
+def _reserve(v_db, table, column, prefix, size=SEQ_BLOCK_SIZE):
+    """DB 에서 size 개짜리 [시작, 끝] 번호 구간을 예약합니다. DB 연결 실패 시 None."""
+    conn = get_db_connection(v_db)
+    if conn is None:
+        return None
+    try:
+        cur = conn.cursor()
+        if v_db not in _ready:
+            cur.execute("SELECT OBJECT_ID(N'dbo.api_seq_block', N'U')")
+            if cur.fetchone()[0] is None:
+                raise RuntimeError(f"채번 테이블(dbo.api_seq_block)이 없습니다: {v_db} "
+                                   f"(migrations/001_api_seq_block.sql 실행 필요)")
+            _ready.add(v_db)
+
+        # 같은 tbl/prefix 를 예약하는 다른 프로세스는 커밋할 때까지 대기
+        cur.execute("SELECT last_seq FROM dbo.api_seq_block WITH (UPDLOCK, HOLDLOCK) WHERE tbl = ? AND prefix = ?",
+                    (table, prefix))
+        row = cur.fetchone()
+        last_seq = row[0] if row else 0
+
+        # 채번기를 거치지 않고 등록된 번호(기존 ERP 등)가 있으면 그 뒤부터 (테이블/컬럼명은 호출부 상수)
+        cur.execute(f"SELECT MAX({column}) FROM {table} WHERE {column} LIKE ?", (prefix + "%",))
+        max_row = cur.fetchone()
+        if max_row and max_row[0]:
+            last_seq = max(last_seq, int(max_row[0][-SEQ_WIDTH:]))
+
+        end = last_seq + size
+        if row:
+            cur.execute("UPDATE dbo.api_seq_block SET last_seq = ?, upd_dt = GETDATE() WHERE tbl = ? AND prefix = ?",
+                        (end, table, prefix))
+        else:
+            cur.execute("INSERT INTO dbo.api_seq_block (tbl, prefix, last_seq) VALUES (?, ?, ?)",
+                        (table, prefix, end))
+        conn.commit()
+        return [last_seq + 1, end]
+    finally:
+        conn.close()
+
+
+def next_code(v_db, table, column, prefix):
+    """
+    prefix + 일련번호(SEQ_WIDTH 자리) 형식의 새 번호를 반환합니다. (예: next_code(v_db, "segsan_mst", "segsan_cd", "B2512F"))
+    DB 연결 실패 시 None.
+    """
+    key = (v_db, table, prefix)
+    with _lock_for(key):
+        block = _blocks.get(key)
+        if block is None or block[0] > block[1]:
+            block = _reserve(v_db, table, column, prefix)
+            if block is None:
+                return None
+            _blocks[key] = block
+        seq = block[0]
+        block[0] += 1
+    return f"{prefix}{str(seq).zfill(SEQ_WIDTH)}"
+
+
+def next_codes(v_db, table, column, prefix, count):
+    """
+    새 번호 count 개를 한 번에 반환합니다. (일괄 등록용)
+    메모리 구간에 남은 번호를 먼저 쓰고, 모자라면 부족한 개수 이상을 DB 에서 한 번에 예약합니다.
+    DB 연결 실패 시 None.
+    """
+    key = (v_db, table, prefix)
+    with _lock_for(key):
+        block = _blocks.get(key)
+        seqs = []
+        if block is not None and block[0] <= block[1]:
+            take = min(count, block[1] - block[0] + 1)
+            seqs.extend(range(block[0], block[0] + take))
+            block[0] += take
+        if len(seqs) < count:
+            need = count - len(seqs)
+            block = _reserve(v_db, table, column, prefix, size=max(need, SEQ_BLOCK_SIZE))
+            if block is None:
+                return None
+            seqs.extend(range(block[0], block[0] + need))
+            block[0] += need
+            _blocks[key] = block
+    return [f"{prefix}{str(seq).zfill(SEQ_WIDTH)}" for seq in seqs]
+
+
+def invalidate(v_db, table, prefix):
+    """메모리의 예약 구간을 버립니다. 다음 번호 요청 시 DB 에서 새로 예약합니다."""
+    with _lock_for((v_db, table, prefix)):
+        _blocks.pop((v_db, table, prefix), None)
+
+
+def insert_with_code(conn, v_db, table, column, prefix, execute):
+    """
+    새 번호를 받아 execute(code) 로 INSERT 합니다. 중복 키(2627/2601)면 롤백 후
+    예약 구간을 버리고 새 번호로 SEQ_RETRY 회까지 다시 시도합니다. 커밋은 호출부에서 합니다.
+    반환값: 사용한 번호, 번호를 받지 못하면(DB 연결 실패) None
+    """
+    for attempt in range(SEQ_RETRY):
+        code = next_code(v_db, table, column, prefix)
+        if code is None:
+            return None
+        try:
+            execute(code)
+            return code
+        except pyodbc.IntegrityError as e:
+            if not _is_duplicate_key(e):
+                raise
+            conn.rollback()
+            invalidate(v_db, table, prefix)
+            if attempt == SEQ_RETRY - 1:
+                raise
+
+
+def executemany_with_codes(conn, v_db, table, column, prefixes, sql, make_params):
+    """
+    행마다 prefixes[i] 로 새 번호를 받아 make_params(i, code) 파라미터로 sql 을 executemany 합니다.
+    번호는 prefix 별로 next_codes 로 한 번에 받고, fast_executemany 로 한 번에 전송합니다.
+    중복 키(2627/2601)면 롤백 후 예약 구간을 버리고 새 번호로 다시 시도합니다.
+    그래도 실패하거나 다른 DB 오류(FK, 길이 초과 등)면 롤백 후 한 건씩 저장점 안에서 다시 실행해
+    실패한 행만 제외합니다. (services/bulk) 커밋은 호출부에서 합니다.
+    반환값: (행별 번호 리스트, 행별 오류 메시지 리스트(성공은 None)), 번호를 받지 못하면(DB 연결 실패) None
+    """
+    for attempt in range(SEQ_RETRY):
+        codes = [None] * len(prefixes)
+        for prefix in dict.fromkeys(prefixes):
+            idxs = [i for i, p in enumerate(prefixes) if p == prefix]
+            allocated = next_codes(v_db, table, column, prefix, len(idxs))
+            if allocated is None:
+                return None
+            for i, code in zip(idxs, allocated):
+                codes[i] = code
+        try:
+            cur = conn.cursor()
+            cur.fast_executemany = True
+            cur.executemany(sql, [make_params(i, code) for i, code in enumerate(codes)])
+            return codes, [None] * len(codes)
+        except pyodbc.IntegrityError as e:
+            conn.rollback()
+            if not _is_duplicate_key(e):
+                break
+            for prefix in set(prefixes):
+                invalidate(v_db, table, prefix)
+            codes = [None] * len(prefixes)
+        except pyodbc.Error:
+            conn.rollback()
+            break
+    return _execute_each_with_codes(conn, v_db, table, column, prefixes, sql, make_params, codes)
+
+
+def _execute_each_with_codes(conn, v_db, table, column, prefixes, sql, make_params, codes):
+    """
+    행마다 저장점 안에서 INSERT 합니다. codes 에 이미 받은 번호가 있으면 먼저 사용하고,
+    번호 충돌(중복 키)이면 그 행만 새 번호로 SEQ_RETRY 회까지 다시 시도합니다.
+    """
+    codes, errors = list(codes), [None] * len(prefixes)
+    cur = conn.cursor()
+    for i, prefix in enumerate(prefixes):
+        for attempt in range(SEQ_RETRY):
+            code = codes[i] or next_code(v_db, table, column, prefix)
+            codes[i] = None
+            if code is None:
+                return None
+            save_point(cur)
+            try:
+                cur.execute(sql, make_params(i, code))
+                codes[i], errors[i] = code, None
+                break
+            except pyodbc.Error as e:
+                rollback_to_save_point(cur)
+                errors[i] = str(e)
+                if not (isinstance(e, pyodbc.IntegrityError) and _is_duplicate_key(e)):
+                    break
+                invalidate(v_db, table, prefix)
+    return codes, errors
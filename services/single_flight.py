@@ -0,0 +1,66 @@
+# services/single_flight.py
+# 동일 요청 합치기 (single-flight)
+#
+# 대시보드 여러 대가 같은 초에 같은 API(예: /production-orders?v_db=18_DY)를 폴링하면
+# 똑같은 쿼리가 대시보드 수만큼 동시에 DB 로 나갑니다.
+# 같은 경로 + 같은 파라미터(v_db 포함) 요청이 이미 처리 중이면 새로 실행하지 않고 기다렸다가,
+# 먼저 들어온 요청의 응답(본문 bytes, 상태코드, 헤더)을 그대로 나눠 받습니다.
+# 결과를 보관하지는 않으므로(캐시 아님) 처리 중인 요청이 끝나면 다음 요청은 다시 DB 를 조회합니다.
+#
+# 사용 예:
+#     @data_bp.route('/production-orders', methods=['GET'])
+#     @coalesce
+#     def get_production_orders(): ...
+
+import functools
+import threading
+
+from flask import current_app, request
+
+WAIT_TIMEOUT_SEC = 30      # 먼저 실행 중인 요청을 기다리는 최대 시간 (넘으면 직접 실행)
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+class _Flight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None      # (body, status, headers), 실패/스트리밍 응답이면 None
+
+
+def _request_key():
+    # 파라미터 순서가 달라도 같은 요청으로 취급. If-None-Match 가 다르면 304 여부가 달라지므로 키에 포함
+    args = tuple(sorted(request.args.items(multi=True)))
+    return (request.path, args, request.headers.get("If-None-Match"))
+
+
+def coalesce(view):
+    """GET 뷰 함수를 감싸 동시에 들어온 동일 요청을 한 번만 실행합니다."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = _request_key()
+        with _flights_lock:
+            flight = _flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _flights[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(WAIT_TIMEOUT_SEC) and flight.result is not None:
+                body, status, headers = flight.result
+                return current_app.response_class(body, status=status, headers=headers)
+            return view(*args, **kwargs)
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+            if not response.is_streamed:
+                flight.result = (response.get_data(), response.status_code, list(response.headers.items()))
+            return response
+        finally:
+            with _flights_lock:
+                if _flights.get(key) is flight:
+                    del _flights[key]
+            flight.done.set()
+
+    return wrapper
@@ -0,0 +1,309 @@
+# services/smart_log_cache.py
+# smart_log 일자별 로컬 캐시 (메모리 매핑 NumPy 컬럼 파일)
+#
+# 지난 일자의 smart_log 는 더 이상 바뀌지 않는데, 기간 조회 API 는 매번 원격 MSSQL 에서 다시 읽습니다.
+# 마감된 일자는 업체(v_db) + 설비(auto_id) + 일자별로 한 번만 DB 에서 읽어 로컬 디스크에 저장하고,
+# 이후에는 np.load(mmap_mode="r") 로 필요한 구간만 읽습니다. 오늘 데이터는 항상 DB 에서 읽습니다.
+#
+# 저장 구조: cache/smart_log/{v_db}/{auto_id}/{ymd}/
+#     cr_dt.npy : datetime64[ms] (n,)  오름차순
+#     cols.npy  : float64 (n, 8)       col_1 ~ col_8, NULL 은 NaN
+#
+# - 한 번에 조회할 수 있는 기간은 MAX_RANGE_DAYS 일까지입니다. (넓은 기간 한 번에 수백 일치를 DB 조회/저장하지 않도록)
+# - 일자 파일이 깨져 읽을 수 없으면 지우고 DB 에서 다시 채웁니다.
+# - 캐시 전체 크기가 CACHE_MAX_BYTES 를 넘으면 가장 오래 조회되지 않은 일자부터 지웁니다.
+#   (Windows 에서는 다른 요청이 열어 둔 파일은 지워지지 않으므로, 실제로 지워진 폴더만 확보한 용량으로 셉니다)
+# - 반환하는 배열은 메모리 매핑에서 복사한 것이라, 응답 후 캐시 파일을 잡고 있지 않습니다.
+# - 마감 후 CLOSE_GRACE_MIN 보다 늦게 커밋되는 행도 있으므로, 마감 후 REVALIDATE_DAYS 일 안의 일자는
+#   REVALIDATE_INTERVAL_SEC 마다 DB 건수(COUNT)와 비교해 다르면 다시 채웁니다. 그보다 오래된 일자는 바뀌지 않는다고 봅니다.
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from db import get_db_connection
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "smart_log")
+CLOSE_GRACE_MIN = 30      # 자정 직후 늦게 들어오는 로그를 고려해, 일자 종료 후 이 시간(분)이 지나야 캐시에 저장
+MAX_RANGE_DAYS = 93       # 한 번에 조회할 수 있는 최대 일수
+CACHE_MAX_BYTES = 2 * 1024 ** 3   # 로컬 캐시 최대 크기 (넘으면 오래 조회되지 않은 일자부터 삭제)
+EVICT_INTERVAL_SEC = 600  # 캐시 크기 점검 주기
+REVALIDATE_DAYS = 3       # 마감 후 이 일수 안의 일자는 DB 건수와 비교해 늦게 커밋된 행이 있으면 다시 채움
+REVALIDATE_INTERVAL_SEC = 600   # 같은 일자를 다시 비교하는 주기
+
+COLUMNS = ["col_1", "col_2", "col_3", "col_4", "col_5", "col_6", "col_7", "col_8"]
+
+_locks = {}
+_locks_lock = threading.Lock()
+_evict_lock = threading.Lock()
+_last_evict = 0.0
+_validated = {}           # (v_db, auto_id, 일자) -> 마지막으로 DB 건수와 비교한 시각 (monotonic)
+
+
+def parse_dt(value, end_of_day=False):
+    """'YYYY-MM-DD' 또는 'YYYY-MM-DD HH:MM:SS' 를 datetime 으로 변환합니다. 날짜만 있으면 end_of_day 에 따라 00:00:00 / 23:59:59"""
+    if not value:
+        return None
+    value = value.strip()
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y%m%d"):
+        try:
+            dt = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if end_of_day and fmt in ("%Y-%m-%d", "%Y%m%d"):
+            dt = dt.replace(hour=23, minute=59, second=59)
+        return dt
+    return None
+
+
+def check_range(from_dt, to_dt):
+    """조회 기간이 올바르면 None, 아니면 오류 메시지를 반환합니다. (API 에서 400 응답용)"""
+    if from_dt > to_dt:
+        return "from_dt 가 to_dt 보다 늦습니다."
+    if (to_dt.date() - from_dt.date()).days + 1 > MAX_RANGE_DAYS:
+        return f"조회 기간은 최대 {MAX_RANGE_DAYS}일입니다."
+    return None
+
+
+def _lock_for(v_db, auto_id):
+    key = (v_db, auto_id)
+    with _locks_lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def _day_dir(v_db, auto_id, day):
+    # v_db/auto_id 는 요청 파라미터이므로 경로 조작 문자를 허용하지 않음
+    if not re.fullmatch(r"[\w\-]+", v_db) or not re.fullmatch(r"[\w\-]+", auto_id):
+        raise ValueError(f"잘못된 캐시 경로 요청입니다: {v_db}/{auto_id}")
+    return os.path.join(CACHE_DIR, v_db, auto_id, day.strftime("%Y%m%d"))
+
+
+def _is_closed(day):
+    return datetime.now() >= datetime.combine(day + timedelta(days=1), datetime.min.time()) + timedelta(minutes=CLOSE_GRACE_MIN)
+
+
+def _needs_revalidate(v_db, auto_id, day):
+    if (datetime.now().date() - day).days > REVALIDATE_DAYS + 1:
+        return False
+    last = _validated.get((v_db, auto_id, day))
+    return last is None or time.monotonic() - last >= REVALIDATE_INTERVAL_SEC
+
+
+def _stale_days(cur, v_db, auto_id, days):
+    """캐시된 일자들의 건수를 DB 건수와 비교해, 달라진 일자(늦게 커밋된 행이 있는 일자) 목록을 반환합니다."""
+    start = datetime.combine(days[0], datetime.min.time())
+    end = datetime.combine(days[-1] + timedelta(days=1), datetime.min.time())
+    cur.execute("""
+        SELECT CONVERT(VARCHAR(8), cr_dt, 112) as ymd, COUNT(*) as cnt
+        FROM dbo.smart_log
+        WHERE auto_id = ?
+          AND cr_dt >= ? AND cr_dt < ?
+        GROUP BY CONVERT(VARCHAR(8), cr_dt, 112)
+    """, (auto_id, start, end))
+    counts = {r[0]: r[1] for r in cur.fetchall()}
+
+    stale = []
+    for day in days:
+        try:
+            cached = np.load(os.path.join(_day_dir(v_db, auto_id, day), "cr_dt.npy"), mmap_mode="r").shape[0]
+        except (OSError, ValueError):
+            cached = None
+        if cached != counts.get(day.strftime("%Y%m%d"), 0):
+            stale.append(day)
+        else:
+            _validated[(v_db, auto_id, day)] = time.monotonic()
+    return stale
+
+
+def _remove_day(path):
+    """일자 폴더를 지우고, 실제로 지워졌는지 반환합니다. (Windows 에서 열려 있는 파일은 지워지지 않음)"""
+    shutil.rmtree(path, ignore_errors=True)
+    return not os.path.exists(path)
+
+
+def _query(cur, auto_id, start, end):
+    """[start, end) 구간 로그를 (cr_dt 배열, cols 배열) 로 읽어 옵니다."""
+    sql = f"""
+        SELECT cr_dt, {", ".join(COLUMNS)}
+        FROM dbo.smart_log
+        WHERE auto_id = ?
+          AND cr_dt >= ? AND cr_dt < ?
+        ORDER BY cr_dt
+    """
+    cur.execute(sql, (auto_id, start, end))
+    rows = cur.fetchall()
+    times = np.array([r[0] for r in rows], dtype="datetime64[ms]")
+    cols = np.array([[np.nan if v is None else float(v) for v in r[1:]] for r in rows], dtype=float).reshape(-1, len(COLUMNS))
+    return times, cols
+
+
+def _save_day(v_db, auto_id, day, times, cols):
+    """임시 폴더에 쓴 뒤 이름을 바꿔, 다른 프로세스가 반쯤 쓰인 파일을 읽지 않게 합니다."""
+    target = _day_dir(v_db, auto_id, day)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(target))
+    try:
+        np.save(os.path.join(tmp, "cr_dt.npy"), times)
+        np.save(os.path.join(tmp, "cols.npy"), cols)
+        os.replace(tmp, target)
+    except OSError:
+        # 다른 프로세스가 먼저 저장한 경우
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _load_day(v_db, auto_id, day):
+    path = _day_dir(v_db, auto_id, day)
+    try:
+        times = np.load(os.path.join(path, "cr_dt.npy"), mmap_mode="r")
+        cols = np.load(os.path.join(path, "cols.npy"), mmap_mode="r")
+        # 수정 시각을 최근 조회 시각으로 사용 (용량 초과 시 오래 조회되지 않은 일자부터 삭제)
+        os.utime(path)
+        return times, cols
+    except (OSError, ValueError):
+        return None
+
+
+def _evict():
+    """캐시 전체 크기가 CACHE_MAX_BYTES 를 넘으면 최근 조회 시각이 오래된 일자 폴더부터 삭제합니다."""
+    global _last_evict
+    if time.monotonic() - _last_evict < EVICT_INTERVAL_SEC or not _evict_lock.acquire(blocking=False):
+        return
+    try:
+        _last_evict = time.monotonic()
+        day_dirs, total = [], 0
+        for root, dirs, files in os.walk(CACHE_DIR):
+            if files and not os.path.basename(root).startswith(".tmp-"):
+                size = sum(os.path.getsize(os.path.join(root, f)) for f in files)
+                day_dirs.append((os.path.getmtime(root), size, root))
+                total += size
+        for _, size, path in sorted(day_dirs):
+            if total <= CACHE_MAX_BYTES:
+                break
+            if _remove_day(path):
+                total -= size
+    except OSError as e:
+        print(f"[SmartLogCache Error] evict failed: {e}")
+    finally:
+        _evict_lock.release()
+
+
+def _fill_missing(cur, v_db, auto_id, days):
+    """캐시에 없는 마감 일자들을 연속 구간별로 한 번에 조회해 일자별로 저장합니다."""
+    runs = []
+    for day in days:
+        if runs and runs[-1][-1] + timedelta(days=1) == day:
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+
+    for run in runs:
+        start = datetime.combine(run[0], datetime.min.time())
+        end = datetime.combine(run[-1] + timedelta(days=1), datetime.min.time())
+        times, cols = _query(cur, auto_id, start, end)
+        day_keys = times.astype("datetime64[D]")
+        for day in run:
+            mask = day_keys == np.datetime64(day, "D")
+            _save_day(v_db, auto_id, day, times[mask], cols[mask])
+            _validated[(v_db, auto_id, day)] = time.monotonic()
+
+
+def load_range(v_db, auto_id, from_dt, to_dt):
+    """
+    [from_dt, to_dt] 구간의 smart_log 를 반환합니다. 마감 일자는 로컬 캐시, 나머지는 DB.
+    반환값: (cr_dt datetime64[ms] 배열, {컬럼명: float 배열}), DB 연결 실패 시 None
+    기간이 MAX_RANGE_DAYS 를 넘으면 ValueError
+    """
+    error = check_range(from_dt, to_dt)
+    if error:
+        raise ValueError(error)
+    auto_id = str(auto_id)
+    days = []
+    d = from_dt.date()
+    while d <= to_dt.date():
+        days.append(d)
+        d += timedelta(days=1)
+    closed = [d for d in days if _is_closed(d)]
+    open_days = [d for d in days if not _is_closed(d)]
+
+    conn = None
+    try:
+        with _lock_for(v_db, auto_id):
+            missing = [d for d in closed if not os.path.isdir(_day_dir(v_db, auto_id, d))]
+            recent = [d for d in closed if d not in missing and _needs_revalidate(v_db, auto_id, d)]
+            if missing or recent or open_days:
+                conn = get_db_connection(v_db)
+                if conn is None:
+                    return None
+                cur = conn.cursor()
+                if recent:
+                    # 최근 마감 일자에 늦게 커밋된 행이 있으면 지우고 다시 채움 (못 지우면 다음 비교 때 다시 시도)
+                    for day in _stale_days(cur, v_db, auto_id, recent):
+                        if _remove_day(_day_dir(v_db, auto_id, day)):
+                            missing.append(day)
+                    missing.sort()
+                if missing:
+                    _fill_missing(cur, v_db, auto_id, missing)
+
+        lo, hi = np.datetime64(from_dt, "ms"), np.datetime64(to_dt, "ms")
+        time_parts, col_parts = [], []
+        for day in closed:
+            loaded = _load_day(v_db, auto_id, day)
+            if loaded is None:
+                # 깨진 일자 파일: 지우고 DB 에서 다시 채움 (건너뛰면 응답에 조용히 빈 구간이 생김)
+                with _lock_for(v_db, auto_id):
+                    _remove_day(_day_dir(v_db, auto_id, day))
+                    if conn is None:
+                        conn = get_db_connection(v_db)
+                        if conn is None:
+                            return None
+                    _fill_missing(conn.cursor(), v_db, auto_id, [day])
+                loaded = _load_day(v_db, auto_id, day)
+                if loaded is None:
+                    raise OSError(f"smart_log 캐시 파일을 읽을 수 없습니다: {_day_dir(v_db, auto_id, day)}")
+            times, cols = loaded
+            # 메모리 매핑된 파일에서 필요한 구간만 복사해 읽음 (반환 배열이 파일을 잡고 있지 않도록)
+            i, j = np.searchsorted(times, lo, "left"), np.searchsorted(times, hi, "right")
+            time_parts.append(np.array(times[i:j]))
+            col_parts.append(np.array(cols[i:j]))
+            del loaded, times, cols
+
+        if open_days:
+            # 오늘(미마감) 구간은 DB 에서 직접 조회
+            start = max(from_dt, datetime.combine(open_days[0], datetime.min.time()))
+            times, cols = _query(conn.cursor(), auto_id, start, to_dt + timedelta(milliseconds=1))
+            time_parts.append(times)
+            col_parts.append(cols)
+    finally:
+        if conn:
+            conn.close()
+    _evict()
+
+    times = np.concatenate(time_parts) if time_parts else np.array([], dtype="datetime64[ms]")
+    cols = np.concatenate(col_parts) if col_parts else np.empty((0, len(COLUMNS)))
+    return times, {name: cols[:, i] for i, name in enumerate(COLUMNS)}
+
+
+def to_rows(times, cols, names, mask=None):
+    """
+    load_range 결과를 DB fetchall() 과 같은 튜플 리스트로 변환합니다.
+    names: 튜플에 넣을 컬럼 순서 ("cr_dt" 또는 col_n), NaN 은 None 으로 바뀝니다.
+    """
+    if mask is not None:
+        times = times[mask]
+        cols = {k: v[mask] for k, v in cols.items()}
+    values = []
+    for name in names:
+        if name == "cr_dt":
+            values.append(times.astype(object))
+        else:
+            arr = cols[name]
+            values.append(np.where(np.isnan(arr), None, arr.astype(object)))
+    return list(zip(*values))
@@ -0,0 +1,110 @@
+# services/smart_snapshot.py
+# smart_last 실시간 스냅샷 공유 폴러
+#
+# 실시간 관제 화면(용접/절곡/혼합/숙성/증숙/온습도)은 태블릿마다 1초 간격으로
+# smart_last 를 조회합니다. 업체(v_db)마다 백그라운드 스레드 하나가 주기적으로 smart_last 전체
+# (설비당 1행)를 읽어 메모리에 보관하고, API 는 그 스냅샷에서 요청한 auto_id 만 골라 돌려줍니다.
+# 화면을 몇 대 띄우든, 요청마다 auto_id 조합이 다르든 업체당 폴러(스레드/DB 연결)는 하나입니다.
+
+import threading
+import time
+
+from db import get_db_connection
+
+POLL_INTERVAL_SEC = 1.0    # smart_last 갱신 주기
+IDLE_STOP_SEC = 60         # 이 시간 동안 아무도 조회하지 않으면 폴러 종료
+STALE_LIMIT_SEC = 30       # 마지막 성공 갱신이 이보다 오래되면 스냅샷을 쓰지 않음 (DB 장애로 판단)
+
+SMART_LAST_COLUMNS = ["col_1", "col_2", "col_3", "col_4", "col_5", "col_6", "col_7", "col_8"]
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+
+
+class SnapshotPoller(object):
+    """한 업체의 smart_last 전체 스냅샷을 주기적으로 갱신합니다."""
+
+    def __init__(self, v_db):
+        self.v_db = v_db
+        self.rows = None          # {auto_id: {"cr_dt": ..., "col_1": ..., ...}}
+        self.loaded_at = 0.0      # 마지막 성공 갱신 시각 (monotonic)
+        self.last_access = time.monotonic()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name=f"smart-last-{self.v_db}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(POLL_INTERVAL_SEC)
+            if time.monotonic() - self.last_access > IDLE_STOP_SEC:
+                _remove_poller(self)
+                return
+            self.refresh()
+
+    def refresh(self):
+        with self._refresh_lock:
+            conn = None
+            try:
+                conn = get_db_connection(self.v_db)
+                if conn is None:
+                    return False
+                cur = conn.cursor()
+                sql = f"""
+                    SELECT auto_id, cr_dt, {", ".join(SMART_LAST_COLUMNS)}
+                    FROM dbo.smart_last
+                """
+                cur.execute(sql)
+                rows = {}
+                for r in cur.fetchall():
+                    item = {"cr_dt": r[1]}
+                    for i, col in enumerate(SMART_LAST_COLUMNS):
+                        item[col] = r[2 + i]
+                    rows[str(r[0]).strip()] = item
+                self.rows = rows
+                self.loaded_at = time.monotonic()
+                return True
+            except Exception as e:
+                print(f"[Snapshot Error] smart_last refresh failed (vendor={self.v_db}): {e}")
+                return False
+            finally:
+                if conn:
+                    conn.close()
+
+    def get(self):
+        self.last_access = time.monotonic()
+        if self.rows is None:
+            # 처음 조회하는 요청은 한 번 직접 읽어 옵니다.
+            self.refresh()
+        if self.rows is None or time.monotonic() - self.loaded_at > STALE_LIMIT_SEC:
+            return None
+        return self.rows
+
+
+def _remove_poller(poller):
+    with _pollers_lock:
+        if _pollers.get(poller.v_db) is poller:
+            del _pollers[poller.v_db]
+
+
+def get_snapshot(v_db, auto_ids):
+    """
+    smart_last 스냅샷을 반환합니다.
+    반환값: {auto_id(str): {"cr_dt": datetime, "col_1": ..., ..., "col_8": ...}}
+           smart_last 에 없는 auto_id 는 키가 없습니다.
+           DB 연결 실패 등으로 최신 스냅샷이 없으면 None.
+    """
+    poller = _pollers.get(v_db)
+    if poller is None:
+        with _pollers_lock:
+            poller = _pollers.get(v_db)
+            if poller is None:
+                poller = _pollers[v_db] = SnapshotPoller(v_db)
+                poller.start()
+    rows = poller.get()
+    if rows is None:
+        return None
+    return {aid: rows[aid] for aid in (str(a).strip() for a in auto_ids) if aid in rows}
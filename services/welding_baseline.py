@@ -0,0 +1,124 @@
+# services/welding_baseline.py
+# 용접 동적 기준값(목표 전압/전류) 메모리 링버퍼
+#
+# 용접 실시간 화면의 목표 V/A 는 '전류가 전압의 0.7~1.3배' 인 정상 비율 데이터 중 최근 K건의 평균입니다.
+# 매 조회마다 smart_log 전체에 ROW_NUMBER() 를 돌리는 대신, 업체(v_db) + 설비(auto_id)별로
+# 최근 K건을 deque 에 보관하고 워터마크(cr_dt) 근처의 새 행만 읽어 채워 넣습니다.
+# 늦게 커밋된 행도 반영하도록 워터마크 - OVERLAP_SEC 부터 다시 읽고, (cr_dt, 값)이 같은 행은 한 번만 넣습니다.
+
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from db import get_db_connection
+
+BASELINE_SIZE = 5             # K: 평균에 사용할 최근 정상 데이터 건수
+RATIO_MIN = 0.7               # 정상 비율 하한 (전류 / 전압)
+RATIO_MAX = 1.3               # 정상 비율 상한
+REFRESH_INTERVAL_SEC = 5      # 새 행 반영 주기 (요청이 많아도 이 주기보다 자주 조회하지 않음)
+OVERLAP_SEC = 120             # 워터마크 이전으로 다시 읽는 구간 (늦게 커밋된 행 반영)
+
+_baselines = {}
+_baselines_lock = threading.Lock()
+
+
+class WeldingBaseline(object):
+    """한 업체의 용접기 묶음에 대한 최근 정상 데이터(col_3 전압, col_4 전류) 링버퍼."""
+
+    def __init__(self, v_db, auto_ids):
+        self.v_db = v_db
+        self.auto_ids = sorted(auto_ids)
+        self.buffers = {aid: deque(maxlen=BASELINE_SIZE) for aid in self.auto_ids}   # (cr_dt, 전압, 전류)
+        self.watermark = None     # 마지막으로 읽은 smart_log.cr_dt (정상 여부와 무관)
+        self.seeded = False
+        self.refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _feed(self, cur):
+        """
+        워터마크 - OVERLAP_SEC 이후(최초에는 전체) 행 중 설비별 최근 K건의 정상 데이터만 읽어 버퍼에 합칩니다.
+        겹침 구간에서 다시 읽힌 행은 (cr_dt, 전압, 전류)가 같으므로 중복으로 들어가지 않습니다.
+        """
+        since = None
+        if self.watermark is not None:
+            since = self.watermark - timedelta(seconds=OVERLAP_SEC)
+        since_sql = " AND cr_dt > ?" if since is not None else ""
+        since_params = [since] if since is not None else []
+
+        # 워터마크는 정상 여부와 무관하게 마지막 행 기준
+        placeholders = ",".join(["?"] * len(self.auto_ids))
+        cur.execute(f"SELECT MAX(cr_dt) FROM dbo.smart_log WHERE auto_id IN ({placeholders}){since_sql}",
+                    self.auto_ids + since_params)
+        row = cur.fetchone()
+        last_dt = row[0] if row else None
+        if last_dt is None:
+            return
+
+        # 설비별 최근 K건만 (오래 멈췄다 재가동해도 구간 전체를 읽지 않음)
+        for aid in self.auto_ids:
+            cur.execute(f"""
+                SELECT TOP ({BASELINE_SIZE}) cr_dt, col_3, col_4
+                FROM dbo.smart_log
+                WHERE auto_id = ?{since_sql}
+                  AND col_4 BETWEEN (col_3 * ?) AND (col_3 * ?)
+                ORDER BY cr_dt DESC
+            """, [aid] + since_params + [RATIO_MIN, RATIO_MAX])
+            fetched = {(r[0], float(r[1]), float(r[2])) for r in cur.fetchall()}
+            if fetched:
+                merged = sorted(set(self.buffers[aid]) | fetched, key=lambda item: item[0])
+                self.buffers[aid] = deque(merged[-BASELINE_SIZE:], maxlen=BASELINE_SIZE)
+        self.watermark = max(self.watermark, last_dt) if self.watermark is not None else last_dt
+
+    def refresh(self):
+        conn = None
+        try:
+            conn = get_db_connection(self.v_db)
+            if conn is None:
+                return False
+            cur = conn.cursor()
+            self._feed(cur)
+            self.seeded = True
+            self.refreshed_at = time.monotonic()
+            return True
+        except Exception as e:
+            # 갱신 실패 시 기존 버퍼로 계속 응답
+            print(f"[Baseline Error] welding baseline refresh failed (vendor={self.v_db}): {e}")
+            return False
+        finally:
+            if conn:
+                conn.close()
+
+    def get(self):
+        """
+        반환값: {auto_id: (평균 전압 원값(col_3), 평균 전류(col_4))}, 정상 데이터가 없는 설비는 키 없음
+               최초 적재 전에 DB 연결에 실패하면 None
+        """
+        if not self.seeded or time.monotonic() - self.refreshed_at >= REFRESH_INTERVAL_SEC:
+            # 다른 요청이 갱신 중이면 기다리지 않고 현재 버퍼를 사용 (최초 적재는 기다림)
+            if self._lock.acquire(blocking=not self.seeded):
+                try:
+                    if not self.seeded or time.monotonic() - self.refreshed_at >= REFRESH_INTERVAL_SEC:
+                        self.refresh()
+                finally:
+                    self._lock.release()
+        if not self.seeded:
+            return None
+
+        result = {}
+        for aid, buf in self.buffers.items():
+            items = list(buf)
+            if items:
+                result[aid] = (sum(v for _, v, _ in items) / len(items), sum(a for _, _, a in items) / len(items))
+        return result
+
+
+def get_welding_baseline(v_db, auto_ids):
+    key = (v_db, tuple(sorted(set(str(a) for a in auto_ids))))
+    baseline = _baselines.get(key)
+    if baseline is None:
+        with _baselines_lock:
+            baseline = _baselines.get(key)
+            if baseline is None:
+                baseline = _baselines[key] = WeldingBaseline(v_db, key[1])
+    return baseline.get()